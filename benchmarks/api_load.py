@@ -0,0 +1,132 @@
+"""API yük testi: eşzamanlı istemci sayısı arttıkça gecikme dağılımını ölçer.
+
+Varsayılan olarak uygulama süreç içinde (ASGI) çalıştırılır; `--url` verilirse
+çalışan bir sunucuya istek atılır. Her seviyede istemciler vault okuma/yazma
+yaparken ayrı bir yoklayıcı `/api/v1/health` gecikmesini ölçer; olay döngüsünü
+bloklayan bir çağrı en çok bu değeri bozar. `--db-delay-ms` her veritabanı
+çağrısına yapay bir gecikme ekleyerek yavaş diski taklit eder.
+
+    python benchmarks/api_load.py --clients 1 8 32 64 --requests 50 --db-delay-ms 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import secrets
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import httpx
+
+
+def _percentile(samples: List[float], percent: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def _client(http: httpx.AsyncClient, headers: dict, body: dict, count: int, out: List[float]) -> None:
+    for index in range(count):
+        started = time.perf_counter()
+        if index % 2:
+            response = await http.post("/api/v1/vault", headers=headers, json=body)
+        else:
+            response = await http.get("/api/v1/vault", headers=headers)
+        response.raise_for_status()
+        out.append(time.perf_counter() - started)
+
+
+async def _probe(http: httpx.AsyncClient, stop: asyncio.Event, out: List[float]) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        (await http.get("/api/v1/health")).raise_for_status()
+        out.append(time.perf_counter() - started)
+        await asyncio.sleep(0.005)
+
+
+async def _register(http: httpx.AsyncClient) -> dict:
+    credentials = {"username": f"load-{secrets.token_hex(4)}", "password": secrets.token_urlsafe(12)}
+    response = await http.post("/api/v1/auth/register", json=credentials)
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['token']}"}
+
+
+def _slow_down(db, delay: float) -> None:
+    for name in ("get_user", "get_user_id", "create_user", "record_login", "get_user_vault", "save_user_vault"):
+        method = getattr(db, name)
+
+        def delayed(*args, _method=method, **kwargs):
+            time.sleep(delay)
+            return _method(*args, **kwargs)
+
+        setattr(db, name, delayed)
+
+
+async def run(
+    levels: List[int],
+    requests_per_client: int,
+    envelope_kb: int,
+    url: Optional[str],
+    db_delay_ms: float = 0,
+) -> None:
+    if url:
+        transport = None
+        base_url = url.rstrip("/")
+    else:
+        from pass_manager.api.main import app, db
+
+        if db_delay_ms:
+            _slow_down(db, db_delay_ms / 1000)
+        transport = httpx.ASGITransport(app=app)
+        base_url = "http://bench"
+
+    body = {"encrypted_envelope": {"version": 1, "payload": secrets.token_hex(envelope_kb * 512)}}
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=60) as http:
+        print(f"{'istemci':>8} {'istek':>6} {'p50 ms':>8} {'p99 ms':>8} {'health p99':>11} {'istek/sn':>9}")
+        for clients in levels:
+            headers = [await _register(http) for _ in range(clients)]
+            latencies: List[float] = []
+            probes: List[float] = []
+            stop = asyncio.Event()
+            probe = asyncio.create_task(_probe(http, stop, probes))
+            started = time.perf_counter()
+            await asyncio.gather(
+                *(_client(http, headers[i], body, requests_per_client, latencies) for i in range(clients))
+            )
+            elapsed = time.perf_counter() - started
+            stop.set()
+            await probe
+            print(
+                f"{clients:>8} {len(latencies):>6} "
+                f"{statistics.median(latencies) * 1000:>8.1f} "
+                f"{_percentile(latencies, 99) * 1000:>8.1f} "
+                f"{_percentile(probes, 99) * 1000:>11.1f} "
+                f"{len(latencies) / elapsed:>9.0f}"
+            )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 8, 32, 64])
+    parser.add_argument("--requests", type=int, default=40, help="İstemci başına istek sayısı.")
+    parser.add_argument("--envelope-kb", type=int, default=64, help="Yazılan vault boyutu (KB).")
+    parser.add_argument("--url", help="Çalışan sunucu adresi; verilmezse süreç içi ASGI.")
+    parser.add_argument(
+        "--db-delay-ms", type=float, default=0, help="Süreç içi çalıştırmada yapay veritabanı gecikmesi."
+    )
+    args = parser.parse_args(argv)
+    if not args.url:
+        # Süreç içi çalıştırmada gerçek veritabanına dokunulmaz.
+        os.environ.setdefault("PASS_MANAGER_DB", str(Path(tempfile.mkdtemp()) / "bench.db"))
+        sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+    asyncio.run(run(args.clients, args.requests, args.envelope_kb, args.url, args.db_delay_ms))
+
+
+if __name__ == "__main__":
+    main()
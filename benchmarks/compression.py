@@ -0,0 +1,85 @@
+"""Sıkıştırma ölçümü: şifreleme öncesi (kodlayıcı) ve aktarım (HTTP) katmanı.
+
+Her kodlayıcı için örnek bir kasa sürüm 2 zarfına yazılır; zarfın JSON
+boyutu, mühürleme/açma süresi (anahtar türetme hariç) ve sunucunun
+desteklediği her HTTP kodlamasıyla aktarım boyutu raporlanır. Şifreli metin sıkışmadığından
+aktarım katmanında kazanılan yalnızca JSON/base64 fazlalığıdır.
+
+    python benchmarks/compression.py --entries 500 --notes-bytes 400
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from pass_manager.api.compression import compress, supported_encodings  # noqa: E402
+from pass_manager.crypto import json_default  # noqa: E402
+from pass_manager.models import Vault, VaultEntry  # noqa: E402
+from pass_manager.storage import SecureVault, VaultStorage  # noqa: E402
+
+MASTER = "BenchmarkMaster!123"
+WORDS = "hesap fatura kurtarma kodu sunucu yedek anahtar not giriş banka eposta".split()
+
+
+def _fill(vault: Vault, entries: int, notes_bytes: int) -> None:
+    rng = random.Random(7)
+    for index in range(entries):
+        notes = ""
+        while len(notes) < notes_bytes:
+            notes += rng.choice(WORDS) + " "
+        vault.add_entry(
+            VaultEntry(
+                service=f"service-{index}.example.com",
+                username=f"user{index}@example.com",
+                password="".join(rng.choice("abcdefghijkmnpqrstuvwxyz23456789!#") for _ in range(20)),
+                notes=notes,
+                tags=["iş", "kişisel"][: index % 3],
+            )
+        )
+
+
+def run(entries: int, notes_bytes: int, codecs: List[str]) -> None:
+    encodings = supported_encodings()
+    columns = "".join(f" {encoding + ' KB':>10} {encoding + ' ms':>9}" for encoding in encodings)
+    print(f"{'kodlayıcı':>14} {'zarf KB':>9} {'yaz ms':>8} {'aç ms':>8}{columns}")
+    for codec in codecs:
+        with tempfile.TemporaryDirectory() as workdir:
+            storage = VaultStorage(str(Path(workdir) / "vault.pmvb"))
+            secure = SecureVault(storage, codec=codec)
+            vault = secure.init_vault(MASTER)
+            _fill(vault, entries, notes_bytes)
+            started = time.perf_counter()
+            secure.save_vault(MASTER, vault)
+            sealed = time.perf_counter() - started
+            body = json.dumps(storage.read_envelope(), default=json_default).encode("utf-8")
+            started = time.perf_counter()
+            secure.load_vault(MASTER)
+            opened = time.perf_counter() - started
+        row = f"{codec:>14} {len(body) / 1024:>9.1f} {sealed * 1000:>8.1f} {opened * 1000:>8.1f}"
+        for encoding in encodings:
+            started = time.perf_counter()
+            packed = compress(body, encoding)
+            row += f" {len(packed) / 1024:>10.1f} {(time.perf_counter() - started) * 1000:>9.1f}"
+        print(row)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=500)
+    parser.add_argument("--notes-bytes", type=int, default=200, help="Kayıt başına yaklaşık not uzunluğu.")
+    parser.add_argument("--codecs", nargs="+", default=["json", "json+deflate", "binary", "binary+deflate"])
+    args = parser.parse_args(argv)
+    run(args.entries, args.notes_bytes, args.codecs)
+
+
+if __name__ == "__main__":
+    main()
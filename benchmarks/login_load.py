@@ -0,0 +1,87 @@
+"""Giriş yük testi: parola özeti süreç sayısına göre giriş/sn ve çekirdek başına verim.
+
+Uygulama süreç içinde (ASGI) çalıştırılır. Her seviyede özet havuzu verilen
+süreç sayısıyla yeniden kurulur, eşzamanlı istemciler giriş yapar ve ayrı
+bir yoklayıcı `/api/v1/health` gecikmesini ölçer; özet olay döngüsünde
+hesaplansaydı en çok bu değer bozulurdu.
+
+    python benchmarks/login_load.py --workers 1 2 4 --clients 32 --logins 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import secrets
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import httpx
+
+from api_load import _percentile, _probe
+
+
+async def _login(http: httpx.AsyncClient, credentials: dict, count: int, out: List[float]) -> None:
+    for _ in range(count):
+        started = time.perf_counter()
+        (await http.post("/api/v1/auth/login", json=credentials)).raise_for_status()
+        out.append(time.perf_counter() - started)
+
+
+async def run(levels: List[int], clients: int, logins: int) -> None:
+    from pass_manager.api import main
+    from pass_manager.api.auth import PasswordHasher
+
+    transport = httpx.ASGITransport(app=main.app)
+    print(
+        f"{'süreç':>6} {'giriş':>6} {'giriş/sn':>9} {'çekirdek başı':>13} "
+        f"{'p50 ms':>8} {'p99 ms':>8} {'health p99':>11} {'en derin kuyruk':>16}"
+    )
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=600) as http:
+        for workers in levels:
+            main.hasher.close()
+            main.hasher = PasswordHasher(workers=workers, max_queue=clients * 2)
+            users = []
+            for _ in range(clients):
+                credentials = {"username": f"login-{secrets.token_hex(4)}", "password": secrets.token_urlsafe(12)}
+                (await http.post("/api/v1/auth/register", json=credentials)).raise_for_status()
+                users.append(credentials)
+            per_client = max(1, logins // clients)
+            latencies: List[float] = []
+            probes: List[float] = []
+            stop = asyncio.Event()
+            probe = asyncio.create_task(_probe(http, stop, probes))
+            started = time.perf_counter()
+            await asyncio.gather(*(_login(http, user, per_client, latencies) for user in users))
+            elapsed = time.perf_counter() - started
+            stop.set()
+            await probe
+            rate = len(latencies) / elapsed
+            cores = min(workers, os.cpu_count() or 1)
+            print(
+                f"{workers:>6} {len(latencies):>6} {rate:>9.1f} {rate / cores:>13.1f} "
+                f"{statistics.median(latencies) * 1000:>8.0f} {_percentile(latencies, 99) * 1000:>8.0f} "
+                f"{_percentile(probes, 99) * 1000:>11.1f} {main.hasher.metrics()['peak_pending']:>16}"
+            )
+    main.hasher.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="Özet süreci sayıları.")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--logins", type=int, default=64, help="Seviye başına toplam giriş.")
+    args = parser.parse_args(argv)
+    # Gerçek veritabanına dokunulmaz.
+    os.environ.setdefault("PASS_MANAGER_DB", str(Path(tempfile.mkdtemp()) / "bench.db"))
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+    asyncio.run(run(args.workers, args.clients, args.logins))
+
+
+if __name__ == "__main__":
+    main()
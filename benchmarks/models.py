@@ -0,0 +1,110 @@
+"""Kayıt modeli ölçümü: `slots` kullanan `VaultEntry` ve eski `asdict` tabanlı dataclass.
+
+Her iki model için N kaydın bellekte kapladığı yer (tracemalloc) ile
+`to_dict`/`from_dict` süreleri raporlanır. İki model de aynı satırlardan
+kurulur ve girdideki etiket listelerini paylaşır; bellek farkı yalnızca
+nesne düzeninden gelir.
+
+    python benchmarks/models.py --entries 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from pass_manager.models import VaultEntry, _utcnow  # noqa: E402
+
+
+@dataclass
+class _LegacyEntry:
+    """Eski `VaultEntry`: `__dict__` taşır, dönüşümler `asdict` / `cls(**data)` ile."""
+
+    service: str
+    username: str
+    password: str
+    notes: str = ""
+    tags: List[str] = field(default_factory=list)
+    entry_id: str = ""
+    created_at: str = field(default_factory=_utcnow)
+    updated_at: str = field(default_factory=_utcnow)
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "_LegacyEntry":
+        return cls(**data)
+
+
+def _rows(entries: int) -> List[Dict]:
+    return [
+        {
+            "service": f"service-{index}.example.com",
+            "username": f"user{index}@example.com",
+            "password": f"pw-{index:08d}-Xy!",
+            "notes": "",
+            "tags": ["iş"] if index % 3 else [],
+            "entry_id": f"{index:024x}",
+            "created_at": "2024-01-01T00:00:00+04:00",
+            "updated_at": "2024-01-01T00:00:00+04:00",
+        }
+        for index in range(entries)
+    ]
+
+
+def _timed(fn) -> float:
+    # Çöp toplayıcı kapalı ölçülür; önceki modelin nesneleri sonrakinin süresine yansımasın.
+    gc.collect()
+    gc.disable()
+    try:
+        started = time.perf_counter()
+        fn()
+        return time.perf_counter() - started
+    finally:
+        gc.enable()
+
+
+def _measure(model, rows: List[Dict]) -> tuple:
+    items: List = []
+    from_dict = _timed(lambda: items.extend(model.from_dict(row) for row in rows))
+    to_dict = _timed(lambda: [item.to_dict() for item in items])
+    del items
+    gc.collect()
+    # Bellek ayrı bir turda ölçülür; tracemalloc süreleri bozmasın.
+    tracemalloc.start()
+    items = [model.from_dict(row) for row in rows]
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return memory, from_dict, to_dict
+
+
+def run(entries: int) -> None:
+    rows = _rows(entries)
+    results = {name: _measure(model, rows) for name, model in (("eski", _LegacyEntry), ("slots", VaultEntry))}
+    print(f"{'model':>6} {'bellek MB':>10} {'from_dict s':>12} {'to_dict s':>10}")
+    for name, (memory, from_dict, to_dict) in results.items():
+        print(f"{name:>6} {memory / 2**20:>10.1f} {from_dict:>12.3f} {to_dict:>10.3f}")
+    legacy, slots = results["eski"], results["slots"]
+    print(
+        f"{'kat':>6} {legacy[0] / slots[0]:>10.2f} {legacy[1] / slots[1]:>12.1f} {legacy[2] / slots[2]:>10.1f}"
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=100_000)
+    args = parser.parse_args(argv)
+    run(args.entries)
+
+
+if __name__ == "__main__":
+    main()
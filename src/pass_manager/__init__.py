@@ -1,6 +1,5 @@
 """Kişiye özel gelişmiş şifre yöneticisi."""
 
-from importlib import metadata as _metadata
 from typing import Optional, Sequence
 
 __all__ = ["main", "__version__"]
@@ -13,8 +12,13 @@ def main(argv: Optional[Sequence[str]] = None) -> None:
     _cli_main(argv)
 
 
-try:
-    __version__ = _metadata.version("pass-manager-tanjiro")
-except _metadata.PackageNotFoundError:  # paket kurulmamışsa geliştirme sürümü
-    __version__ = "0.1.0"
+def __getattr__(name: str):
+    # Sürüm bilgisi istenene kadar importlib.metadata yüklenmez (CLI açılışı).
+    if name == "__version__":
+        from importlib import metadata
 
+        try:
+            return metadata.version("pass-manager-tanjiro")
+        except metadata.PackageNotFoundError:  # paket kurulmamışsa geliştirme sürümü
+            return "0.1.0"
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,322 @@
+"""Kilit açma ajanı: açılmış kasayı bellekte tutar, CLI komutları ona sorar.
+
+`pass-manager agent start` ana parolayı bir kez sorar, kasayı açar ve bir
+Unix soketinde dinlemeye başlar (ssh-agent gibi). Sonraki `list/show/add/
+delete/batch` komutları KDF ve tam şifre çözme yapmadan ajana gider.
+
+Güvenlik:
+- Soket yalnızca sahibinin erişebildiği (0700) bir dizinde, 0600 izniyle açılır;
+  Linux'ta ayrıca bağlanan sürecin kullanıcısı (`SO_PEERCRED`) denetlenir.
+- `idle_timeout` boyunca istek gelmezse ya da sistemin uykuya geçtiği fark
+  edilirse ajan anahtarları sıfırlar ve kapanır.
+
+Protokol: satır başına bir JSON istek ve bir JSON yanıt.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import socketserver
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from . import exceptions
+from .exceptions import VaultError
+from .models import Vault, VaultEntry
+
+if TYPE_CHECKING:
+    from .storage import SecureVault
+
+AGENT_DIR = Path(os.environ.get("XDG_RUNTIME_DIR") or Path.home() / ".pass_manager") / "pass-manager-agent"
+DEFAULT_SOCKET_PATH = Path(os.environ.get("PASS_MANAGER_AGENT_SOCK") or AGENT_DIR / "agent.sock")
+IDLE_TIMEOUT_SECONDS = 15 * 60
+# Duvar saati monotonik saatten bu kadar ileri atlarsa sistem uyumuş sayılır.
+SUSPEND_THRESHOLD_SECONDS = 30.0
+POLL_INTERVAL_SECONDS = 1.0
+# Sessiz kalan istemci bağlantıları bu süreden sonra kapatılır.
+CLIENT_TIMEOUT_SECONDS = 60.0
+
+
+def storage_target(storage: Any) -> str:
+    """Ajanın hangi kasayı tuttuğunu belirten anahtar (CLI ile eşleştirilir)."""
+    path = getattr(storage, "path", None)
+    if path is not None:
+        return f"file:{Path(path).resolve()}"
+    return f"api:{storage.api_url}"
+
+
+def _peer_uid(sock: socket.socket) -> Optional[int]:
+    peercred = getattr(socket, "SO_PEERCRED", None)
+    if peercred is None:
+        return None
+    ucred = struct.Struct("3i")
+    _pid, uid, _gid = ucred.unpack(sock.getsockopt(socket.SOL_SOCKET, peercred, ucred.size))
+    return uid
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    timeout = CLIENT_TIMEOUT_SECONDS
+
+    def handle(self) -> None:
+        try:
+            self._serve_lines()
+        except OSError:
+            pass
+
+    def _serve_lines(self) -> None:
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                response = self.server.agent.dispatch(request)
+            except (ValueError, KeyError, TypeError) as exc:
+                response = {"ok": False, "error": "ValueError", "message": str(exc)}
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+            self.wfile.flush()
+            if not self.server.agent.unlocked:
+                return
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    timeout = POLL_INTERVAL_SECONDS
+    daemon_threads = True
+
+    def __init__(self, path: Path, agent: "VaultAgent"):
+        self.agent = agent
+        super().__init__(str(path), _Handler)
+
+    def verify_request(self, request, client_address) -> bool:
+        uid = _peer_uid(request)
+        return uid is None or uid == os.getuid()
+
+
+class VaultAgent:
+    """Açılmış kasayı tutar ve soket isteklerini sırayla yanıtlar.
+
+    Her bağlantı kendi iş parçacığında okunur; istekler tek bir kilit altında
+    işlendiğinden kasa üzerinde eşzamanlı değişiklik olmaz.
+    Kasa dosyası başka bir süreç tarafından değiştirilirse bir sonraki istekte
+    önbellekteki anahtarla (KDF'siz) yeniden okunur.
+    """
+
+    def __init__(
+        self,
+        secure_vault: SecureVault,
+        master_password: str,
+        vault: Vault,
+        socket_path: Optional[Path] = None,
+        idle_timeout: float = IDLE_TIMEOUT_SECONDS,
+    ):
+        self.secure_vault = secure_vault
+        self.master_password: Optional[str] = master_password
+        self.vault: Optional[Vault] = vault
+        self.socket_path = Path(socket_path or DEFAULT_SOCKET_PATH)
+        self.idle_timeout = idle_timeout
+        self.target = storage_target(secure_vault.storage)
+        self._fingerprint = self._storage_fingerprint()
+        self._last_used = time.monotonic()
+        self._clock = (time.monotonic(), time.time())
+        self._server: Optional[_Server] = None
+        self._lock = threading.Lock()
+
+    @property
+    def unlocked(self) -> bool:
+        return self.vault is not None
+
+    def bind(self) -> None:
+        """Soketi oluşturur; aynı yolda çalışan bir ajan varsa hata verir."""
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        os.chmod(self.socket_path.parent, 0o700)
+        if self.socket_path.exists():
+            if AgentClient.connect(self.socket_path) is not None:
+                raise VaultError("Bu sokette zaten çalışan bir ajan var.")
+            self.socket_path.unlink()
+        old_umask = os.umask(0o177)
+        try:
+            self._server = _Server(self.socket_path, self)
+        finally:
+            os.umask(old_umask)
+
+    def serve(self) -> None:
+        """Kilitlenene kadar istekleri yanıtlar."""
+        if self._server is None:
+            self.bind()
+        try:
+            while self.unlocked:
+                self._server.handle_request()
+                self._check_expiry()
+        finally:
+            with self._lock:
+                self.lock()
+            self._server.server_close()
+            self.socket_path.unlink(missing_ok=True)
+
+    def lock(self) -> None:
+        """Kasayı ve anahtarları bellekten atar; ajan döngüsü sonlanır."""
+        self.secure_vault.lock()
+        self.vault = None
+        self.master_password = None
+
+    def _check_expiry(self) -> None:
+        with self._lock:
+            self._check_clocks()
+
+    def _check_clocks(self) -> None:
+        now_monotonic, now_wall = time.monotonic(), time.time()
+        last_monotonic, last_wall = self._clock
+        self._clock = (now_monotonic, now_wall)
+        # Uykuda monotonik saat durur, duvar saati ilerler.
+        if (now_wall - last_wall) - (now_monotonic - last_monotonic) > SUSPEND_THRESHOLD_SECONDS:
+            self.lock()
+        elif now_monotonic - self._last_used > self.idle_timeout:
+            self.lock()
+
+    def _storage_fingerprint(self) -> Optional[Tuple]:
+        storage = self.secure_vault.storage
+        paths = [getattr(storage, "path", None), getattr(storage, "journal_path", None)]
+        if paths[0] is None:
+            return None
+        stats = []
+        for path in paths:
+            try:
+                stat = os.stat(path) if path is not None else None
+            except OSError:
+                stat = None
+            stats.append((stat.st_ino, stat.st_size, stat.st_mtime_ns) if stat else None)
+        return tuple(stats)
+
+    def _refresh(self, mutating: bool) -> None:
+        fingerprint = self._storage_fingerprint()
+        # Dosya dışı (API) depolamada değişiklik ancak kayıttan önce yeniden okunarak görülür.
+        stale = fingerprint != self._fingerprint if fingerprint is not None else mutating
+        if stale:
+            self.vault = self.secure_vault.load_vault(self.master_password)
+            self._fingerprint = self._storage_fingerprint()
+
+    def _save(self) -> None:
+        self.secure_vault.save_vault(self.master_password, self.vault)
+        self._fingerprint = self._storage_fingerprint()
+
+    def dispatch(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            return self._dispatch(request)
+
+    def _dispatch(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        op = request["op"]
+        if op in ("lock", "stop"):
+            self.lock()
+            return {"ok": True}
+        handler = getattr(self, f"_op_{op}", None)
+        if handler is None or not self.unlocked:
+            return {"ok": False, "error": "VaultError", "message": f"Bilinmeyen istek: {op}"}
+        self._last_used = time.monotonic()
+        try:
+            self._refresh(mutating=op in ("add", "delete", "batch"))
+            return {"ok": True, **handler(request)}
+        except VaultError as exc:
+            return {"ok": False, "error": type(exc).__name__, "message": str(exc)}
+
+    def _op_status(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        idle_left = self.idle_timeout - (time.monotonic() - self._last_used)
+        return {"target": self.target, "pid": os.getpid(), "entries": len(self.vault), "idle_left": idle_left}
+
+    def _op_list(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        entries = self.vault.list_entries(keyword=request.get("keyword"))
+        return {"entries": [entry.to_dict() for entry in entries]}
+
+    def _op_get(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        return {"entry": self.vault.get_entry(request["entry_id"]).to_dict()}
+
+    def _op_add(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        entry = self.vault.add_entry(VaultEntry.from_dict(request["entry"]))
+        self._save()
+        return {"entry": entry.to_dict()}
+
+    def _op_delete(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        entry = self.vault.delete_entry(request["entry_id"])
+        self._save()
+        return {"entry": entry.to_dict()}
+
+    def _op_batch(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        from .batch import apply_operations
+
+        try:
+            results = apply_operations(self.vault, request["operations"])
+            self._save()
+        except Exception:
+            # Yarım uygulanmış değişiklikler atılır; diskteki kasa değişmedi.
+            self.vault = self.secure_vault.load_vault(self.master_password)
+            self._fingerprint = self._storage_fingerprint()
+            raise
+        return {"results": results}
+
+
+class AgentClient:
+    """Çalışan ajana bağlantı; `Vault` benzeri yöntemler sunar."""
+
+    def __init__(self, sock: socket.socket):
+        self._sock = sock
+        self._file = sock.makefile("rwb")
+
+    @classmethod
+    def connect(cls, path: Optional[Path] = None, target: Optional[str] = None) -> Optional["AgentClient"]:
+        """Ajana bağlanır; ajan yoksa ya da başka bir kasayı tutuyorsa None."""
+        if not hasattr(socket, "AF_UNIX"):
+            return None
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(str(path or DEFAULT_SOCKET_PATH))
+            client = cls(sock)
+            if target is not None and client.status().get("target") != target:
+                client.close()
+                return None
+            return client
+        except (OSError, VaultError):
+            sock.close()
+            return None
+
+    def call(self, op: str, **params: Any) -> Dict[str, Any]:
+        try:
+            self._file.write(json.dumps({"op": op, **params}).encode("utf-8") + b"\n")
+            self._file.flush()
+            line = self._file.readline()
+        except OSError as exc:
+            raise VaultError(f"Ajan bağlantısı koptu: {exc}") from exc
+        if not line:
+            raise VaultError("Ajan bağlantıyı kapattı.")
+        response = json.loads(line)
+        if not response.get("ok"):
+            error = getattr(exceptions, response.get("error", ""), None)
+            if not (isinstance(error, type) and issubclass(error, VaultError)):
+                error = VaultError
+            raise error(response.get("message", "Ajan isteği başarısız."))
+        return response
+
+    def status(self) -> Dict[str, Any]:
+        return self.call("status")
+
+    def list_entries(self, keyword: Optional[str] = None) -> List[VaultEntry]:
+        return [VaultEntry.from_dict(entry) for entry in self.call("list", keyword=keyword)["entries"]]
+
+    def get_entry(self, entry_id: str) -> VaultEntry:
+        return VaultEntry.from_dict(self.call("get", entry_id=entry_id)["entry"])
+
+    def add_entry(self, entry: VaultEntry) -> VaultEntry:
+        return VaultEntry.from_dict(self.call("add", entry=entry.to_dict())["entry"])
+
+    def delete_entry(self, entry_id: str) -> VaultEntry:
+        return VaultEntry.from_dict(self.call("delete", entry_id=entry_id)["entry"])
+
+    def apply_batch(self, operations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return self.call("batch", operations=operations)["results"]
+
+    def stop(self) -> None:
+        self.call("stop")
+
+    def close(self) -> None:
+        self._file.close()
+        self._sock.close()
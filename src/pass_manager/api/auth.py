@@ -2,50 +2,257 @@
 
 from __future__ import annotations
 
+import asyncio
+import base64
 import hashlib
+import hmac
+import multiprocessing
 import secrets
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
 
 import jwt
 import os
 
+from ..crypto import KDF_FLOORS, KDFS, SALT_SIZE, SCRYPT_NAME, KdfParams, derive_key_with, normalize_kdf
+
 # JWT secret key - production'da environment variable'dan alınmalı
 JWT_SECRET = os.environ.get("JWT_SECRET", secrets.token_urlsafe(32))
 JWT_ALGORITHM = "HS256"
 JWT_EXPIRATION_HOURS = 24 * 7  # 7 gün
+# Doğrulanmış token önbelleği: en fazla bu kadar token, her biri en fazla bu
+# kadar saniye. Süre, başka bir sunucu sürecinde yapılan iptalin bu süreçte
+# fark edilmesi için üst sınırdır.
+TOKEN_CACHE_SIZE = int(os.environ.get("PASS_MANAGER_TOKEN_CACHE_SIZE", 4096))
+TOKEN_CACHE_TTL = float(os.environ.get("PASS_MANAGER_TOKEN_CACHE_TTL", 60))
+
+# Parola özetleri ayrı süreçlerde hesaplanır: en fazla bu kadar süreç ve
+# onların ardında bekleyebilecek en fazla bu kadar iş (aşılırsa 503).
+HASH_WORKERS = int(os.environ.get("PASS_MANAGER_HASH_WORKERS", os.cpu_count() or 1))
+HASH_QUEUE_LIMIT = int(os.environ.get("PASS_MANAGER_HASH_QUEUE", 256))
+# Sunucu parola özeti; kasa KDF'leriyle aynı kayıt defterinden.
+PASSWORD_KDF: KdfParams = KDF_FLOORS[SCRYPT_NAME]
 
 GEORGIA_TZ = timezone(timedelta(hours=4), name="UTC+4")
 
+T = TypeVar("T")
+
+
+def _b64e(data: bytes) -> str:
+    return base64.b64encode(data).decode("ascii")
+
+
+def hash_password(password: str, kdf: Optional[KdfParams] = None) -> str:
+    """Parolayı tuzlu, yavaş bir KDF ile özetler.
 
-def hash_password(password: str) -> str:
-    """Parolayı SHA-256 ile hash'le (PBKDF2 daha iyi ama basitlik için)."""
-    return hashlib.sha256(password.encode("utf-8")).hexdigest()
+    Biçim: `<kdf>$<parametreler>$<tuz>$<özet>`; parametreler kayıtla
+    saklandığı için varsayılan değiştiğinde eski özetler doğrulanmaya devam eder.
+    """
+    kdf = normalize_kdf(kdf or PASSWORD_KDF)
+    salt = secrets.token_bytes(SALT_SIZE)
+    digest = derive_key_with(password, salt, kdf)
+    params = ",".join(f"{field}={kdf[field]}" for field in KDFS[kdf["name"]][1])
+    return "$".join((kdf["name"], params, _b64e(salt), _b64e(digest)))
+
+
+def _parse_hash(password_hash: str) -> Optional[Tuple[KdfParams, bytes, bytes]]:
+    try:
+        name, params, salt, digest = password_hash.split("$")
+        kdf = normalize_kdf({"name": name, **dict(item.split("=", 1) for item in params.split(","))})
+        return kdf, base64.b64decode(salt), base64.b64decode(digest)
+    except (KeyError, ValueError):
+        return None
 
 
 def verify_password(password: str, password_hash: str) -> bool:
-    """Parola doğrulama."""
-    return hash_password(password) == password_hash
+    """Parolayı saklanan özetle sabit zamanlı karşılaştırır.
+
+    Eski kayıtlardaki tuzsuz SHA-256 özetleri de kabul edilir; bunlar
+    `needs_rehash` ile yenilenmelidir.
+    """
+    parsed = _parse_hash(password_hash)
+    if parsed is None:
+        legacy = hashlib.sha256(password.encode("utf-8")).hexdigest()
+        return hmac.compare_digest(legacy, password_hash)
+    kdf, salt, digest = parsed
+    return hmac.compare_digest(derive_key_with(password, salt, kdf), digest)
+
+
+def needs_rehash(password_hash: str) -> bool:
+    """Özet eski biçimdeyse ya da güncel parametrelerle üretilmemişse True."""
+    parsed = _parse_hash(password_hash)
+    return parsed is None or parsed[0] != normalize_kdf(PASSWORD_KDF)
+
+
+class HasherBusy(Exception):
+    """Parola özeti kuyruğu dolu; istek daha sonra yeniden denenmeli."""
+
+
+def _timed(fn: Callable[..., T], *args: Any) -> Tuple[float, float, T]:
+    started = time.time()
+    result = fn(*args)
+    return started, time.time(), result
+
+
+class PasswordHasher:
+    """Parola özetlerini süreç havuzunda hesaplar; olay döngüsü bloklanmaz.
+
+    Aynı anda en fazla `workers` özet hesaplanır, fazlası havuzun kuyruğunda
+    bekler. Bekleyen iş `max_queue`'yu aşarsa `HasherBusy` yükseltilir.
+    Sayaçlar yalnızca olay döngüsünden güncellenir; `metrics` kuyruk
+    derinliğini ve ortalama bekleme/hesaplama sürelerini verir.
+    """
+
+    def __init__(self, workers: int = HASH_WORKERS, max_queue: int = HASH_QUEUE_LIMIT):
+        self.workers = max(1, workers)
+        self.max_queue = max_queue
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.peak_pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self._wait_seconds = 0.0
+        self._work_seconds = 0.0
 
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # "spawn": sunucunun iş parçacıkları ve açık bağlantıları çatallanmaz.
+                self._executor = ProcessPoolExecutor(
+                    self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
 
-def create_token(username: str) -> str:
-    """JWT token oluştur."""
+    @property
+    def queue_depth(self) -> int:
+        return max(0, self.pending - self.workers)
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        if self.queue_depth >= self.max_queue:
+            self.rejected += 1
+            raise HasherBusy("Parola doğrulama kuyruğu dolu")
+        loop = asyncio.get_running_loop()
+        submitted = time.time()
+        self.pending += 1
+        self.peak_pending = max(self.peak_pending, self.pending)
+        try:
+            started, finished, result = await loop.run_in_executor(self._get_executor(), _timed, fn, *args)
+        finally:
+            self.pending -= 1
+        self.completed += 1
+        self._wait_seconds += max(0.0, started - submitted)
+        self._work_seconds += finished - started
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self.run(hash_password, password)
+
+    async def verify(self, password: str, password_hash: str) -> bool:
+        return await self.run(verify_password, password, password_hash)
+
+    def metrics(self) -> Dict[str, Any]:
+        done = self.completed or 1
+        return {
+            "workers": self.workers,
+            "pending": self.pending,
+            "queue_depth": self.queue_depth,
+            "peak_pending": self.peak_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self._wait_seconds / done * 1000, 2),
+            "avg_hash_ms": round(self._work_seconds / done * 1000, 2),
+        }
+
+    def close(self) -> None:
+        """Havuzu kapatır; sonraki bir çağrı yeni bir havuz başlatır."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+@dataclass(frozen=True)
+class TokenUser:
+    """Doğrulanmış token'ın taşıdığı kimlik."""
+    user_id: int
+    username: str
+    version: int
+    expires_at: float
+
+
+def create_token(username: str, user_id: int, version: int = 0) -> str:
+    """JWT token oluştur.
+
+    `sub` kullanıcı kimliğini, `ver` kullanıcının token sürümünü taşır;
+    sürüm artırılınca önceki token'lar geçersiz olur.
+    """
     now = datetime.now(GEORGIA_TZ)
     payload = {
+        "sub": str(user_id),
         "username": username,
+        "ver": version,
         "iat": int(now.timestamp()),
         "exp": int((now + timedelta(hours=JWT_EXPIRATION_HOURS)).timestamp()),
     }
     return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
 
 
-def verify_token(token: str) -> Optional[str]:
-    """JWT token doğrula ve username döndür."""
+def decode_token(token: str) -> Optional[dict]:
+    """JWT imzasını ve süresini doğrula; geçersizse None."""
     try:
-        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-        return payload.get("username")
-    except jwt.ExpiredSignatureError:
-        return None
+        return jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM], options={"require": ["exp"]})
     except jwt.InvalidTokenError:
         return None
 
+
+class TokenCache:
+    """Doğrulanmış token → `TokenUser`; LRU sınırı ve TTL ile.
+
+    İsabet halinde imza doğrulanmaz ve veritabanına gidilmez. Kayıt token'ın
+    kendi süresi, önbellek TTL'i ya da o kullanıcı için bilinen en düşük
+    geçerli sürüm (`revoke`) aşılınca düşer. Yalnızca olay döngüsünden
+    kullanılır.
+    """
+
+    def __init__(self, max_size: int = TOKEN_CACHE_SIZE, ttl: float = TOKEN_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[TokenUser, float]]" = OrderedDict()
+        self._min_versions: Dict[int, int] = {}
+
+    def get(self, token: str, now: Optional[float] = None) -> Optional[TokenUser]:
+        entry = self._entries.get(token)
+        if entry is None:
+            return None
+        user, stale_at = entry
+        now = time.time() if now is None else now
+        if now >= stale_at or user.version < self._min_versions.get(user.user_id, 0):
+            del self._entries[token]
+            return None
+        self._entries.move_to_end(token)
+        return user
+
+    def put(self, token: str, user: TokenUser, now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        self._entries[token] = (user, min(user.expires_at, now + self.ttl))
+        self._entries.move_to_end(token)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def revoke(self, user_id: int, version: int) -> None:
+        """`version`'dan eski token'ları bu süreçte hemen geçersiz kılar."""
+        self._min_versions[user_id] = max(version, self._min_versions.get(user_id, 0))
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._min_versions.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
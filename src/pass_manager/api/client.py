@@ -3,24 +3,75 @@
 from __future__ import annotations
 
 import json
+import os
+import threading
 from pathlib import Path
 from typing import Optional
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 DEFAULT_CONFIG_PATH = Path.home() / ".pass_manager" / "api_config.json"
 
+# Geçici hatalarda (bağlantı, 429/502/503/504) yeniden deneme sayısı ve
+# denemeler arası üstel bekleme çarpanı (saniye).
+HTTP_RETRIES = int(os.environ.get("PASS_MANAGER_HTTP_RETRIES", 3))
+HTTP_BACKOFF = float(os.environ.get("PASS_MANAGER_HTTP_BACKOFF", 0.3))
+HTTP_POOL_SIZE = 4
+
+_shared_session: Optional[requests.Session] = None
+_shared_lock = threading.Lock()
+
+
+def create_session(
+    retries: int = HTTP_RETRIES,
+    backoff: float = HTTP_BACKOFF,
+    pool_size: int = HTTP_POOL_SIZE,
+) -> requests.Session:
+    """Bağlantıları canlı tutan, yeniden deneyen bir HTTP oturumu.
+
+    Durum kodu ya da okuma hatasıyla yalnızca GET ve HEAD yeniden denenir.
+    PUT/POST yalnızca bağlantı kurulamadığında tekrarlanır: sunucu `If-Match`
+    ile gelen yazmayı kaydedip 502/504 döndürmüş olabilir; aynı revizyonla
+    tekrarlamak sahte bir 409 çakışması üretir.
+    """
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=(429, 502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=pool_size, pool_maxsize=pool_size)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["Accept-Encoding"] = "gzip, deflate"
+    return session
+
+
+def shared_session() -> requests.Session:
+    """Süreç genelinde paylaşılan oturum; aynı sunucuya tek bağlantı havuzu."""
+    global _shared_session
+    with _shared_lock:
+        if _shared_session is None:
+            _shared_session = create_session()
+        return _shared_session
+
 
 class APIClient:
     """API client sınıfı."""
 
-    def __init__(self, api_url: str):
+    def __init__(self, api_url: str, session: Optional[requests.Session] = None):
         self.api_url = api_url.rstrip("/")
         self.token: Optional[str] = None
+        self.session = session or shared_session()
 
     def register(self, username: str, password: str) -> dict:
         """Yeni kullanıcı kaydı."""
-        response = requests.post(
+        response = self.session.post(
             f"{self.api_url}/api/v1/auth/register",
             json={"username": username, "password": password},
             timeout=10,
@@ -32,7 +83,7 @@ class APIClient:
 
     def login(self, username: str, password: str) -> dict:
         """Kullanıcı girişi."""
-        response = requests.post(
+        response = self.session.post(
             f"{self.api_url}/api/v1/auth/login",
             json={"username": username, "password": password},
             timeout=10,
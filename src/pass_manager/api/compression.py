@@ -0,0 +1,98 @@
+"""Vault uçları için HTTP içerik sıkıştırması (gzip; kuruluysa zstd).
+
+Kayıtlar zarfın içinde şifrelenmeden önce sıkıştırılır (bkz. `codec`);
+şifreli metin sıkışmaz. Burada kazanılan, JSON ve base64 katmanının
+fazlalığıdır.
+"""
+
+from __future__ import annotations
+
+import gzip
+import zlib
+from typing import Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:  # isteğe bağlı bağımlılık
+    zstandard = None
+
+GZIP = "gzip"
+ZSTD = "zstd"
+# Bundan küçük gövdeler sıkıştırılmaz; kazanç başlık ve CPU maliyetini karşılamaz.
+MIN_COMPRESS_BYTES = 1024
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+_GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+
+def supported_encodings() -> Tuple[str, ...]:
+    """Tercih sırasıyla desteklenen kodlamalar."""
+    return (ZSTD, GZIP) if zstandard is not None else (GZIP,)
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """`Accept-Encoding` değerine göre desteklenen en iyi kodlamayı seçer."""
+    if not accept_encoding:
+        return None
+    weights = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.partition(";")
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name.strip().lower()] = weight
+    for encoding in supported_encodings():
+        if weights.get(encoding, weights.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+def compressor(encoding: str):
+    """Parça parça sıkıştırmak için `compress`/`flush` sunan nesne."""
+    if encoding == GZIP:
+        return zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, _GZIP_WBITS)
+    if encoding == ZSTD and zstandard is not None:
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+    raise ValueError(f"Desteklenmeyen kodlama: {encoding}")
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == GZIP:
+        return gzip.compress(data, GZIP_LEVEL, mtime=0)
+    if encoding == ZSTD and zstandard is not None:
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    raise ValueError(f"Desteklenmeyen kodlama: {encoding}")
+
+
+def decompress(data: bytes, encoding: str, limit: int) -> bytes:
+    """Gövdeyi açar; en fazla `limit + 1` bayt üretir.
+
+    Dönen değer `limit`'ten uzunsa gövde sınırı aşıyordur; sıkıştırma
+    bombası bellekte tamamen açılmaz. Bozuk veri `ValueError` yükseltir.
+    """
+    if encoding == GZIP:
+        decoder = zlib.decompressobj(_GZIP_WBITS)
+        try:
+            out = decoder.decompress(data, limit + 1)
+        except zlib.error as exc:
+            raise ValueError(str(exc)) from exc
+        if len(out) <= limit and not decoder.eof:
+            raise ValueError("Sıkıştırılmış gövde eksik")
+        return out
+    if encoding == ZSTD and zstandard is not None:
+        try:
+            out = bytearray()
+            with zstandard.ZstdDecompressor().stream_reader(data) as reader:
+                while len(out) <= limit:
+                    chunk = reader.read(limit + 1 - len(out))
+                    if not chunk:
+                        break
+                    out += chunk
+            return bytes(out)
+        except zstandard.ZstdError as exc:
+            raise ValueError(str(exc)) from exc
+    raise ValueError(f"Desteklenmeyen kodlama: {encoding}")
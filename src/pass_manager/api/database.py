@@ -2,12 +2,225 @@
 
 from __future__ import annotations
 
+import asyncio
+import json
+import logging
+import os
 import sqlite3
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
+from functools import partial
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, TypeVar
 
-DATABASE_PATH = Path.home() / ".pass_manager" / "server.db"
+from ..storage import apply_changes
+
+DATABASE_PATH = Path(
+    os.environ.get("PASS_MANAGER_DB", Path.home() / ".pass_manager" / "server.db")
+)
+# Veritabanı iş parçacığı sayısı; aynı anda en fazla bu kadar sorgu çalışır.
+DB_WORKERS = int(os.environ.get("DB_WORKERS", 8))
+# Anlık görüntüye katlanmamış kayıt sayısı bunu aşınca artımlı yazma onları
+# katlar; altında katlama arka plandaki işe kalır ve yazma değişiklikle orantılıdır.
+COMPACT_PENDING_RECORDS = int(os.environ.get("PASS_MANAGER_COMPACT_PENDING", 256))
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+# Her bağlantıda uygulanan ayarlar. WAL kipinde okuyucular yazıcıyı beklemez;
+# synchronous=NORMAL WAL ile birlikte çökme güvenliğini korur.
+CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -16000",
+    "PRAGMA mmap_size = 268435456",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA busy_timeout = 5000",
+)
+CACHED_STATEMENTS = 256
+
+# Sorgular modül sabitleridir; aynı metin her bağlantının hazır ifade önbelleğinden gelir.
+SELECT_USER = "SELECT id, password_hash, token_version FROM users WHERE username = ?"
+SELECT_USER_ID = "SELECT id FROM users WHERE username = ?"
+SELECT_TOKEN_VERSION = "SELECT token_version FROM users WHERE id = ?"
+INSERT_USER = "INSERT INTO users (username, password_hash, created_at) VALUES (?, ?, ?)"
+UPDATE_LAST_LOGIN = "UPDATE users SET last_login = ? WHERE id = ?"
+UPDATE_PASSWORD_HASH = "UPDATE users SET password_hash = ? WHERE id = ?"
+# Kullanıcının tüm token'larını geçersiz kılar; yeni sürüm döner.
+BUMP_TOKEN_VERSION = "UPDATE users SET token_version = token_version + 1 WHERE id = ? RETURNING token_version"
+# Vault sorguları kullanıcı kimliğiyle (token'daki `sub`) çalışır; kullanıcı
+# adından kimliğe ayrıca çevrilmez.
+SELECT_USER_VAULT = """
+    SELECT u.id AS user_id, v.encrypted_envelope, v.updated_at, v.revision, v.snapshot_revision
+    FROM users AS u LEFT JOIN vaults AS v ON v.user_id = u.id
+    WHERE u.id = ?
+"""
+SELECT_VAULT_REVISION = """
+    SELECT u.id AS user_id, v.revision
+    FROM users AS u LEFT JOIN vaults AS v ON v.user_id = u.id
+    WHERE u.id = ?
+"""
+# Tek ifadede ekle ya da güncelle. `:expected` NULL ise koşulsuz yazılır;
+# aksi halde yalnızca sunucudaki revizyon beklenene eşitse (vault yoksa 0).
+# Satır dönmezse kullanıcı yoktur ya da revizyon çakışmıştır.
+UPSERT_VAULT = """
+    INSERT INTO vaults (
+        user_id, encrypted_envelope, created_at, updated_at, revision, snapshot_revision, base_revision
+    )
+    SELECT id, :envelope, :timestamp, :timestamp, 1, 1, 1 FROM users
+    WHERE id = :user_id
+        AND (:expected IS NULL OR :expected = 0 OR id IN (SELECT user_id FROM vaults))
+    ON CONFLICT(user_id) DO UPDATE SET
+        encrypted_envelope = excluded.encrypted_envelope,
+        updated_at = excluded.updated_at,
+        revision = vaults.revision + 1,
+        snapshot_revision = vaults.revision + 1,
+        base_revision = vaults.revision + 1
+    WHERE :expected IS NULL OR vaults.revision = :expected
+    RETURNING user_id, revision
+"""
+
+# Artımlı eşitleme: kayıt başına şifreli veri, son değiştiği revizyonla
+# `vault_records` tablosunda tutulur (silinenler için `data` NULL). Zarfın
+# kayıtlar dışındaki kısmı (başlık) ayrılmış kimlikli bir kayıttır.
+# `snapshot_revision`, `encrypted_envelope` anlık görüntüsünün hangi
+# revizyona kadar katlandığını; `base_revision` ise "şu revizyondan beri
+# değişenler" sorusunun yanıtlanabildiği en eski revizyonu gösterir.
+HEADER_RECORD_ID = ""
+DELETE_RECORDS = "DELETE FROM vault_records WHERE user_id = ?"
+BUMP_VAULT_REVISION = """
+    UPDATE vaults SET revision = revision + 1, updated_at = :timestamp
+    WHERE user_id = :user_id AND (:expected IS NULL OR revision = :expected)
+    RETURNING user_id, revision, snapshot_revision
+"""
+UPSERT_RECORD = """
+    INSERT INTO vault_records (user_id, record_id, revision, data, updated_at)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(user_id, record_id) DO UPDATE SET
+        revision = excluded.revision,
+        data = excluded.data,
+        updated_at = excluded.updated_at
+"""
+SELECT_VAULT_STATE = """
+    SELECT u.id AS user_id, v.revision, v.base_revision
+    FROM users AS u LEFT JOIN vaults AS v ON v.user_id = u.id
+    WHERE u.id = ?
+"""
+SELECT_RECORDS_SINCE = "SELECT record_id, data FROM vault_records WHERE user_id = ? AND revision > ?"
+COUNT_RECORDS_SINCE = "SELECT count(*) FROM vault_records WHERE user_id = ? AND revision > ?"
+SELECT_SNAPSHOT = "SELECT encrypted_envelope, revision, snapshot_revision FROM vaults WHERE user_id = ?"
+UPDATE_SNAPSHOT = "UPDATE vaults SET encrypted_envelope = ?, snapshot_revision = ? WHERE user_id = ?"
+PRUNE_TOMBSTONES = """
+    DELETE FROM vault_records WHERE user_id = ? AND data IS NULL AND updated_at < ?
+    RETURNING revision
+"""
+RAISE_BASE_REVISION = "UPDATE vaults SET base_revision = max(base_revision, ?) WHERE user_id = ?"
+SELECT_COMPACTION_CANDIDATES = """
+    SELECT user_id FROM vaults WHERE snapshot_revision < revision
+    UNION
+    SELECT user_id FROM vault_records WHERE data IS NULL AND updated_at < ?
+"""
+
+
+def _merge_records(envelope_data: Any, records: Iterable[sqlite3.Row]) -> bytes:
+    """Saklanan zarfa sonraki kayıtları uygulayıp yeniden serileştirir.
+
+    Zarf JSON nesnesi değilse `ValueError`.
+    """
+    envelope = json.loads(envelope_data)
+    if not isinstance(envelope, dict):
+        raise ValueError("Saklanan zarf bir JSON nesnesi değil")
+    header, upserts, deletes = None, {}, []
+    for row in records:
+        if row["record_id"] == HEADER_RECORD_ID:
+            header = json.loads(row["data"])
+        elif row["data"] is None:
+            deletes.append(row["record_id"])
+        else:
+            upserts[row["record_id"]] = json.loads(row["data"])
+    apply_changes(envelope, header, upserts, deletes)
+    return json.dumps(envelope, separators=(",", ":")).encode("utf-8")
+
+
+def _fold_records(conn: sqlite3.Connection, user_id: int) -> None:
+    """Anlık görüntüden sonraki kayıtları zarfa katlar (açık yazma işlemi içinde)."""
+    snapshot = conn.execute(SELECT_SNAPSHOT, (user_id,)).fetchone()
+    if snapshot is None or snapshot["snapshot_revision"] >= snapshot["revision"]:
+        return
+    records = conn.execute(SELECT_RECORDS_SINCE, (user_id, snapshot["snapshot_revision"]))
+    data = _merge_records(snapshot["encrypted_envelope"], records)
+    conn.execute(UPDATE_SNAPSHOT, (data, snapshot["revision"], user_id))
+
+
+class RevisionConflict(Exception):
+    """Kaydedilmek istenen vault sunucudakinden eski bir revizyona dayanıyor."""
+
+    def __init__(self, current: int):
+        super().__init__(f"Vault revizyonu çakıştı (sunucudaki: {current})")
+        self.current = current
+
+
+class ConnectionPool:
+    """İş parçacığı başına kalıcı SQLite bağlantıları.
+
+    Her iş parçacığı ilk kullanımda kendi bağlantısını açar ve sonraki
+    isteklerde onu yeniden kullanır; bağlantı açma, pragma ve şema okuma
+    maliyeti istek başına değil iş parçacığı başına bir kez ödenir. Bağlantı
+    sayısı sunucunun iş parçacığı sayısıyla sınırlıdır; sonlanan iş
+    parçacıklarının bağlantıları yeni bağlantı açılırken kapatılır.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: Dict[int, Tuple[weakref.ref, sqlite3.Connection]] = {}
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            str(self.db_path),
+            isolation_level=None,
+            cached_statements=CACHED_STATEMENTS,
+            # Yalnızca `close_all` başka iş parçacığından kapatabilsin diye.
+            check_same_thread=False,
+        )
+        conn.row_factory = sqlite3.Row
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def get(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            return conn
+        conn = self._open()
+        thread = threading.current_thread()
+        with self._lock:
+            self._prune()
+            self._connections[id(conn)] = (weakref.ref(thread), conn)
+        self._local.conn = conn
+        return conn
+
+    def _prune(self) -> None:
+        for key, (thread_ref, conn) in list(self._connections.items()):
+            thread = thread_ref()
+            if thread is None or not thread.is_alive():
+                del self._connections[key]
+                conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._connections)
+
+    def close_all(self) -> None:
+        with self._lock:
+            for _, conn in self._connections.values():
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
 
 
 class Database:
@@ -16,47 +229,358 @@ class Database:
     def __init__(self, db_path: Optional[Path] = None):
         self.db_path = db_path or DATABASE_PATH
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.pool = ConnectionPool(self.db_path)
         self._init_db()
 
     def _init_db(self) -> None:
         """Veritabanı tablolarını oluştur."""
         with self.connection() as conn:
+            # WAL kipi veritabanı dosyasında kalıcıdır; bir kez ayarlamak yeter.
+            conn.execute("PRAGMA journal_mode = WAL")
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS users (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     username TEXT UNIQUE NOT NULL,
                     password_hash TEXT NOT NULL,
                     created_at TEXT NOT NULL,
-                    last_login TEXT
+                    last_login TEXT,
+                    token_version INTEGER NOT NULL DEFAULT 0
                 )
             """)
+            user_columns = {row["name"] for row in conn.execute("PRAGMA table_info(users)")}
+            if "token_version" not in user_columns:
+                conn.execute("ALTER TABLE users ADD COLUMN token_version INTEGER NOT NULL DEFAULT 0")
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS vaults (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     user_id INTEGER NOT NULL,
-                    encrypted_envelope TEXT NOT NULL,
+                    encrypted_envelope BLOB NOT NULL,
                     created_at TEXT NOT NULL,
                     updated_at TEXT NOT NULL,
+                    revision INTEGER NOT NULL DEFAULT 1,
                     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
                     UNIQUE(user_id)
                 )
             """)
-            conn.commit()
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(vaults)")}
+            if "revision" not in columns:
+                # Eski şemadaki vault'lar revizyon 1 ile başlar.
+                conn.execute("ALTER TABLE vaults ADD COLUMN revision INTEGER NOT NULL DEFAULT 1")
+            for column in ("snapshot_revision", "base_revision"):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE vaults ADD COLUMN {column} INTEGER NOT NULL DEFAULT 1")
+                    conn.execute(f"UPDATE vaults SET {column} = revision")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS vault_records (
+                    user_id INTEGER NOT NULL,
+                    record_id TEXT NOT NULL,
+                    revision INTEGER NOT NULL,
+                    data BLOB,
+                    updated_at TEXT NOT NULL,
+                    PRIMARY KEY (user_id, record_id),
+                    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+                ) WITHOUT ROWID
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS vault_records_revision ON vault_records (user_id, revision)"
+            )
 
     @contextmanager
-    def connection(self):
-        """Veritabanı bağlantısı context manager."""
-        conn = sqlite3.connect(str(self.db_path))
-        conn.row_factory = sqlite3.Row
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """İş parçacığının havuzdaki bağlantısı; blok sonunda kapatılmaz."""
+        conn = self.pool.get()
         try:
             yield conn
         finally:
-            conn.close()
+            if conn.in_transaction:
+                # Yarım kalan işlem bir sonraki isteğe sızmasın.
+                conn.rollback()
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Yazma işlemi; hata olursa geri alınır."""
+        with self.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            conn.commit()
 
     def execute(self, query: str, params: tuple = ()) -> sqlite3.Cursor:
         """Query çalıştır ve cursor döndür."""
         with self.connection() as conn:
-            cursor = conn.execute(query, params)
-            conn.commit()
-            return cursor
+            return conn.execute(query, params)
+
+    def close(self) -> None:
+        self.pool.close_all()
+
+    def get_user(self, username: str) -> Optional[sqlite3.Row]:
+        with self.connection() as conn:
+            return conn.execute(SELECT_USER, (username,)).fetchone()
+
+    def get_user_id(self, username: str) -> Optional[int]:
+        with self.connection() as conn:
+            row = conn.execute(SELECT_USER_ID, (username,)).fetchone()
+            return row["id"] if row else None
+
+    def create_user(self, username: str, password_hash: str, created_at: str) -> Optional[int]:
+        """Kullanıcıyı ekler ve kimliğini döndürür; kullanıcı adı alınmışsa None."""
+        try:
+            with self.transaction() as conn:
+                return conn.execute(INSERT_USER, (username, password_hash, created_at)).lastrowid
+        except sqlite3.IntegrityError:
+            return None
+
+    def record_login(self, user_id: int, timestamp: str) -> None:
+        with self.transaction() as conn:
+            conn.execute(UPDATE_LAST_LOGIN, (timestamp, user_id))
+
+    def update_password_hash(self, user_id: int, password_hash: str) -> None:
+        with self.transaction() as conn:
+            conn.execute(UPDATE_PASSWORD_HASH, (password_hash, user_id))
+
+    def get_token_version(self, user_id: int) -> Optional[int]:
+        """Kullanıcının geçerli token sürümü; kullanıcı yoksa None."""
+        with self.connection() as conn:
+            row = conn.execute(SELECT_TOKEN_VERSION, (user_id,)).fetchone()
+            return row["token_version"] if row else None
+
+    def revoke_tokens(self, user_id: int) -> Optional[int]:
+        """Token sürümünü artırır; önceki tüm token'lar geçersiz olur."""
+        with self.transaction() as conn:
+            row = conn.execute(BUMP_TOKEN_VERSION, (user_id,)).fetchone()
+            return row["token_version"] if row else None
+
+    def get_user_vault(self, user_id: int) -> Optional[Mapping[str, Any]]:
+        """Kullanıcıyı ve vault'unu güncel revizyonuyla getirir; hiçbir şey yazmaz.
+
+        Anlık görüntüye henüz katlanmamış kayıtlar yanıt için bellekte
+        uygulanır (saklanan zarf JSON nesnesi değilse `ValueError`). Kullanıcı
+        yoksa None; vault yoksa `encrypted_envelope` alanı None olan satır döner.
+        """
+        with self.connection() as conn:
+            # Anlık görüntü ve kayıtlar aynı okuma işleminden gelsin.
+            conn.execute("BEGIN")
+            row = conn.execute(SELECT_USER_VAULT, (user_id,)).fetchone()
+            if not row or row["encrypted_envelope"] is None or row["snapshot_revision"] >= row["revision"]:
+                return row
+            records = conn.execute(SELECT_RECORDS_SINCE, (user_id, row["snapshot_revision"])).fetchall()
+        return {**dict(row), "encrypted_envelope": _merge_records(row["encrypted_envelope"], records)}
+
+    def get_vault_revision(self, user_id: int) -> Optional[sqlite3.Row]:
+        """Vault gövdesini okumadan revizyonunu getirir (koşullu GET için).
+
+        Kullanıcı yoksa None; vault yoksa `revision` alanı None olan satır döner.
+        """
+        with self.connection() as conn:
+            return conn.execute(SELECT_VAULT_REVISION, (user_id,)).fetchone()
+
+    def save_user_vault(
+        self,
+        user_id: int,
+        envelope: bytes,
+        timestamp: str,
+        expected_revision: Optional[int] = None,
+    ) -> Optional[int]:
+        """Vault'u tek ifadede kaydeder ve yeni revizyonu döndürür.
+
+        Zarf içeriğine bakılmadan BLOB olarak saklanır. Kullanıcı yoksa None döner. `expected_revision` verilmiş ve sunucudaki
+        revizyondan farklıysa `RevisionConflict` yükseltilir.
+        """
+        params = {
+            "envelope": envelope,
+            "timestamp": timestamp,
+            "user_id": user_id,
+            "expected": expected_revision,
+        }
+        with self.transaction() as conn:
+            row = conn.execute(UPSERT_VAULT, params).fetchone()
+            if row:
+                # Tam zarf önceki artımlı kayıtların yerini alır.
+                conn.execute(DELETE_RECORDS, (row["user_id"],))
+                return row["revision"]
+            # Yalnızca başarısız yazmada: nedenini aynı işlem içinde ayırt et.
+            current = conn.execute(SELECT_VAULT_REVISION, (user_id,)).fetchone()
+        if not current:
+            return None
+        raise RevisionConflict(current["revision"] or 0)
+
+    def save_vault_changes(
+        self,
+        user_id: int,
+        header: Optional[bytes],
+        upserts: Dict[str, bytes],
+        deletes: Iterable[str],
+        timestamp: str,
+        expected_revision: Optional[int] = None,
+    ) -> Optional[int]:
+        """Yalnızca değişen kayıtları yeni bir revizyonla yazar.
+
+        Kayıtlar ayrıştırılmadan saklanır; katlanmamış kayıt sayısı
+        `COMPACT_PENDING_RECORDS` değerine ulaşınca anlık görüntüye katlanır.
+        Vault henüz yoksa ya da revizyon tutmazsa `RevisionConflict`;
+        kullanıcı yoksa None.
+        """
+        params = {"timestamp": timestamp, "user_id": user_id, "expected": expected_revision}
+        with self.transaction() as conn:
+            row = conn.execute(BUMP_VAULT_REVISION, params).fetchone()
+            if row:
+                revision = row["revision"]
+                records = [(user_id, record_id, revision, data, timestamp) for record_id, data in upserts.items()]
+                records += [(user_id, record_id, revision, None, timestamp) for record_id in deletes]
+                if header is not None:
+                    records.append((user_id, HEADER_RECORD_ID, revision, header, timestamp))
+                conn.executemany(UPSERT_RECORD, records)
+                pending = conn.execute(COUNT_RECORDS_SINCE, (user_id, row["snapshot_revision"])).fetchone()[0]
+                if pending >= COMPACT_PENDING_RECORDS:
+                    try:
+                        _fold_records(conn, user_id)
+                    except ValueError:
+                        logger.warning("Vault %s anlık görüntüsü okunamadı; katlama atlandı", user_id)
+                return revision
+            current = conn.execute(SELECT_VAULT_REVISION, (user_id,)).fetchone()
+        if not current:
+            return None
+        raise RevisionConflict(current["revision"] or 0)
+
+    def get_vault_changes(
+        self, user_id: int, since: int
+    ) -> Optional[Tuple[int, Optional[List[sqlite3.Row]]]]:
+        """`since` revizyonundan sonra değişen kayıtlar: (revizyon, satırlar).
+
+        Satırlar None ise istemci tam zarfı almalıdır (`since` sıkıştırılmış ya
+        da tam kayıtla geçersiz kalmış). Kullanıcı yoksa None döner.
+        """
+        with self.connection() as conn:
+            # İki sorgu aynı anlık görüntüyü görsün.
+            conn.execute("BEGIN")
+            state = conn.execute(SELECT_VAULT_STATE, (user_id,)).fetchone()
+            if not state:
+                return None
+            revision = state["revision"] or 0
+            if since == revision:
+                return revision, []
+            if state["revision"] is None or not state["base_revision"] <= since < revision:
+                return revision, None
+            return revision, conn.execute(SELECT_RECORDS_SINCE, (user_id, since)).fetchall()
+
+    def compact_vault(self, user_id: int, tombstones_before: Optional[str] = None) -> None:
+        """Katlanmamış kayıtları anlık görüntüye katlar; eski silme kayıtlarını atar.
+
+        Anlık görüntü okunamazsa vault atlanır; silme kayıtları da korunur.
+        """
+        with self.transaction() as conn:
+            try:
+                _fold_records(conn, user_id)
+            except ValueError:
+                logger.warning("Vault %s anlık görüntüsü okunamadı; sıkıştırma atlandı", user_id)
+                return
+            if tombstones_before is not None:
+                pruned = [row[0] for row in conn.execute(PRUNE_TOMBSTONES, (user_id, tombstones_before))]
+                if pruned:
+                    # Bu silmeleri göremeyecek istemciler tam zarfı almalı.
+                    conn.execute(RAISE_BASE_REVISION, (max(pruned), user_id))
+
+    def compact_vaults(self, tombstones_before: str) -> int:
+        """Katlanmamış değişikliği ya da eski silme kaydı olan vault'ları sıkıştırır."""
+        with self.connection() as conn:
+            user_ids = [row[0] for row in conn.execute(SELECT_COMPACTION_CANDIDATES, (tombstones_before,))]
+        for user_id in user_ids:
+            self.compact_vault(user_id, tombstones_before)
+        return len(user_ids)
+
+
+class AsyncDatabase:
+    """`Database` işlemlerini olay döngüsünü bloklamadan çalıştırır.
+
+    Sorgular sabit boyutlu, yalnızca veritabanına ayrılmış bir iş parçacığı
+    havuzunda çalışır; eşzamanlılık `max_workers` ile sınırlıdır ve fazlası
+    kuyrukta bekler. Her iş parçacığı havuzdaki kendi bağlantısını kullanır.
+    """
+
+    def __init__(self, db: Database, max_workers: int = DB_WORKERS):
+        self.db = db
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    self.max_workers, thread_name_prefix="pass-manager-db"
+                )
+            return self._executor
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), partial(fn, *args))
+
+    async def get_user(self, username: str) -> Optional[sqlite3.Row]:
+        return await self.run(self.db.get_user, username)
+
+    async def get_user_id(self, username: str) -> Optional[int]:
+        return await self.run(self.db.get_user_id, username)
+
+    async def create_user(self, username: str, password_hash: str, created_at: str) -> Optional[int]:
+        return await self.run(self.db.create_user, username, password_hash, created_at)
+
+    async def record_login(self, user_id: int, timestamp: str) -> None:
+        await self.run(self.db.record_login, user_id, timestamp)
+
+    async def update_password_hash(self, user_id: int, password_hash: str) -> None:
+        await self.run(self.db.update_password_hash, user_id, password_hash)
+
+    async def get_token_version(self, user_id: int) -> Optional[int]:
+        return await self.run(self.db.get_token_version, user_id)
+
+    async def revoke_tokens(self, user_id: int) -> Optional[int]:
+        return await self.run(self.db.revoke_tokens, user_id)
+
+    async def get_user_vault(self, user_id: int) -> Optional[Mapping[str, Any]]:
+        return await self.run(self.db.get_user_vault, user_id)
+
+    async def get_vault_revision(self, user_id: int) -> Optional[sqlite3.Row]:
+        return await self.run(self.db.get_vault_revision, user_id)
+
+    async def save_user_vault(
+        self,
+        user_id: int,
+        envelope: bytes,
+        timestamp: str,
+        expected_revision: Optional[int] = None,
+    ) -> Optional[int]:
+        return await self.run(
+            self.db.save_user_vault, user_id, envelope, timestamp, expected_revision
+        )
+
+    async def save_vault_changes(
+        self,
+        user_id: int,
+        header: Optional[bytes],
+        upserts: Dict[str, bytes],
+        deletes: Iterable[str],
+        timestamp: str,
+        expected_revision: Optional[int] = None,
+    ) -> Optional[int]:
+        return await self.run(
+            self.db.save_vault_changes, user_id, header, upserts, deletes, timestamp, expected_revision
+        )
+
+    async def get_vault_changes(
+        self, user_id: int, since: int
+    ) -> Optional[Tuple[int, Optional[List[sqlite3.Row]]]]:
+        return await self.run(self.db.get_vault_changes, user_id, since)
+
+    async def compact_vaults(self, tombstones_before: str) -> int:
+        return await self.run(self.db.compact_vaults, tombstones_before)
 
+    def close(self) -> None:
+        """Havuzu kapatır; sonraki bir çağrı yeni bir havuz başlatır."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+        self.db.close()
@@ -2,30 +2,81 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
+import logging
+import os
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone, timedelta
-from typing import Optional
+from typing import AsyncIterator, Awaitable, Optional, TypeVar
 
-from fastapi import FastAPI, HTTPException, Depends, Header
+from fastapi import FastAPI, HTTPException, Depends, Header, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from pydantic import TypeAdapter, ValidationError
+from fastapi.responses import FileResponse, StreamingResponse
 from pathlib import Path
 
-from .auth import hash_password, verify_password, create_token, verify_token
-from .database import Database
+from .auth import HasherBusy, PasswordHasher, TokenCache, TokenUser, create_token, decode_token, needs_rehash
+from .compression import (
+    MIN_COMPRESS_BYTES,
+    choose_encoding,
+    compress,
+    compressor,
+    decompress,
+    supported_encodings,
+)
+from .database import HEADER_RECORD_ID, AsyncDatabase, Database, RevisionConflict
 from .models import (
     UserCreate,
     UserLogin,
+    VaultChangesRequest,
     VaultEnvelopeRequest,
-    VaultEnvelopeResponse,
 )
 
+T = TypeVar("T")
+
+security = HTTPBearer()
+db = Database()
+# Uç noktalar veritabanına yalnızca bu katman üzerinden, `await` ile erişir.
+adb = AsyncDatabase(db)
+# Parola özetleri olay döngüsünde değil, ayrı süreçlerde hesaplanır.
+hasher = PasswordHasher()
+
+
+logger = logging.getLogger(__name__)
+
+# Artımlı kayıtların anlık görüntüye katlanma aralığı ve silme kayıtlarının
+# saklanma süresi; daha eski revizyondan eşitlenen istemci tam zarfı alır.
+COMPACT_INTERVAL_SECONDS = float(os.environ.get("PASS_MANAGER_COMPACT_INTERVAL", 300))
+TOMBSTONE_TTL = timedelta(days=30)
+
+
+async def compact_periodically() -> None:
+    while True:
+        await asyncio.sleep(COMPACT_INTERVAL_SECONDS)
+        cutoff = (datetime.now(GEORGIA_TZ) - TOMBSTONE_TTL).replace(microsecond=0).isoformat()
+        try:
+            await adb.compact_vaults(cutoff)
+        except Exception:
+            logger.exception("Vault sıkıştırma başarısız")
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    compactor = asyncio.create_task(compact_periodically())
+    yield
+    compactor.cancel()
+    adb.close()
+    hasher.close()
+
+
 app = FastAPI(
     title="Pass Manager API",
     description="Güvenli şifre yöneticisi REST API",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # CORS ayarları - iOS uygulaması için gerekli
@@ -35,10 +86,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Vault-Updated-At"],
 )
 
-security = HTTPBearer()
-db = Database()
+# Kabul edilen en büyük şifreli zarf; sınır gövde okunurken uygulanır.
+MAX_VAULT_BYTES = int(os.environ.get("PASS_MANAGER_MAX_VAULT_BYTES", 32 * 1024 * 1024))
+STREAM_CHUNK_BYTES = 256 * 1024
 
 GEORGIA_TZ = timezone(timedelta(hours=4), name="UTC+4")
 
@@ -47,23 +100,87 @@ def _utcnow() -> str:
     return datetime.now(GEORGIA_TZ).replace(microsecond=0).isoformat()
 
 
+# Doğrulanmış token'lar; sık istekte imza ve veritabanı kontrolü tekrarlanmaz.
+token_cache = TokenCache()
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security)
-) -> str:
-    """JWT token'dan kullanıcı adını al."""
+) -> TokenUser:
+    """Token'ın kullanıcısını döndürür; önbellekte yoksa doğrulayıp ekler."""
     token = credentials.credentials
-    username = verify_token(token)
-    if not username:
-        raise HTTPException(status_code=401, detail="Geçersiz veya süresi dolmuş token")
-    return username
-
-
-def get_user_id(username: str) -> Optional[int]:
-    """Kullanıcı ID'sini al."""
-    with db.connection() as conn:
-        cursor = conn.execute("SELECT id FROM users WHERE username = ?", (username,))
-        row = cursor.fetchone()
-        return row["id"] if row else None
+    user = token_cache.get(token)
+    if user is None:
+        user = await _verify_token(token)
+        token_cache.put(token, user)
+    return user
+
+
+async def _verify_token(token: str) -> TokenUser:
+    invalid = HTTPException(status_code=401, detail="Geçersiz veya süresi dolmuş token")
+    claims = decode_token(token)
+    if not claims:
+        raise invalid
+    if "sub" in claims:
+        user_id = int(claims["sub"])
+        current_version = await adb.get_token_version(user_id)
+    else:
+        # Kimlik taşımayan eski token; kullanıcı adından çözülür.
+        row = await adb.get_user(claims.get("username", ""))
+        user_id, current_version = (row["id"], row["token_version"]) if row else (0, None)
+    version = claims.get("ver", 0)
+    if current_version is None or version != current_version:
+        raise invalid
+    return TokenUser(user_id, claims.get("username", ""), version, float(claims["exp"]))
+
+
+def _etag(revision: int) -> str:
+    return f'"{revision}"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    candidates = {value.strip().removeprefix("W/") for value in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def _accept_encoding_header() -> dict:
+    # İstemciye hangi kodlamalarla sıkıştırılmış gövde gönderebileceğini bildirir.
+    return {"Accept-Encoding": ", ".join(supported_encodings())}
+
+
+def _vault_headers(etag: str) -> dict:
+    # Yanıt kullanıcıya özeldir; her kullanımda sunucuya doğrulatılmalıdır.
+    return {
+        "ETag": etag,
+        "Cache-Control": "private, no-cache",
+        "Vary": "Accept-Encoding",
+        **_accept_encoding_header(),
+    }
+
+
+def _expected_revision(if_match: Optional[str], body_revision: Optional[int]) -> Optional[int]:
+    """`If-Match` başlığından (yoksa gövdeden) beklenen revizyonu çıkarır."""
+    if if_match is None:
+        return body_revision
+    value = if_match.strip()
+    if value == "*":
+        return None
+    if value.startswith("W/"):
+        value = value[2:]
+    try:
+        return int(value.strip('"'))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Geçersiz If-Match değeri") from None
+
+
+async def _hashing(job: Awaitable[T]) -> T:
+    """Parola özeti işini bekler; kuyruk doluysa 503 döner."""
+    try:
+        return await job
+    except HasherBusy:
+        raise HTTPException(
+            status_code=503, detail="Sunucu meşgul, lütfen tekrar deneyin", headers={"Retry-After": "1"}
+        ) from None
 
 
 @app.post("/api/v1/auth/register")
@@ -74,117 +191,370 @@ async def register(user_data: UserCreate):
     if len(user_data.password) < 8:
         raise HTTPException(status_code=400, detail="Parola en az 8 karakter olmalı")
 
-    with db.connection() as conn:
-        # Kullanıcı zaten var mı kontrol et
-        cursor = conn.execute("SELECT id FROM users WHERE username = ?", (user_data.username,))
-        if cursor.fetchone():
-            raise HTTPException(status_code=409, detail="Kullanıcı adı zaten kullanılıyor")
-
-        # Yeni kullanıcı oluştur
-        password_hash = hash_password(user_data.password)
-        now = _utcnow()
-        conn.execute(
-            "INSERT INTO users (username, password_hash, created_at) VALUES (?, ?, ?)",
-            (user_data.username, password_hash, now),
-        )
-        conn.commit()
+    # Kullanıcı adının benzersizliğini UNIQUE kısıtı denetler; ayrıca SELECT gerekmez.
+    password_hash = await _hashing(hasher.hash(user_data.password))
+    user_id = await adb.create_user(user_data.username, password_hash, _utcnow())
+    if user_id is None:
+        raise HTTPException(status_code=409, detail="Kullanıcı adı zaten kullanılıyor")
 
-    token = create_token(user_data.username)
+    token = create_token(user_data.username, user_id)
     return {"token": token, "username": user_data.username}
 
 
 @app.post("/api/v1/auth/login")
 async def login(user_data: UserLogin):
     """Kullanıcı girişi."""
-    with db.connection() as conn:
-        cursor = conn.execute(
-            "SELECT id, password_hash FROM users WHERE username = ?",
-            (user_data.username,),
-        )
-        row = cursor.fetchone()
-        if not row:
-            raise HTTPException(status_code=401, detail="Kullanıcı adı veya parola hatalı")
+    row = await adb.get_user(user_data.username)
+    if not row:
+        # Yanıt süresi kullanıcı adının var olup olmadığını belli etmesin.
+        await _hashing(hasher.hash(user_data.password))
+        raise HTTPException(status_code=401, detail="Kullanıcı adı veya parola hatalı")
+
+    if not await _hashing(hasher.verify(user_data.password, row["password_hash"])):
+        raise HTTPException(status_code=401, detail="Kullanıcı adı veya parola hatalı")
+    if needs_rehash(row["password_hash"]):
+        # Eski (tuzsuz SHA-256 ya da zayıf parametreli) özet, parola elimizdeyken yenilenir.
+        await adb.update_password_hash(row["id"], await _hashing(hasher.hash(user_data.password)))
+
+    # Son giriş zamanını güncelle
+    await adb.record_login(row["id"], _utcnow())
+
+    token = create_token(user_data.username, row["id"], row["token_version"])
+    return {"token": token, "username": user_data.username}
 
-        if not verify_password(user_data.password, row["password_hash"]):
-            raise HTTPException(status_code=401, detail="Kullanıcı adı veya parola hatalı")
 
-        # Son giriş zamanını güncelle
-        conn.execute(
-            "UPDATE users SET last_login = ? WHERE id = ?",
-            (_utcnow(), row["id"]),
-        )
-        conn.commit()
+@app.post("/api/v1/auth/logout-all")
+async def logout_all(user: TokenUser = Depends(get_current_user)):
+    """Kullanıcının tüm token'larını iptal eder; bu cihaz için yeni token döner.
 
-    token = create_token(user_data.username)
-    return {"token": token, "username": user_data.username}
+    Diğer sunucu süreçleri iptali en geç token önbelleği süresi sonunda görür.
+    """
+    version = await adb.revoke_tokens(user.user_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Kullanıcı bulunamadı")
+    token_cache.revoke(user.user_id, version)
+    return {"token": create_token(user.username, user.user_id, version), "username": user.username}
 
 
-@app.get("/api/v1/vault")
-async def get_vault(username: str = Depends(get_current_user)):
-    """Kullanıcının vault'unu al."""
-    user_id = get_user_id(username)
-    if not user_id:
+def _envelope_bytes(value) -> bytes:
+    # Eski şemada zarf TEXT olarak saklanıyordu.
+    return value.encode("utf-8") if isinstance(value, str) else bytes(value)
+
+
+def _embeddable(envelope: bytes) -> bool:
+    """Zarf `{...}` biçiminde mi; içerik ayrıştırılmaz, yalnızca kenarlara bakılır."""
+    # Yalnızca uçlar kopyalanır; büyük gövde bellekte çoğaltılmaz.
+    return envelope[:64].lstrip().startswith(b"{") and envelope[-64:].rstrip().endswith(b"}")
+
+
+async def _current_vault(user_id: int):
+    """Katlanmamış kayıtlar uygulanmış vault satırı; kullanıcı yoksa 404."""
+    try:
+        row = await adb.get_user_vault(user_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=409, detail="Sunucudaki zarf okunamıyor; tam zarfı PUT ile gönderin"
+        ) from None
+    if not row:
         raise HTTPException(status_code=404, detail="Kullanıcı bulunamadı")
+    return row
 
-    with db.connection() as conn:
-        cursor = conn.execute(
-            "SELECT encrypted_envelope, updated_at FROM vaults WHERE user_id = ?",
-            (user_id,),
-        )
-        row = cursor.fetchone()
-        if not row:
-            # Vault yoksa boş envelope döndür
-            return VaultEnvelopeResponse(
-                encrypted_envelope={},
-                updated_at=_utcnow(),
-            )
 
-        envelope = json.loads(row["encrypted_envelope"])
-        return VaultEnvelopeResponse(
-            encrypted_envelope=envelope,
-            updated_at=row["updated_at"],
-        )
+async def _not_modified(user_id: int, if_none_match: Optional[str]) -> Optional[Response]:
+    """`If-None-Match` güncel revizyonla eşleşirse gövde okunmadan 304 yanıtı."""
+    if if_none_match is None:
+        return None
+    row = await adb.get_vault_revision(user_id)
+    if not row:
+        raise HTTPException(status_code=404, detail="Kullanıcı bulunamadı")
+    etag = _etag(row["revision"] or 0)
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=_vault_headers(etag))
+    return None
 
 
-@app.post("/api/v1/vault")
-async def save_vault(
-    vault_data: VaultEnvelopeRequest,
-    username: str = Depends(get_current_user),
+async def _store_envelope(user_id: int, envelope: bytes, expected: Optional[int]) -> Response:
+    now = _utcnow()
+    return await _saved(adb.save_user_vault(user_id, envelope, now, expected), now)
+
+
+async def _saved(save: Awaitable[Optional[int]], now: str) -> Response:
+    """Kaydı bekler; çakışmayı 409, eksik kullanıcıyı 404 yanıtına çevirir."""
+    try:
+        revision = await save
+    except RevisionConflict as exc:
+        raise HTTPException(
+            status_code=409,
+            detail="Vault başka bir cihazda değişti; önce güncel hali alın",
+            headers={"ETag": _etag(exc.current)},
+        ) from None
+    if revision is None:
+        raise HTTPException(status_code=404, detail="Kullanıcı bulunamadı")
+    body = {"message": "Vault başarıyla kaydedildi", "updated_at": now, "revision": revision}
+    headers = {"ETag": _etag(revision), **_accept_encoding_header()}
+    return Response(json.dumps(body), media_type="application/json", headers=headers)
+
+
+async def _read_body(request: Request) -> bytes:
+    """İstek gövdesini parça parça okur; sınır aşılınca okumayı keser (413).
+
+    `Content-Encoding` ile sıkıştırılmış gövde açılır; sınır açılmış boyuta
+    da uygulanır.
+    """
+    limit = MAX_VAULT_BYTES
+    encoding = request.headers.get("content-encoding", "identity").strip().lower()
+    if encoding != "identity" and encoding not in supported_encodings():
+        raise HTTPException(status_code=415, detail=f"Desteklenmeyen içerik kodlaması: {encoding}")
+    declared = request.headers.get("content-length")
+    if declared is not None and declared.isdigit() and int(declared) > limit:
+        raise HTTPException(status_code=413, detail="Vault boyut sınırını aşıyor")
+    buffer = bytearray()
+    async for chunk in request.stream():
+        buffer += chunk
+        if len(buffer) > limit:
+            raise HTTPException(status_code=413, detail="Vault boyut sınırını aşıyor")
+    if encoding == "identity":
+        return bytes(buffer)
+    try:
+        body = await asyncio.to_thread(decompress, bytes(buffer), encoding, limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Sıkıştırılmış gövde açılamadı") from None
+    if len(body) > limit:
+        raise HTTPException(status_code=413, detail="Vault boyut sınırını aşıyor")
+    return body
+
+
+async def _chunks(data: bytes, encoding: Optional[str] = None) -> AsyncIterator[bytes]:
+    # Sıkıştırma parça parça yapılır; olay döngüsü tek seferde uzun süre meşgul edilmez.
+    packer = compressor(encoding) if encoding else None
+    view = memoryview(data)
+    for offset in range(0, len(view), STREAM_CHUNK_BYTES):
+        chunk = view[offset:offset + STREAM_CHUNK_BYTES]
+        if packer is None:
+            yield chunk
+            continue
+        packed = packer.compress(chunk)
+        if packed:
+            yield packed
+    if packer is not None:
+        yield packer.flush()
+
+
+def _response_encoding(body: bytes, accept_encoding: Optional[str]) -> Optional[str]:
+    return choose_encoding(accept_encoding) if len(body) >= MIN_COMPRESS_BYTES else None
+
+
+async def _json_response(body: bytes, headers: dict, accept_encoding: Optional[str]) -> Response:
+    """JSON gövdesini istemcinin kabul ettiği kodlamayla sıkıştırarak döndürür."""
+    encoding = _response_encoding(body, accept_encoding)
+    if encoding:
+        if len(body) > STREAM_CHUNK_BYTES:
+            body = await asyncio.to_thread(compress, body, encoding)
+        else:
+            body = compress(body, encoding)
+        headers["Content-Encoding"] = encoding
+    return Response(body, media_type="application/json", headers=headers)
+
+
+@app.get("/api/v1/vault/envelope")
+async def get_envelope(
+    user: TokenUser = Depends(get_current_user),
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
 ):
-    """Vault'u kaydet veya güncelle."""
-    user_id = get_user_id(username)
-    if not user_id:
+    """Şifreli zarfı olduğu gibi döndürür; sunucu içeriğini ayrıştırmaz.
+
+    Revizyon `ETag`, son kayıt zamanı `X-Vault-Updated-At` başlığındadır.
+    Vault henüz yoksa 204 döner. İstemci kabul ediyorsa gövde sıkıştırılır.
+    """
+    not_modified = await _not_modified(user.user_id, if_none_match)
+    if not_modified is not None:
+        return not_modified
+
+    row = await _current_vault(user.user_id)
+    if row["encrypted_envelope"] is None:
+        return Response(status_code=204, headers=_vault_headers(_etag(0)))
+
+    envelope = _envelope_bytes(row["encrypted_envelope"])
+    headers = _vault_headers(_etag(row["revision"]))
+    headers["X-Vault-Updated-At"] = row["updated_at"]
+    encoding = _response_encoding(envelope, accept_encoding)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    else:
+        headers["Content-Length"] = str(len(envelope))
+    return StreamingResponse(_chunks(envelope, encoding), media_type="application/json", headers=headers)
+
+
+@app.head("/api/v1/vault/envelope")
+async def head_envelope(user: TokenUser = Depends(get_current_user)):
+    """Vault'un varlığını ve revizyonunu gövde okumadan bildirir (yoksa 204)."""
+    row = await adb.get_vault_revision(user.user_id)
+    if not row:
         raise HTTPException(status_code=404, detail="Kullanıcı bulunamadı")
+    if row["revision"] is None:
+        return Response(status_code=204, headers=_vault_headers(_etag(0)))
+    return Response(status_code=200, headers=_vault_headers(_etag(row["revision"])))
 
-    now = _utcnow()
-    envelope_json = json.dumps(vault_data.encrypted_envelope)
-
-    with db.connection() as conn:
-        # Vault var mı kontrol et
-        cursor = conn.execute("SELECT id FROM vaults WHERE user_id = ?", (user_id,))
-        existing = cursor.fetchone()
-
-        if existing:
-            # Güncelle
-            conn.execute(
-                "UPDATE vaults SET encrypted_envelope = ?, updated_at = ? WHERE user_id = ?",
-                (envelope_json, now, user_id),
-            )
+
+@app.put("/api/v1/vault/envelope")
+async def put_envelope(
+    request: Request,
+    user: TokenUser = Depends(get_current_user),
+    if_match: Optional[str] = Header(None),
+):
+    """Şifreli zarfı ayrıştırmadan BLOB olarak kaydeder.
+
+    Gövde `{` ile başlayıp `}` ile bitmiyorsa 400 döner; eski uç nokta onu
+    yanıtına olduğu gibi gömer.
+    """
+    expected = _expected_revision(if_match, None)
+    envelope = await _read_body(request)
+    if not envelope:
+        raise HTTPException(status_code=400, detail="Vault gövdesi boş")
+    if not _embeddable(envelope):
+        raise HTTPException(status_code=400, detail="Vault gövdesi bir JSON nesnesi olmalı")
+    return await _store_envelope(user.user_id, envelope, expected)
+
+
+_changes_request = TypeAdapter(VaultChangesRequest)
+_envelope_request = TypeAdapter(VaultEnvelopeRequest)
+
+
+def _compact_json(value) -> bytes:
+    return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+
+@app.get("/api/v1/vault/changes")
+async def get_changes(
+    since: int,
+    user: TokenUser = Depends(get_current_user),
+    accept_encoding: Optional[str] = Header(None),
+):
+    """`since` revizyonundan sonra değişen şifreli kayıtlar.
+
+    Yanıt `{"revision", "full", "header", "upserts", "deletes"}` biçimindedir;
+    kayıtlar saklandığı gibi gömülür. `full` true ise istemcinin revizyonu
+    artık eşitlenemez ve tam zarfı `/api/v1/vault/envelope` ile almalıdır.
+    """
+    changes = await adb.get_vault_changes(user.user_id, since)
+    if changes is None:
+        raise HTTPException(status_code=404, detail="Kullanıcı bulunamadı")
+    revision, rows = changes
+    headers = _vault_headers(_etag(revision))
+    if rows is None:
+        body = _compact_json({"revision": revision, "full": True})
+        return await _json_response(body, headers, accept_encoding)
+
+    header, upserts, deletes = b"null", [], []
+    for row in rows:
+        if row["record_id"] == HEADER_RECORD_ID:
+            header = row["data"]
+        elif row["data"] is None:
+            deletes.append(row["record_id"])
         else:
-            # Yeni oluştur
-            conn.execute(
-                "INSERT INTO vaults (user_id, encrypted_envelope, created_at, updated_at) VALUES (?, ?, ?, ?)",
-                (user_id, envelope_json, now, now),
+            upserts.append(_compact_json(row["record_id"]) + b":" + row["data"])
+    body = b'{"revision":%d,"full":false,"header":%s,"upserts":{%s},"deletes":%s}' % (
+        revision,
+        header,
+        b",".join(upserts),
+        _compact_json(deletes),
+    )
+    return await _json_response(body, headers, accept_encoding)
+
+
+@app.post("/api/v1/vault/changes")
+async def save_changes(
+    request: Request,
+    user: TokenUser = Depends(get_current_user),
+    if_match: Optional[str] = Header(None),
+):
+    """Yalnızca değişen kayıtları yeni bir revizyon olarak kaydeder.
+
+    Tam zarf gibi `If-Match` ile korunur; vault henüz yoksa 409 döner ve
+    istemci tam zarfı `PUT /api/v1/vault/envelope` ile göndermelidir.
+    """
+    try:
+        changes = _changes_request.validate_json(await _read_body(request))
+    except ValidationError as exc:
+        raise HTTPException(status_code=422, detail=exc.errors(include_url=False)) from None
+    if HEADER_RECORD_ID in changes.upserts or HEADER_RECORD_ID in changes.deletes:
+        raise HTTPException(status_code=400, detail="Kayıt kimliği boş olamaz")
+
+    expected = _expected_revision(if_match, changes.expected_revision)
+    header = _compact_json(changes.header) if changes.header is not None else None
+    upserts = {record_id: _compact_json(record) for record_id, record in changes.upserts.items()}
+    now = _utcnow()
+    return await _saved(
+        adb.save_vault_changes(user.user_id, header, upserts, changes.deletes, now, expected), now
+    )
+
+
+@app.get("/api/v1/vault")
+async def get_vault(
+    user: TokenUser = Depends(get_current_user),
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None),
+):
+    """Kullanıcının vault'unu al (eski istemciler için JSON sarmalı).
+
+    `If-None-Match` istemcideki revizyonla eşleşirse gövde okunmadan 304 döner.
+    """
+    not_modified = await _not_modified(user.user_id, if_none_match)
+    if not_modified is not None:
+        return not_modified
+
+    # Kullanıcı ve vault tek sorguda (JOIN) okunur.
+    row = await _current_vault(user.user_id)
+
+    if row["encrypted_envelope"] is None:
+        # Vault yoksa boş envelope döndür; revizyon 0 "henüz yok" demektir.
+        envelope, updated_at, revision = b"{}", _utcnow(), 0
+    else:
+        envelope, updated_at, revision = (
+            _envelope_bytes(row["encrypted_envelope"]),
+            row["updated_at"],
+            row["revision"],
+        )
+        if not _embeddable(envelope):
+            raise HTTPException(
+                status_code=409, detail="Vault bu uç noktadan sunulamıyor; /api/v1/vault/envelope kullanın"
             )
-        conn.commit()
 
-    return {"message": "Vault başarıyla kaydedildi", "updated_at": now}
+    # Saklanan zarf ayrıştırılıp yeniden serileştirilmeden yanıta gömülür.
+    body = b"".join((
+        b'{"encrypted_envelope":',
+        envelope,
+        b',"updated_at":%s,"revision":%d}' % (json.dumps(updated_at).encode(), revision),
+    ))
+    return await _json_response(body, _vault_headers(_etag(revision)), accept_encoding)
+
+
+@app.post("/api/v1/vault")
+async def save_vault(
+    request: Request,
+    user: TokenUser = Depends(get_current_user),
+    if_match: Optional[str] = Header(None),
+):
+    """Vault'u kaydet veya güncelle (eski istemciler için JSON sarmalı).
+
+    İstemci son okuduğu revizyonu `If-Match` (ya da `expected_revision`) ile
+    gönderirse, arada başka bir cihaz kaydetmişse 409 döner. Gövde
+    `Content-Encoding` ile sıkıştırılmış gönderilebilir.
+    """
+    try:
+        vault_data = _envelope_request.validate_json(await _read_body(request))
+    except ValidationError as exc:
+        raise HTTPException(status_code=422, detail=exc.errors(include_url=False)) from None
+    expected = _expected_revision(if_match, vault_data.expected_revision)
+    envelope = json.dumps(vault_data.encrypted_envelope).encode("utf-8")
+    return await _store_envelope(user.user_id, envelope, expected)
 
 
 @app.get("/api/v1/health")
 async def health_check():
     """Sunucu sağlık kontrolü."""
-    return {"status": "ok", "service": "pass-manager-api"}
+    return {"status": "ok", "service": "pass-manager-api", "password_hashing": hasher.metrics()}
 
 
 # Web uygulamasını serve et
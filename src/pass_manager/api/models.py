@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional
 
 
@@ -24,6 +24,7 @@ class UserLogin:
 class VaultEnvelopeRequest:
     """Vault envelope gönderme request modeli."""
     encrypted_envelope: Dict[str, Any]
+    expected_revision: Optional[int] = None
 
 
 @dataclass
@@ -31,22 +32,17 @@ class VaultEnvelopeResponse:
     """Vault envelope response modeli."""
     encrypted_envelope: Dict[str, Any]
     updated_at: str
+    revision: int = 0
 
 
 @dataclass
-class EntryCreateRequest:
-    """Yeni entry ekleme request modeli (encrypted envelope içinde)."""
-    encrypted_envelope: Dict[str, Any]
-
-
-@dataclass
-class EntryUpdateRequest:
-    """Entry güncelleme request modeli."""
-    encrypted_envelope: Dict[str, Any]
-
-
-@dataclass
-class EntryDeleteRequest:
-    """Entry silme request modeli."""
-    encrypted_envelope: Dict[str, Any]
-
+class VaultChangesRequest:
+    """Artımlı vault kaydı: yalnızca değişen şifreli kayıtlar.
+
+    `header` zarfın kayıtlar dışındaki kısmıdır (değişmediyse None);
+    `upserts` kayıt kimliğinden şifreli kayda, `deletes` silinen kimliklerdir.
+    """
+    header: Optional[Dict[str, Any]] = None
+    upserts: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    deletes: List[str] = field(default_factory=list)
+    expected_revision: Optional[int] = None
@@ -2,65 +2,250 @@
 
 from __future__ import annotations
 
+import base64
+import hashlib
 import json
-from typing import Optional
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Optional
 
 import requests
 
-from ..crypto import decrypt_payload, encrypt_payload
-from ..exceptions import VaultNotInitialized, VaultError
+from ..crypto import json_default
+from ..exceptions import VaultAlreadyExists, VaultConflict, VaultNotInitialized, VaultError
 from ..models import Vault
+from ..storage import SecureVault, apply_changes
+from .client import shared_session
+from .compression import MIN_COMPRESS_BYTES, choose_encoding, compress
+
+# Son alınan şifreli zarfın kopyası; koşullu GET ile yeniden indirilmez.
+DEFAULT_CACHE_DIR = Path.home() / ".pass_manager" / "api_cache"
+
+
+def _token_subject(token: str) -> str:
+    """JWT'deki kullanıcı kimliği (`sub`, imza doğrulanmadan); okunamazsa token'ın kendisi."""
+    try:
+        payload = token.split(".")[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        return f"sub:{claims['sub']}"
+    except (IndexError, ValueError, KeyError, TypeError):
+        return token
 
 
 class APIVaultStorage:
-    """API üzerinden vault yönetimi."""
+    """API üzerinden vault yönetimi.
+
+    Son okunan ya da yazılan revizyon saklanır ve kayıtta `If-Match` ile
+    gönderilir; arada başka bir cihaz kaydetmişse `VaultConflict` yükseltilir.
+
+    Son alınan ham zarf `cache_dir` altında (zaten şifreli) ETag'iyle
+    birlikte tutulur. Önbellek varsa okumada yalnızca o revizyondan beri
+    değişen kayıtlar istenir; kayıtta da yalnızca değişen kayıtlar gönderilir
+    (`append_changes`). Böylece aktarılan veri düzenlemenin boyutuyla orantılıdır.
 
-    def __init__(self, api_url: str, token: str):
+    Sunucu yanıtlarında `Accept-Encoding` ile sıkıştırılmış gövde kabul
+    ettiğini bildirdiyse büyük gövdeler sıkıştırılarak gönderilir.
+    """
+
+    def __init__(
+        self,
+        api_url: str,
+        token: str,
+        cache_dir: Optional[Path] = DEFAULT_CACHE_DIR,
+        session: Optional[requests.Session] = None,
+    ):
         self.api_url = api_url.rstrip("/")
         self.token = token
+        self.session = session or shared_session()
+        self.revision: Optional[int] = None
         self.headers = {
             "Authorization": f"Bearer {token}",
             "Content-Type": "application/json",
         }
+        self.cache_path: Optional[Path] = None
+        if cache_dir is not None:
+            # Önbellek sunucu ve kullanıcıya bağlıdır; yeniden girişte yeni
+            # token aynı dosyayı kullanır, eski kopya geride kalmaz.
+            key = hashlib.sha256(f"{self.api_url}\n{_token_subject(token)}".encode("utf-8")).hexdigest()[:32]
+            self.cache_path = Path(cache_dir) / f"{key}.json"
+        self._etag: Optional[str] = None
+        self._cached_body: Optional[bytes] = None
+        self._upload_encoding: Optional[str] = None
+
+    def _note_server(self, response: requests.Response) -> None:
+        advertised = response.headers.get("Accept-Encoding")
+        if advertised is not None:
+            self._upload_encoding = choose_encoding(advertised)
+
+    def _encoded(self, body: bytes, headers: dict) -> bytes:
+        if self._upload_encoding is None or len(body) < MIN_COMPRESS_BYTES:
+            return body
+        headers["Content-Encoding"] = self._upload_encoding
+        return compress(body, self._upload_encoding)
+
+    def _load_cache(self) -> None:
+        if self._cached_body is not None or self.cache_path is None:
+            return
+        try:
+            etag, _, body = self.cache_path.read_bytes().partition(b"\n")
+        except OSError:
+            return
+        if etag and body:
+            self._etag, self._cached_body = etag.decode("ascii"), body
+
+    def _store_cache(self, etag: Optional[str], body: Optional[bytes]) -> None:
+        self._etag, self._cached_body = (etag, body) if etag and body else (None, None)
+        if self.cache_path is None:
+            return
+        # Önbellek yalnızca hızlandırır; yazılamaması okuma/kaydı bozmaz.
+        try:
+            if self._cached_body is None:
+                self.cache_path.unlink(missing_ok=True)
+                return
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.cache_path.with_suffix(".tmp")
+            fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(etag.encode("ascii") + b"\n" + body)
+            os.replace(temp_path, self.cache_path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _revision_of(etag: Optional[str]) -> Optional[int]:
+        try:
+            return int(etag.removeprefix("W/").strip('"')) if etag else None
+        except ValueError:
+            return None
+
+    def _pull_changes(self) -> Optional[dict]:
+        """Önbellekteki zarfı sunucudaki değişikliklerle günceller.
+
+        Önbellek yoksa ya da sunucu artık o revizyondan eşitleyemiyorsa None.
+        """
+        since = self._revision_of(self._etag)
+        if self._cached_body is None or since is None:
+            return None
+        response = self.session.get(
+            f"{self.api_url}/api/v1/vault/changes",
+            headers=self.headers,
+            params={"since": since},
+            timeout=10,
+        )
+        response.raise_for_status()
+        self._note_server(response)
+        changes = response.json()
+        if changes["full"]:
+            return None
+        envelope = json.loads(self._cached_body)
+        if changes["revision"] != since:
+            apply_changes(envelope, changes["header"], changes["upserts"], changes["deletes"])
+            self._store_cache(f'"{changes["revision"]}"', json.dumps(envelope).encode("utf-8"))
+        self.revision = changes["revision"]
+        return envelope
 
     def _get_vault(self) -> dict:
-        """Sunucudan vault'u al."""
+        """Sunucudan ham zarfı al; önbellekteki sürüm güncelse indirmez."""
+        self._load_cache()
         try:
-            response = requests.get(
-                f"{self.api_url}/api/v1/vault",
-                headers=self.headers,
+            envelope = self._pull_changes()
+        except requests.exceptions.RequestException as e:
+            raise VaultError(f"API bağlantı hatası: {e}") from e
+        if envelope:
+            return envelope
+        headers = dict(self.headers)
+        if self._etag is not None:
+            headers["If-None-Match"] = self._etag
+        try:
+            response = self.session.get(
+                f"{self.api_url}/api/v1/vault/envelope",
+                headers=headers,
                 timeout=10,
             )
-            response.raise_for_status()
-            data = response.json()
-            envelope = data.get("encrypted_envelope", {})
-            # Boş envelope kontrolü
-            if not envelope or envelope == {}:
+            self._note_server(response)
+            if response.status_code == 304 and self._cached_body is not None:
+                body = self._cached_body
+            else:
+                response.raise_for_status()
+                body = response.content if response.status_code != 204 else b""
+                self._store_cache(response.headers.get("ETag"), body or None)
+            self.revision = self._revision_of(response.headers.get("ETag"))
+            # 204: vault henüz oluşturulmamış.
+            envelope = json.loads(body) if body else {}
+            if not envelope:
                 raise VaultNotInitialized("Vault henüz oluşturulmamış.")
             return envelope
         except requests.exceptions.RequestException as e:
             raise VaultError(f"API bağlantı hatası: {e}") from e
 
     def _save_vault(self, envelope: dict) -> None:
-        """Vault'u sunucuya kaydet."""
+        """Ham zarfı sunucuya kaydet."""
+        headers = dict(self.headers)
+        if self.revision is not None:
+            headers["If-Match"] = f'"{self.revision}"'
+        body = json.dumps(envelope, default=json_default).encode("utf-8")
+        data = self._encoded(body, headers)
         try:
-            response = requests.post(
-                f"{self.api_url}/api/v1/vault",
-                headers=self.headers,
-                json={"encrypted_envelope": envelope},
+            response = self.session.put(
+                f"{self.api_url}/api/v1/vault/envelope",
+                headers=headers,
+                data=data,
+                timeout=10,
+            )
+            self._note_server(response)
+            if response.status_code == 409:
+                raise VaultConflict(
+                    "Kasa başka bir cihazda değiştirildi; değişikliklerinizi yeniden yükleyip tekrar deneyin."
+                )
+            response.raise_for_status()
+            etag = response.headers.get("ETag")
+            self.revision = self._revision_of(etag)
+            # Yazılan zarf sunucudakiyle aynıdır; sonraki okuma 304 alır.
+            self._store_cache(etag, body)
+        except requests.exceptions.RequestException as e:
+            raise VaultError(f"API kayıt hatası: {e}") from e
+
+    def append_changes(self, header: dict, upserts: Dict[str, dict], deletes: Iterable[str]) -> None:
+        """Yalnızca değişen şifreli kayıtları sunucuya gönderir.
+
+        Önbellek bir sonraki okumada kendi değişikliklerimizle birlikte
+        güncellenir; burada zarfın tamamı yeniden yazılmaz.
+        """
+        headers = dict(self.headers)
+        if self.revision is not None:
+            headers["If-Match"] = f'"{self.revision}"'
+        body = {"header": header, "upserts": upserts, "deletes": sorted(deletes)}
+        data = self._encoded(json.dumps(body, default=json_default).encode("utf-8"), headers)
+        try:
+            response = self.session.post(
+                f"{self.api_url}/api/v1/vault/changes",
+                headers=headers,
+                data=data,
                 timeout=10,
             )
+            self._note_server(response)
+            if response.status_code == 409:
+                raise VaultConflict(
+                    "Kasa başka bir cihazda değiştirildi; değişikliklerinizi yeniden yükleyip tekrar deneyin."
+                )
             response.raise_for_status()
+            self.revision = self._revision_of(response.headers.get("ETag"))
         except requests.exceptions.RequestException as e:
             raise VaultError(f"API kayıt hatası: {e}") from e
 
     def exists(self) -> bool:
-        """Vault'un var olup olmadığını kontrol et."""
+        """Vault'un var olup olmadığını gövde indirmeden (HEAD) kontrol et."""
         try:
-            self._get_vault()
-            return True
-        except (VaultNotInitialized, VaultError):
+            response = self.session.head(
+                f"{self.api_url}/api/v1/vault/envelope",
+                headers=self.headers,
+                timeout=10,
+            )
+            response.raise_for_status()
+        except requests.exceptions.RequestException:
             return False
+        self._note_server(response)
+        return response.status_code == 200
 
     def read_envelope(self) -> dict:
         """Şifrelenmiş envelope'u oku."""
@@ -71,30 +256,25 @@ class APIVaultStorage:
         self._save_vault(envelope)
 
 
-class SecureVaultAPI:
-    """API tabanlı SecureVault wrapper."""
+class SecureVaultAPI(SecureVault):
+    """API tabanlı SecureVault wrapper.
+
+    Anahtar önbelleği ve kayıt mantığı yerel `SecureVault` ile ortaktır;
+    yalnızca depolama katmanı `APIVaultStorage` olur.
+    """
 
     def __init__(self, storage: APIVaultStorage):
-        self.storage = storage
+        super().__init__(storage)
 
     def init_vault(self, master_password: str) -> Vault:
-        """Yeni vault oluştur."""
-        if self.storage.exists():
-            from ..exceptions import VaultAlreadyExists
-            raise VaultAlreadyExists("Vault zaten mevcut.")
+        # Varlık ayrı bir istekle sorulmaz: "henüz yok" revizyonu (0) ile
+        # yapılan kayıt, vault varsa sunucuda 409 ile reddedilir.
         vault = Vault()
-        envelope = encrypt_payload(master_password, vault.to_dict())
-        self.storage.write_envelope(envelope)
+        self.lock()
+        self._forget_records()
+        self.storage.revision = 0
+        try:
+            self.save_vault(master_password, vault)
+        except VaultConflict:
+            raise VaultAlreadyExists("Kasa zaten mevcut.") from None
         return vault
-
-    def load_vault(self, master_password: str) -> Vault:
-        """Vault'u yükle."""
-        envelope = self.storage.read_envelope()
-        data = decrypt_payload(master_password, envelope)
-        return Vault.from_dict(data)
-
-    def save_vault(self, master_password: str, vault: Vault) -> None:
-        """Vault'u kaydet."""
-        envelope = encrypt_payload(master_password, vault.to_dict())
-        self.storage.write_envelope(envelope)
-
@@ -0,0 +1,121 @@
+"""Toplu değişiklikler: JSON Lines işlemleri tek yükleme ve tek kayıtla uygulanır.
+
+Her satır bir işlemdir:
+
+    {"op": "add", "service": "github", "username": "ci", "password": "...", "tags": ["ci"]}
+    {"op": "add", "service": "gitlab", "username": "ci", "length": 32}
+    {"op": "update", "id": "<kayıt id>", "password": "...", "notes": "..."}
+    {"op": "delete", "id": "<kayıt id>"}
+
+`add` işleminde parola verilmezse üretilir. İşlemler sırayla uygulanır;
+herhangi biri başarısız olursa `BatchError` yükseltilir ve çağıran kasayı
+kaydetmez, böylece hiçbir değişiklik kalıcı olmaz.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, Iterable, List
+
+from .exceptions import BatchError, EntryNotFound
+from .models import Vault, VaultEntry
+from .passwords import GeneratorOptions, generate_password
+
+ENTRY_FIELDS = ("service", "username", "password", "notes", "tags")
+GENERATOR_FIELDS = ("length", "symbols", "allow_ambiguous")
+ALLOWED_FIELDS = {
+    "add": {"op", "line", *ENTRY_FIELDS, *GENERATOR_FIELDS},
+    "update": {"op", "line", "id", *ENTRY_FIELDS},
+    "delete": {"op", "line", "id"},
+}
+REQUIRED_FIELDS = {"add": ("service", "username"), "update": ("id",), "delete": ("id",)}
+STRING_FIELDS = ("id", "service", "username", "password", "notes")
+
+
+def _tags(value: Any) -> List[str]:
+    if isinstance(value, str):
+        value = value.split(",")
+    return [str(tag).strip() for tag in value if str(tag).strip()]
+
+
+def _check(operation: Any, line: int) -> Dict[str, Any]:
+    if not isinstance(operation, dict):
+        raise BatchError(f"Satır {line}: işlem bir JSON nesnesi olmalı.")
+    op = operation.get("op")
+    if op not in ALLOWED_FIELDS:
+        raise BatchError(f"Satır {line}: bilinmeyen işlem: {op!r} (add, update, delete).")
+    unknown = set(operation) - ALLOWED_FIELDS[op]
+    if unknown:
+        raise BatchError(f"Satır {line}: {op} için geçersiz alanlar: {', '.join(sorted(unknown))}.")
+    wrong = [name for name in STRING_FIELDS if name in operation and not isinstance(operation[name], str)]
+    if "tags" in operation and not isinstance(operation["tags"], (str, list)):
+        wrong.append("tags")
+    if wrong:
+        raise BatchError(f"Satır {line}: metin olmalı: {', '.join(wrong)}.")
+    missing = [name for name in REQUIRED_FIELDS[op] if not operation.get(name)]
+    if missing:
+        raise BatchError(f"Satır {line}: {op} için eksik alanlar: {', '.join(missing)}.")
+    if op == "update" and not set(operation) & set(ENTRY_FIELDS):
+        raise BatchError(f"Satır {line}: update en az bir alanı değiştirmeli.")
+    return {**operation, "line": operation.get("line", line)}
+
+
+def parse_operations(lines: Iterable[str]) -> List[Dict[str, Any]]:
+    """JSON Lines girdisini doğrular; boş satırlar ve `#` yorumları atlanır."""
+    operations = []
+    for line_number, text in enumerate(lines, start=1):
+        text = text.strip()
+        if not text or text.startswith("#"):
+            continue
+        try:
+            operation = json.loads(text)
+        except ValueError as exc:
+            raise BatchError(f"Satır {line_number}: geçersiz JSON: {exc}") from exc
+        operations.append(_check(operation, line_number))
+    return operations
+
+
+def _apply(vault: Vault, operation: Dict[str, Any]) -> Dict[str, Any]:
+    op = operation["op"]
+    result = {"line": operation["line"], "op": op}
+    if op == "add":
+        password = operation.get("password")
+        if not password:
+            options = GeneratorOptions(**{name: operation[name] for name in GENERATOR_FIELDS if name in operation})
+            password = generate_password(options)
+            result["generated"] = True
+        entry = vault.add_entry(
+            VaultEntry(
+                service=operation["service"],
+                username=operation["username"],
+                password=password,
+                notes=operation.get("notes", ""),
+                tags=_tags(operation.get("tags", ())),
+            )
+        )
+    elif op == "update":
+        entry = vault.get_entry(operation["id"])
+        for name in ENTRY_FIELDS:
+            if name in operation:
+                setattr(entry, name, _tags(operation[name]) if name == "tags" else operation[name])
+        entry.touch()
+        vault.mark_dirty(entry.entry_id)
+    else:
+        entry = vault.delete_entry(operation["id"])
+    result.update(entry_id=entry.entry_id, service=entry.service, username=entry.username)
+    return result
+
+
+def apply_operations(vault: Vault, operations: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """İşlemleri sırayla uygular ve işlem başına sonuç döndürür.
+
+    Hata durumunda kasa yarım kalmış olur; çağıran onu kaydetmeden atmalıdır.
+    """
+    results = []
+    for index, operation in enumerate(operations, start=1):
+        operation = _check(operation, index)
+        try:
+            results.append(_apply(vault, operation))
+        except (EntryNotFound, ValueError, TypeError) as exc:
+            raise BatchError(f"Satır {operation['line']}: {exc}") from exc
+    return results
@@ -1,12 +1,17 @@
+"""Komut satırı arayüzü.
+
+Açılış süresi için modül düzeyinde yalnızca argparse ve hafif modüller
+yüklenir; `rich`, kripto, depolama, API istemcisi (`requests`) ve ajan her
+komutun kendi işleyicisinde import edilir. Bütçeler `tests/test_startup.py`
+içinde `-X importtime` ile denetlenir.
+"""
+
 from __future__ import annotations
 
 import argparse
+import os
 from getpass import getpass
-from typing import List, Optional, Sequence, Tuple
-
-from rich.console import Console
-from rich.panel import Panel
-from rich.table import Table
+from typing import TYPE_CHECKING, Iterator, List, Optional, Sequence, Tuple
 
 from .exceptions import (
     EntryNotFound,
@@ -16,13 +21,27 @@ from .exceptions import (
     VaultNotInitialized,
     VaultError,
 )
-from .models import Vault, VaultEntry
-from .passwords import GeneratorOptions, SYMBOL_SETS, generate_password
-from .storage import DEFAULT_VAULT_PATH, SecureVault, VaultStorage
-from .api.storage import APIVaultStorage, SecureVaultAPI
-from .api.client import APIClient, setup_api_connection, DEFAULT_CONFIG_PATH
+from .passwords import SYMBOL_SETS
+
+if TYPE_CHECKING:
+    from .models import Vault, VaultEntry
+    from .storage import SecureVault
+
+
+class _LazyConsole:
+    """`rich` konsolunu ilk çıktıda oluşturur."""
 
-console = Console()
+    _console = None
+
+    def __getattr__(self, name: str):
+        if self._console is None:
+            from rich.console import Console
+
+            type(self)._console = Console()
+        return getattr(self._console, name)
+
+
+console = _LazyConsole()
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -33,8 +52,13 @@ def build_parser() -> argparse.ArgumentParser:
     parser.add_argument(
         "--vault",
         dest="vault_path",
-        default=str(DEFAULT_VAULT_PATH),
-        help=f"Kasa dosyasının yolu (varsayılan: {DEFAULT_VAULT_PATH}).",
+        help="Kasa dosyasının yolu (varsayılan: ~/.pass_manager/vault.sec).",
+    )
+    parser.add_argument(
+        "--journal",
+        action="store_true",
+        default=None,
+        help="Kasayı ekleme tabanlı journal depolamasıyla aç (varsa otomatik seçilir).",
     )
     parser.add_argument(
         "--api",
@@ -48,6 +72,15 @@ def build_parser() -> argparse.ArgumentParser:
         default="http://localhost:8000",
         help="API sunucu URL'i (varsayılan: http://localhost:8000).",
     )
+    parser.add_argument(
+        "--no-agent",
+        action="store_true",
+        help="Çalışan ajanı kullanma; kasayı bu süreçte aç.",
+    )
+    parser.add_argument(
+        "--agent-socket",
+        help="Ajan soketinin yolu (varsayılan: $XDG_RUNTIME_DIR/pass-manager-agent/agent.sock).",
+    )
 
     subparsers = parser.add_subparsers(dest="command", required=True)
 
@@ -91,7 +124,10 @@ def build_parser() -> argparse.ArgumentParser:
     )
 
     list_parser = subparsers.add_parser("list", help="Kayıtları tablo halinde göster.")
-    list_parser.add_argument("--filter", help="Servis, kullanıcı veya etikette arama.")
+    list_parser.add_argument(
+        "--filter",
+        help="Servis, kullanıcı veya etikette arama (önek için `git*`, etiket için `tag:iş`).",
+    )
 
     show_parser = subparsers.add_parser("show", help="Belirli bir kaydı görüntüle.")
     show_parser.add_argument("--id", required=True, help="Kayıt ID değeri.")
@@ -106,6 +142,12 @@ def build_parser() -> argparse.ArgumentParser:
 
     gen_parser = subparsers.add_parser("generate", help="Bağımsız parola üret.")
     gen_parser.add_argument("--length", type=int, default=28)
+    gen_parser.add_argument(
+        "--count",
+        type=int,
+        default=1,
+        help="Üretilecek parola sayısı; 1'den fazlaysa her satıra bir parola yazılır.",
+    )
     gen_parser.add_argument(
         "--symbols",
         choices=list(SYMBOL_SETS.keys()),
@@ -123,24 +165,113 @@ def build_parser() -> argparse.ArgumentParser:
         help="Her karakter grubundan en az bir tane kullanma zorunluluğunu kaldır.",
     )
 
+    calibrate_parser = subparsers.add_parser(
+        "kdf-calibrate",
+        help="Bu makine için KDF parametrelerini ölç ve istenirse kasayı yeniden anahtarla.",
+    )
+    calibrate_parser.add_argument(
+        "--kdf",
+        help="Anahtar türetme fonksiyonu: PBKDF2-HMAC-SHA512 (varsayılan), scrypt, argon2id.",
+    )
+    calibrate_parser.add_argument(
+        "--target-ms",
+        type=int,
+        default=500,
+        help="Hedef kilit açma süresi, milisaniye (varsayılan 500).",
+    )
+    calibrate_parser.add_argument(
+        "--apply",
+        action="store_true",
+        help="Seçilen parametrelerle kasayı yeniden anahtarla.",
+    )
+
+    batch_parser = subparsers.add_parser(
+        "batch",
+        help="JSON Lines add/update/delete işlemlerini tek kayıtla uygula.",
+    )
+    batch_parser.add_argument(
+        "file",
+        nargs="?",
+        default="-",
+        help="İşlem dosyası; verilmezse ya da `-` ise standart girdi.",
+    )
+    batch_parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Sonuçları tablo yerine JSON Lines olarak yaz.",
+    )
+
+    import_parser = subparsers.add_parser(
+        "import",
+        help="CSV, JSON Lines, şifreli dışa aktarım ya da başka yöneticilerin CSV'lerinden kayıt al.",
+    )
+    import_parser.add_argument("file", help="İçe aktarılacak dosya; `-` ise standart girdi.")
+    import_parser.add_argument(
+        "--format",
+        default="auto",
+        help="auto (varsayılan), csv, jsonl, encrypted, bitwarden, lastpass, 1password, chrome, firefox.",
+    )
+    import_parser.add_argument(
+        "--on-duplicate",
+        choices=["skip", "update", "keep"],
+        default="skip",
+        help="Aynı servis+kullanıcı kasada varsa: atla (varsayılan), güncelle ya da ayrı kayıt ekle.",
+    )
+
+    export_parser = subparsers.add_parser(
+        "export",
+        help="Kayıtları CSV, JSON Lines ya da parolayla şifrelenmiş dosyaya aktar.",
+    )
+    export_parser.add_argument(
+        "-o",
+        "--output",
+        default="-",
+        help="Çıktı dosyası; verilmezse ya da `-` ise standart çıktı.",
+    )
+    export_parser.add_argument(
+        "--format",
+        help="csv, jsonl ya da encrypted (varsayılan: dosya uzantısından, yoksa jsonl).",
+    )
+    export_parser.add_argument("--filter", help="Yalnızca sorguyla eşleşen kayıtları aktar.")
+
+    agent_parser = subparsers.add_parser(
+        "agent",
+        help="Açılmış kasayı bellekte tutan ajanı yönet (ssh-agent gibi).",
+    )
+    agent_parser.add_argument("action", choices=["start", "stop", "status"])
+    agent_parser.add_argument(
+        "--idle-timeout",
+        type=int,
+        help="Bu kadar saniye istek gelmezse kilitle (varsayılan 900).",
+    )
+    agent_parser.add_argument(
+        "--foreground",
+        action="store_true",
+        help="Arka plana geçme.",
+    )
+
     return parser
 
 
-def prompt_master_password(confirm: bool = False) -> str:
+def prompt_master_password(confirm: bool = False, label: str = "Ana parola") -> str:
     while True:
-        password = getpass("Ana parola: ").strip()
+        password = getpass(f"{label}: ").strip()
         if len(password) < 8:
-            console.print("[red]Ana parola en az 8 karakter olmalıdır.[/red]")
+            console.print(f"[red]{label} en az 8 karakter olmalıdır.[/red]")
             continue
         if not confirm:
             return password
-        password_confirm = getpass("Ana parola (tekrar): ").strip()
+        password_confirm = getpass(f"{label} (tekrar): ").strip()
         if password != password_confirm:
             console.print("[red]Parolalar eşleşmedi. Tekrar deneyin.[/red]")
             continue
         return password
 
 
+def prompt_export_password(confirm: bool = False) -> str:
+    return prompt_master_password(confirm=confirm, label="Dışa aktarım parolası")
+
+
 def prompt_entry_password() -> str:
     while True:
         password = getpass("Kayıt parolası: ").strip()
@@ -160,8 +291,11 @@ def parse_tags(text: Optional[str]) -> List[str]:
     return [tag.strip() for tag in text.split(",") if tag.strip()]
 
 
-def load_vault_from_args(args) -> Tuple[SecureVault, str, Vault]:
+def secure_vault_from_args(args) -> SecureVault:
     if args.use_api:
+        from .api.client import APIClient
+        from .api.storage import APIVaultStorage, SecureVaultAPI
+
         try:
             client = APIClient.load_config()
         except FileNotFoundError:
@@ -170,15 +304,73 @@ def load_vault_from_args(args) -> Tuple[SecureVault, str, Vault]:
         api_storage = APIVaultStorage(client.api_url, client.token)
         secure_vault = SecureVaultAPI(api_storage)
     else:
-        storage = VaultStorage(args.vault_path)
+        from .storage import SecureVault, open_storage
+
+        storage = open_storage(args.vault_path, journal=args.journal)
         secure_vault = SecureVault(storage)
+    return secure_vault
+
+
+def load_vault_from_args(args) -> Tuple[SecureVault, str, Vault]:
+    secure_vault = secure_vault_from_args(args)
     master = prompt_master_password()
     vault = secure_vault.load_vault(master)
     return secure_vault, master, vault
 
 
+class _DirectVault:
+    """Ajan yokken aynı arayüz: kasa bu süreçte açılır, değişiklikler hemen kaydedilir."""
+
+    def __init__(self, secure_vault: SecureVault, master: str, vault: Vault):
+        self.secure_vault = secure_vault
+        self.master = master
+        self.vault = vault
+
+    def list_entries(self, keyword: Optional[str] = None) -> List[VaultEntry]:
+        return self.vault.list_entries(keyword=keyword)
+
+    def get_entry(self, entry_id: str) -> VaultEntry:
+        return self.vault.get_entry(entry_id)
+
+    def add_entry(self, entry: VaultEntry) -> VaultEntry:
+        self.vault.add_entry(entry)
+        self.secure_vault.save_vault(self.master, self.vault)
+        return entry
+
+    def delete_entry(self, entry_id: str) -> VaultEntry:
+        entry = self.vault.delete_entry(entry_id)
+        self.secure_vault.save_vault(self.master, self.vault)
+        return entry
+
+    def apply_batch(self, operations: List[dict]) -> List[dict]:
+        from .batch import apply_operations
+
+        # Hata olursa kasa kaydedilmez; bu süreçteki kopya zaten atılır.
+        results = apply_operations(self.vault, operations)
+        self.secure_vault.save_vault(self.master, self.vault)
+        return results
+
+
+def open_vault(args):
+    """Aynı kasayı tutan bir ajan çalışıyorsa ona bağlanır, yoksa kasayı burada açar."""
+    secure_vault = secure_vault_from_args(args)
+    if not args.no_agent:
+        from .agent import AgentClient, storage_target
+
+        client = AgentClient.connect(args.agent_socket, target=storage_target(secure_vault.storage))
+        if client is not None:
+            return client
+    master = prompt_master_password()
+    return _DirectVault(secure_vault, master, secure_vault.load_vault(master))
+
+
 def handle_init(args) -> None:
+    from rich.panel import Panel
+
     if args.use_api:
+        from .api.client import APIClient
+        from .api.storage import APIVaultStorage, SecureVaultAPI
+
         try:
             client = APIClient.load_config()
         except FileNotFoundError:
@@ -188,7 +380,9 @@ def handle_init(args) -> None:
         secure_vault = SecureVaultAPI(api_storage)
         location_info = f"API: {client.api_url}"
     else:
-        storage = VaultStorage(args.vault_path)
+        from .storage import SecureVault, open_storage
+
+        storage = open_storage(args.vault_path, journal=args.journal)
         secure_vault = SecureVault(storage)
         location_info = f"Konum: [bold]{storage.path}[/bold]"
     
@@ -208,7 +402,12 @@ def handle_init(args) -> None:
 
 
 def handle_add(args) -> None:
-    secure_vault, master, vault = load_vault_from_args(args)
+    from rich.panel import Panel
+
+    from .models import VaultEntry
+    from .passwords import GeneratorOptions, generate_password
+
+    vault = open_vault(args)
     if args.auto:
         options = GeneratorOptions(
             length=args.length,
@@ -231,8 +430,7 @@ def handle_add(args) -> None:
         notes=args.notes,
         tags=parse_tags(args.tags),
     )
-    vault.add_entry(entry)
-    secure_vault.save_vault(master, vault)
+    entry = vault.add_entry(entry)
     console.print(
         Panel.fit(
             f"Kayıt ID: [bold]{entry.entry_id}[/bold]\nServis: {entry.service}\nKullanıcı: {entry.username}",
@@ -252,7 +450,9 @@ def handle_add(args) -> None:
 
 
 def handle_list(args) -> None:
-    _, _, vault = load_vault_from_args(args)
+    from rich.table import Table
+
+    vault = open_vault(args)
     entries = vault.list_entries(keyword=args.filter)
     if not entries:
         console.print("[yellow]Hiç kayıt bulunamadı.[/yellow]")
@@ -278,7 +478,9 @@ def handle_list(args) -> None:
 
 
 def handle_show(args) -> None:
-    _, _, vault = load_vault_from_args(args)
+    from rich.panel import Panel
+
+    vault = open_vault(args)
     try:
         entry = vault.get_entry(args.id)
     except EntryNotFound as exc:
@@ -301,13 +503,14 @@ def handle_show(args) -> None:
 
 
 def handle_delete(args) -> None:
-    secure_vault, master, vault = load_vault_from_args(args)
+    from rich.panel import Panel
+
+    vault = open_vault(args)
     try:
         entry = vault.delete_entry(args.id)
     except EntryNotFound as exc:
         console.print(f"[red]{exc}[/red]")
         return
-    secure_vault.save_vault(master, vault)
     console.print(
         Panel.fit(
             f"{entry.service} / {entry.username}",
@@ -317,14 +520,203 @@ def handle_delete(args) -> None:
     )
 
 
+def handle_batch(args) -> None:
+    import json
+    import sys
+
+    from .batch import parse_operations
+    from .exceptions import BatchError
+
+    try:
+        if args.file == "-":
+            operations = parse_operations(sys.stdin)
+        else:
+            with open(args.file, encoding="utf-8") as handle:
+                operations = parse_operations(handle)
+    except BatchError as exc:
+        console.print(f"[red]{exc}[/red]")
+        return
+    if not operations:
+        console.print("[yellow]Uygulanacak işlem yok.[/yellow]")
+        return
+
+    vault = open_vault(args)
+    try:
+        results = vault.apply_batch(operations)
+    except BatchError as exc:
+        console.print(f"[red]{exc}\nHiçbir değişiklik kaydedilmedi.[/red]")
+        return
+
+    if args.json:
+        for result in results:
+            print(json.dumps(result, ensure_ascii=False))
+        return
+    from rich.table import Table
+
+    table = Table(title=f"{len(results)} işlem uygulandı", show_lines=False)
+    table.add_column("Satır", style="yellow", justify="right")
+    table.add_column("İşlem", style="white")
+    table.add_column("ID", style="cyan", no_wrap=True)
+    table.add_column("Servis", style="white")
+    table.add_column("Kullanıcı", style="magenta")
+    for result in results:
+        operation = result["op"] + (" (üretildi)" if result.get("generated") else "")
+        table.add_row(str(result["line"]), operation, result["entry_id"], result["service"], result["username"])
+    console.print(table)
+
+
+def _progress():
+    from rich.console import Console
+    from rich.progress import BarColumn, DownloadColumn, Progress, TextColumn, TimeElapsedColumn
+
+    # İlerleme standart hataya yazılır; standart çıktı dışa aktarım verisine ayrılır.
+    return Progress(
+        TextColumn("{task.description}"),
+        BarColumn(),
+        DownloadColumn(),
+        TimeElapsedColumn(),
+        console=Console(stderr=True),
+        transient=True,
+    )
+
+
+def handle_import(args) -> None:
+    import sys
+
+    from rich.panel import Panel
+
+    from .transfer import IMPORT_FORMATS, import_entries, is_encrypted_export, read_entries
+
+    if args.format not in IMPORT_FORMATS:
+        console.print(f"[red]Bilinmeyen biçim: {args.format} (seçenekler: {', '.join(IMPORT_FORMATS)}).[/red]")
+        return
+    # Dosya ana parola sorulmadan açılır; yol hatalıysa parola boşa girilmez.
+    try:
+        handle = sys.stdin.buffer if args.file == "-" else open(args.file, "rb")
+    except OSError as exc:
+        raise VaultError(f"Dosya açılamadı: {exc}") from exc
+    try:
+        secure_vault, master, vault = load_vault_from_args(args)
+        fmt = args.format
+        if fmt == "auto" and is_encrypted_export(handle.peek(4096)[:4096]):
+            fmt = "encrypted"
+        password = prompt_export_password() if fmt == "encrypted" else None
+        rows = read_entries(handle, fmt, password=password)
+        size = os.fstat(handle.fileno()).st_size if args.file != "-" else None
+        with _progress() as progress:
+            task = progress.add_task("İçe aktarılıyor", total=size)
+
+            def report(stats) -> None:
+                completed = handle.tell() if size is not None else None
+                progress.update(task, completed=completed, description=f"{stats.total} kayıt okundu")
+
+            stats = import_entries(vault, rows, on_duplicate=args.on_duplicate, progress=report)
+    finally:
+        if handle is not sys.stdin.buffer:
+            handle.close()
+    if stats.added or stats.updated:
+        secure_vault.save_vault(master, vault)
+    summary = (
+        f"Eklendi: {stats.added}\nGüncellendi: {stats.updated}\n"
+        f"Atlandı (kopya): {stats.skipped}\nGeçersiz: {stats.invalid}"
+    )
+    console.print(Panel.fit(summary, title="İçe aktarma tamamlandı", border_style="green"))
+    for error in stats.errors:
+        console.print(f"[yellow]{error}[/yellow]")
+
+
+def handle_export(args) -> None:
+    import io
+    import sys
+
+    from rich.panel import Panel
+
+    from .transfer import EXPORT_FORMATS, write_csv, write_encrypted, write_jsonl
+
+    extensions = {".csv": "csv", ".jsonl": "jsonl", ".pmx": "encrypted"}
+    fmt = args.format or extensions.get(os.path.splitext(args.output)[1].lower(), "jsonl")
+    if fmt not in EXPORT_FORMATS:
+        console.print(f"[red]Bilinmeyen biçim: {fmt} (seçenekler: {', '.join(EXPORT_FORMATS)}).[/red]")
+        return
+    _, _, vault = load_vault_from_args(args)
+    password = prompt_export_password(confirm=True) if fmt == "encrypted" else None
+    entries = vault.list_entries(keyword=args.filter)
+
+    if args.output == "-":
+        binary = sys.stdout.buffer
+    else:
+        # Düz metin parolalar içerebilir; dosya yalnızca sahibine açık oluşturulur.
+        binary = os.fdopen(os.open(args.output, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "wb")
+    try:
+        if fmt == "encrypted":
+            writer = write_encrypted(entries, binary, password)
+            text = None
+        else:
+            text = io.TextIOWrapper(binary, encoding="utf-8", newline="", write_through=False)
+            writer = (write_csv if fmt == "csv" else write_jsonl)(entries, text)
+        with _progress() as progress:
+            task = progress.add_task("Dışa aktarılıyor", total=len(entries))
+            for count, _ in enumerate(writer, start=1):
+                if count % 1000 == 0:
+                    progress.update(task, completed=count)
+        if text is not None:
+            text.flush()
+            text.detach()
+        binary.flush()
+    finally:
+        if binary is not sys.stdout.buffer:
+            binary.close()
+    if args.output != "-":
+        console.print(
+            Panel.fit(
+                f"{len(entries)} kayıt\nBiçim: {fmt}\nDosya: {args.output}",
+                title="Dışa aktarma tamamlandı",
+                border_style="green",
+            )
+        )
+
+
+def _write_lines(lines: Iterator[str], chunk_size: int = 1024) -> None:
+    import sys
+    from itertools import islice
+
+    try:
+        while True:
+            chunk = list(islice(lines, chunk_size))
+            if not chunk:
+                break
+            sys.stdout.write("\n".join(chunk) + "\n")
+        sys.stdout.flush()
+    except BrokenPipeError:
+        # Okuyan taraf (ör. `head`) erken kapandı; çıkışta yeniden hata vermesin.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+
+
 def handle_generate(args) -> None:
+    from .passwords import GeneratorOptions, PasswordGenerator
+
     options = GeneratorOptions(
         length=args.length,
         symbols=args.symbols,
         allow_ambiguous=args.allow_ambiguous,
         require_each_category=not args.no_require_each,
     )
-    password = generate_password(options)
+    if args.count < 1:
+        console.print("[red]Parola sayısı en az 1 olmalı.[/red]")
+        return
+    try:
+        generator = PasswordGenerator(options, buffer_size=4096 if args.count == 1 else 1024 * 1024)
+    except ValueError as exc:
+        console.print(f"[red]{exc}[/red]")
+        return
+    if args.count > 1:
+        # Betikler için düz çıktı; parolalar üretildikçe yazılır.
+        _write_lines(generator.generate_many(args.count))
+        return
+
+    from rich.panel import Panel
+
+    password = generator.generate()
     console.print(
         Panel(
             f"[bold green]{password}[/bold green]",
@@ -334,8 +726,110 @@ def handle_generate(args) -> None:
     )
 
 
+def handle_kdf_calibrate(args) -> None:
+    from rich.panel import Panel
+    from rich.table import Table
+
+    from .crypto import KDFS, PBKDF2_NAME, calibrate_kdf
+
+    kdf = args.kdf or PBKDF2_NAME
+    if kdf not in KDFS:
+        console.print(f"[red]Desteklenmeyen KDF: {kdf} (seçenekler: {', '.join(KDFS)}).[/red]")
+        return
+    if args.target_ms <= 0:
+        console.print("[red]Hedef süre pozitif olmalı.[/red]")
+        return
+    with console.status("KDF ölçülüyor..."):
+        params, elapsed = calibrate_kdf(kdf, args.target_ms / 1000)
+
+    table = Table(title="KDF kalibrasyonu", show_lines=False)
+    table.add_column("Parametre", style="cyan")
+    table.add_column("Değer", style="white")
+    for key, value in params.items():
+        table.add_row(key, str(value))
+    table.add_row("Ölçülen süre", f"{elapsed * 1000:.0f} ms")
+    console.print(table)
+
+    if not args.apply:
+        console.print("[yellow]Kasaya uygulamak için `--apply` ile tekrar çalıştırın.[/yellow]")
+        return
+    secure_vault, master, vault = load_vault_from_args(args)
+    secure_vault.kdf = params
+    secure_vault.save_vault(master, vault)
+    console.print(
+        Panel.fit(
+            f"KDF: {params['name']}\nKayıtlar yeniden şifrelenmedi; yalnızca kasa anahtarı yeniden sarıldı.",
+            title="Kasa yeniden anahtarlandı",
+            border_style="green",
+        )
+    )
+
+
+def handle_agent(args) -> None:
+    from rich.panel import Panel
+
+    from .agent import IDLE_TIMEOUT_SECONDS, AgentClient, VaultAgent
+
+    client = AgentClient.connect(args.agent_socket)
+    if args.action == "status":
+        if client is None:
+            console.print("[yellow]Çalışan ajan yok.[/yellow]")
+            return
+        status = client.status()
+        console.print(
+            Panel.fit(
+                f"Kasa: {status['target']}\nPID: {status['pid']}\nKayıt: {status['entries']}\n"
+                f"Kilitlenmeye kalan: {status['idle_left']:.0f} sn",
+                title="Ajan çalışıyor",
+                border_style="green",
+            )
+        )
+        return
+    if args.action == "stop":
+        if client is None:
+            console.print("[yellow]Çalışan ajan yok.[/yellow]")
+            return
+        client.stop()
+        console.print("[green]Ajan kilitlendi ve kapatıldı.[/green]")
+        return
+    if client is not None:
+        console.print("[yellow]Ajan zaten çalışıyor; önce `agent stop` çalıştırın.[/yellow]")
+        return
+    idle_timeout = IDLE_TIMEOUT_SECONDS if args.idle_timeout is None else args.idle_timeout
+    secure_vault, master, vault = load_vault_from_args(args)
+    agent = VaultAgent(secure_vault, master, vault, args.agent_socket, idle_timeout=idle_timeout)
+    agent.bind()
+    console.print(
+        Panel.fit(
+            f"Kasa: {agent.target}\nSoket: {agent.socket_path}\nBoşta kilit: {idle_timeout} sn",
+            title="Ajan başlatıldı",
+            border_style="green",
+        )
+    )
+    if args.foreground or not hasattr(os, "fork"):
+        agent.serve()
+        return
+    if os.fork():
+        # Ebeveyn kendi kopyasındaki anahtarları sıfırlar; soket dosyası çocukta kalır.
+        agent._server.server_close()
+        secure_vault.lock()
+        return
+    os.setsid()
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1, 2):
+        os.dup2(devnull, fd)
+    try:
+        agent.serve()
+    finally:
+        os._exit(0)
+
+
 def handle_api_setup(args) -> None:
     """API bağlantısını kur."""
+    from rich.panel import Panel
+
+    from .api.client import DEFAULT_CONFIG_PATH, setup_api_connection
+
     try:
         client = setup_api_connection(args.api_url)
         console.print(
@@ -356,8 +850,13 @@ def dispatch(args) -> None:
         "list": handle_list,
         "show": handle_show,
         "delete": handle_delete,
+        "batch": handle_batch,
+        "import": handle_import,
+        "export": handle_export,
         "generate": handle_generate,
         "api-setup": handle_api_setup,
+        "kdf-calibrate": handle_kdf_calibrate,
+        "agent": handle_agent,
     }
     handler = command_map.get(args.command)
     if not handler:
@@ -0,0 +1,199 @@
+"""Şifrelenmeden önceki düz metin için değiştirilebilir kodlayıcılar.
+
+- ``json``: sıkıştırılmış (boşluksuz) JSON; varsayılan ve web istemcisiyle uyumlu.
+- ``binary``: uzunluk önekli, etiketli ikili kayıt biçimi.
+- ``json+deflate`` / ``binary+deflate``: aynı biçimler, yeterince uzun
+  kayıtlarda zlib ile sıkıştırılmış. Sıkıştırma şifrelemeden önce yapılır;
+  şifreli metin sıkışmaz.
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+import zlib
+from typing import Any, Dict, Tuple, Union
+
+from .exceptions import VaultIntegrityError
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+_U8 = struct.Struct(">B")
+_U32 = struct.Struct(">I")
+_I64 = struct.Struct(">q")
+
+
+class JsonCodec:
+    name = "json"
+
+    @staticmethod
+    def encode(value: Any) -> bytes:
+        return json.dumps(value, separators=(",", ":"), sort_keys=True).encode("utf-8")
+
+    @staticmethod
+    def decode(data: Buffer) -> Any:
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        return json.loads(data)
+
+
+class BinaryCodec:
+    """Etiketli ikili biçim: her değer bir tip baytı ve gerekirse uzunlukla başlar."""
+
+    name = "binary"
+
+    @classmethod
+    def encode(cls, value: Any) -> bytes:
+        out = bytearray()
+        cls._encode_into(out, value)
+        return bytes(out)
+
+    @classmethod
+    def _encode_into(cls, out: bytearray, value: Any) -> None:
+        if value is None:
+            out += b"N"
+        elif value is True:
+            out += b"T"
+        elif value is False:
+            out += b"F"
+        elif isinstance(value, int):
+            out += b"i"
+            out += _I64.pack(value)
+        elif isinstance(value, str):
+            cls._encode_str(out, value)
+        elif isinstance(value, (bytes, bytearray, memoryview)):
+            out += b"b"
+            out += _U32.pack(len(value))
+            out += value
+        elif isinstance(value, (list, tuple)):
+            out += b"l"
+            out += _U32.pack(len(value))
+            for item in value:
+                cls._encode_into(out, item)
+        elif isinstance(value, dict):
+            out += b"d"
+            out += _U32.pack(len(value))
+            for key in sorted(value):
+                cls._encode_str(out, key)
+                cls._encode_into(out, value[key])
+        else:
+            raise TypeError(f"İkili kodlayıcı bu tipi desteklemiyor: {type(value).__name__}")
+
+    @staticmethod
+    def _encode_str(out: bytearray, value: str) -> None:
+        # Kısa metinler (alan adları, servis, kullanıcı) tek baytlık uzunlukla yazılır.
+        raw = value.encode("utf-8")
+        if len(raw) < 256:
+            out += b"s"
+            out += _U8.pack(len(raw))
+        else:
+            out += b"S"
+            out += _U32.pack(len(raw))
+        out += raw
+
+    @classmethod
+    def decode(cls, data: Buffer) -> Any:
+        view = memoryview(data)
+        try:
+            value, offset = cls._decode_from(view, 0)
+        except (IndexError, struct.error, UnicodeDecodeError, KeyError) as exc:
+            raise VaultIntegrityError("İkili kayıt çözümlenemedi.") from exc
+        if offset != len(view):
+            raise VaultIntegrityError("İkili kaydın sonunda fazladan veri var.")
+        return value
+
+    @classmethod
+    def _decode_from(cls, view: memoryview, offset: int) -> Tuple[Any, int]:
+        tag = view[offset : offset + 1].tobytes()
+        offset += 1
+        if tag == b"N":
+            return None, offset
+        if tag == b"T":
+            return True, offset
+        if tag == b"F":
+            return False, offset
+        if tag == b"i":
+            return _I64.unpack_from(view, offset)[0], offset + _I64.size
+        if tag in (b"s", b"S", b"b"):
+            size = _U8 if tag == b"s" else _U32
+            (length,) = size.unpack_from(view, offset)
+            offset += size.size
+            chunk = view[offset : offset + length]
+            if len(chunk) != length:
+                raise IndexError("kesik kayıt")
+            value = chunk.tobytes() if tag == b"b" else str(chunk, "utf-8")
+            return value, offset + length
+        if tag == b"l":
+            (count,) = _U32.unpack_from(view, offset)
+            offset += _U32.size
+            items = []
+            for _ in range(count):
+                item, offset = cls._decode_from(view, offset)
+                items.append(item)
+            return items, offset
+        if tag == b"d":
+            (count,) = _U32.unpack_from(view, offset)
+            offset += _U32.size
+            result: Dict[str, Any] = {}
+            for _ in range(count):
+                key, offset = cls._decode_from(view, offset)
+                if not isinstance(key, str):
+                    raise KeyError(key)
+                result[key], offset = cls._decode_from(view, offset)
+            return result, offset
+        raise KeyError(tag)
+
+
+class DeflateCodec:
+    """Başka bir kodlayıcının çıktısını zlib ile sıkıştırır.
+
+    İlk bayt biçimi belirtir (0: ham, 1: zlib). `min_size` altındaki ya da
+    sıkıştırınca küçülmeyen kayıtlar ham saklanır.
+    """
+
+    RAW = b"\x00"
+    ZLIB = b"\x01"
+
+    def __init__(self, inner, min_size: int = 128, level: int = 6):
+        self.inner = inner
+        self.name = f"{inner.name}+deflate"
+        self.min_size = min_size
+        self.level = level
+
+    def encode(self, value: Any) -> bytes:
+        raw = self.inner.encode(value)
+        if len(raw) >= self.min_size:
+            packed = zlib.compress(raw, self.level)
+            if len(packed) < len(raw):
+                return self.ZLIB + packed
+        return self.RAW + raw
+
+    def decode(self, data: Buffer) -> Any:
+        view = memoryview(data)
+        flag = view[:1].tobytes()
+        if flag == self.RAW:
+            return self.inner.decode(view[1:])
+        if flag != self.ZLIB:
+            raise VaultIntegrityError("Kaydın sıkıştırma işareti geçersiz.")
+        try:
+            return self.inner.decode(zlib.decompress(view[1:]))
+        except zlib.error as exc:
+            raise VaultIntegrityError("Sıkıştırılmış kayıt açılamadı.") from exc
+
+
+CODECS: Dict[str, Any] = {
+    codec.name: codec
+    for codec in (JsonCodec, BinaryCodec, DeflateCodec(JsonCodec), DeflateCodec(BinaryCodec))
+}
+# Zarfta kodlayıcı belirtilmemişse (eski kasalar) varsayılan.
+DEFAULT_CODEC = JsonCodec.name
+# Yeni yazılan kasaların kodlayıcısı.
+PREFERRED_CODEC = "json+deflate"
+
+
+def get_codec(name: str = DEFAULT_CODEC):
+    try:
+        return CODECS[name]
+    except KeyError as exc:
+        raise VaultIntegrityError(f"Bilinmeyen kayıt kodlayıcısı: {name}") from exc
+
@@ -0,0 +1,117 @@
+"""Sürüm 2 kasa zarfı için ikili dosya biçimi.
+
+Yerleşim (tüm tamsayılar big-endian)::
+
+    MAGIC (4) | biçim sürümü (1) | başlık uzunluğu (u32) | başlık JSON
+    sarılı veri anahtarı kaydı | meta kaydı
+    kayıt sayısı (u32) | [kimlik uzunluğu (u16) | kimlik | kayıt] ...
+
+Her kayıt ``nonce uzunluğu (u8) | nonce | şifreli metin uzunluğu (u32) | şifreli metin``
+şeklindedir. Şifreli metinler base64'e çevrilmeden ham olarak saklanır.
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+from typing import Any, Dict, Tuple, Union
+
+from .crypto import json_default, raw_bytes
+from .exceptions import VaultIntegrityError
+
+MAGIC = b"PMVB"
+FORMAT_VERSION = 1
+_BULK_KEYS = ("cipher", "meta", "entries")
+
+_U8 = struct.Struct(">B")
+_U16 = struct.Struct(">H")
+_U32 = struct.Struct(">I")
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+def is_container(prefix: Buffer) -> bool:
+    return bytes(prefix[: len(MAGIC)]) == MAGIC
+
+
+def _pack_record(out: bytearray, record: Dict[str, Any]) -> None:
+    nonce = raw_bytes(record["nonce"])
+    payload = raw_bytes(record["payload"])
+    out += _U8.pack(len(nonce))
+    out += nonce
+    out += _U32.pack(len(payload))
+    out += payload
+
+
+def _unpack_record(view: memoryview, offset: int) -> Tuple[Dict[str, memoryview], int]:
+    (nonce_size,) = _U8.unpack_from(view, offset)
+    offset += _U8.size
+    nonce = view[offset : offset + nonce_size]
+    offset += nonce_size
+    (payload_size,) = _U32.unpack_from(view, offset)
+    offset += _U32.size
+    payload = view[offset : offset + payload_size]
+    offset += payload_size
+    if len(payload) != payload_size:
+        raise VaultIntegrityError("Kasa dosyası kesik görünüyor.")
+    return {"nonce": nonce, "payload": payload}, offset
+
+
+def encode_container(envelope: Dict[str, Any]) -> bytes:
+    if envelope.get("version") != 2:
+        raise ValueError("İkili kasa biçimi yalnızca sürüm 2 zarfları destekler.")
+    header = {key: value for key, value in envelope.items() if key not in _BULK_KEYS}
+    header["cipher_name"] = envelope["cipher"].get("name", "AES-256-GCM")
+    header_bytes = json.dumps(
+        header, separators=(",", ":"), sort_keys=True, default=json_default
+    ).encode("utf-8")
+
+    out = bytearray(MAGIC)
+    out += _U8.pack(FORMAT_VERSION)
+    out += _U32.pack(len(header_bytes))
+    out += header_bytes
+    _pack_record(out, envelope["cipher"])
+    _pack_record(out, envelope["meta"])
+    entries = envelope["entries"]
+    out += _U32.pack(len(entries))
+    for entry_id, record in entries.items():
+        raw_id = entry_id.encode("utf-8")
+        out += _U16.pack(len(raw_id))
+        out += raw_id
+        _pack_record(out, record)
+    return bytes(out)
+
+
+def decode_container(data: Buffer) -> Dict[str, Any]:
+    """İkili zarfı çözer; bayt alanları `data` üzerindeki memoryview dilimleridir."""
+    view = memoryview(data)
+    if not is_container(view):
+        raise VaultIntegrityError("Kasa dosyası tanınmayan bir biçimde.")
+    try:
+        offset = len(MAGIC)
+        (format_version,) = _U8.unpack_from(view, offset)
+        if format_version != FORMAT_VERSION:
+            raise VaultIntegrityError(f"Desteklenmeyen kasa dosyası sürümü: {format_version}")
+        offset += _U8.size
+        (header_size,) = _U32.unpack_from(view, offset)
+        offset += _U32.size
+        envelope = json.loads(bytes(view[offset : offset + header_size]))
+        offset += header_size
+
+        cipher, offset = _unpack_record(view, offset)
+        cipher["name"] = envelope.pop("cipher_name", "AES-256-GCM")
+        meta, offset = _unpack_record(view, offset)
+        (count,) = _U32.unpack_from(view, offset)
+        offset += _U32.size
+        entries: Dict[str, Dict[str, memoryview]] = {}
+        for _ in range(count):
+            (id_size,) = _U16.unpack_from(view, offset)
+            offset += _U16.size
+            entry_id = str(view[offset : offset + id_size], "utf-8")
+            offset += id_size
+            entries[entry_id], offset = _unpack_record(view, offset)
+    except (struct.error, ValueError) as exc:
+        raise VaultIntegrityError("Kasa dosyası bozuk görünüyor.") from exc
+
+    envelope.update(cipher=cipher, meta=meta, entries=entries)
+    return envelope
@@ -2,18 +2,41 @@ from __future__ import annotations
 
 import base64
 import hashlib
+import hmac
 import json
 import secrets
-from typing import Any, Dict
+import time
+import zlib
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple, Union
 
 from cryptography.exceptions import InvalidTag
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 
+try:
+    from cryptography.hazmat.primitives.kdf.argon2 import Argon2id
+except ImportError:  # cryptography < 44
+    Argon2id = None
+
+from .codec import DEFAULT_CODEC, get_codec
 from .exceptions import InvalidMasterPassword, VaultIntegrityError
 
+BytesField = Union[str, bytes, bytearray, memoryview]
+KdfParams = Dict[str, Any]
+
 SALT_SIZE = 16
 NONCE_SIZE = 12
 KDF_ITERATIONS = 310_000
+PBKDF2_NAME = "PBKDF2-HMAC-SHA512"
+SCRYPT_NAME = "scrypt"
+ARGON2ID_NAME = "argon2id"
+DEFAULT_KDF: KdfParams = {"name": PBKDF2_NAME, "iterations": KDF_ITERATIONS}
+SESSION_TTL_SECONDS = 15 * 60
+DATA_KEY_SIZE = 32
+KEY_WRAP_AAD = b"pass-manager/data-key"
+META_AAD = b"pass-manager/meta"
+# Tek parça (sürüm 1) yükte bu boyuttan büyük düz metin şifrelenmeden önce sıkıştırılır.
+PAYLOAD_COMPRESS_MIN_BYTES = 1024
+DEFLATE_NAME = "deflate"
 
 
 def _b64e(data: bytes) -> str:
@@ -24,61 +47,445 @@ def _b64d(data: str) -> bytes:
     return base64.b64decode(data.encode("utf-8"))
 
 
+def raw_bytes(data: BytesField) -> Union[bytes, bytearray, memoryview]:
+    """Zarf alanını ham bayta çevirir; JSON'dan gelen base64 metni çözer."""
+    if isinstance(data, str):
+        return _b64d(data)
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return data
+    raise TypeError("Zarf alanı bayt ya da base64 metni olmalı.")
+
+
+def json_default(value: Any) -> str:
+    """`json.dump` için: zarftaki ham bayt alanlarını base64 metne çevirir."""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return _b64e(bytes(value))
+    raise TypeError(f"JSON'a çevrilemeyen değer: {type(value).__name__}")
+
+
 def derive_key(master_password: str, salt: bytes, iterations: int = KDF_ITERATIONS) -> bytes:
     return hashlib.pbkdf2_hmac(
         "sha512", master_password.encode("utf-8"), salt, iterations, dklen=32
     )
 
 
-def encrypt_payload(master_password: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+def _scrypt_maxmem(n: int, r: int, p: int) -> int:
+    return 128 * r * (n + p + 2) + 1024 * 1024
+
+
+def _derive_pbkdf2(master_password: str, salt: bytes, params: KdfParams) -> bytes:
+    return derive_key(master_password, salt, params["iterations"])
+
+
+def _derive_scrypt(master_password: str, salt: bytes, params: KdfParams) -> bytes:
+    n, r, p = params["n"], params["r"], params["p"]
+    return hashlib.scrypt(
+        master_password.encode("utf-8"),
+        salt=salt,
+        n=n,
+        r=r,
+        p=p,
+        maxmem=_scrypt_maxmem(n, r, p),
+        dklen=32,
+    )
+
+
+def _derive_argon2id(master_password: str, salt: bytes, params: KdfParams) -> bytes:
+    kdf = Argon2id(
+        salt=salt,
+        length=32,
+        iterations=params["iterations"],
+        lanes=params["lanes"],
+        memory_cost=params["memory_cost"],
+    )
+    return kdf.derive(master_password.encode("utf-8"))
+
+
+# KDF adı -> (türetme fonksiyonu, zarfta saklanan tamsayı parametreleri).
+KDFS: Dict[str, Tuple[Callable[[str, bytes, KdfParams], bytes], Tuple[str, ...]]] = {
+    PBKDF2_NAME: (_derive_pbkdf2, ("iterations",)),
+    SCRYPT_NAME: (_derive_scrypt, ("n", "r", "p")),
+}
+if Argon2id is not None:
+    # memory_cost KiB cinsindendir.
+    KDFS[ARGON2ID_NAME] = (_derive_argon2id, ("iterations", "memory_cost", "lanes"))
+
+
+def normalize_kdf(params: KdfParams) -> KdfParams:
+    """KDF parametrelerini doğrular; yalnızca adı ve bilinen alanları döndürür."""
+    name = params.get("name")
+    if name not in KDFS:
+        raise ValueError(f"Desteklenmeyen KDF: {name}")
+    _, fields = KDFS[name]
+    normalized: KdfParams = {"name": name}
+    for field in fields:
+        value = int(params[field])
+        if value < 1:
+            raise ValueError(f"Geçersiz KDF parametresi: {field}={value}")
+        normalized[field] = value
+    if name == SCRYPT_NAME and normalized["n"] & (normalized["n"] - 1):
+        raise ValueError("scrypt için n ikinin kuvveti olmalı.")
+    return normalized
+
+
+def derive_key_with(master_password: str, salt: bytes, kdf: KdfParams) -> bytes:
+    derive, _ = KDFS[kdf["name"]]
+    return derive(master_password, salt, kdf)
+
+
+def kdf_block(salt: bytes, kdf: KdfParams) -> Dict[str, Any]:
+    return dict(kdf, salt=_b64e(salt))
+
+
+# Kalibrasyonun altına inmeyeceği parametreler (OWASP önerileri).
+KDF_FLOORS: Dict[str, KdfParams] = {
+    PBKDF2_NAME: {"name": PBKDF2_NAME, "iterations": 210_000},
+    SCRYPT_NAME: {"name": SCRYPT_NAME, "n": 2**15, "r": 8, "p": 1},
+    ARGON2ID_NAME: {"name": ARGON2ID_NAME, "iterations": 2, "memory_cost": 64 * 1024, "lanes": 4},
+}
+SCRYPT_MAX_N = 2**20
+
+
+def time_kdf(kdf: KdfParams, rounds: int = 1) -> float:
+    """Verilen parametrelerle bir anahtar türetmenin süresini (saniye) ölçer."""
     salt = secrets.token_bytes(SALT_SIZE)
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        derive_key_with("pass-manager-calibration", salt, kdf)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def calibrate_kdf(name: str = PBKDF2_NAME, target_seconds: float = 0.5) -> Tuple[KdfParams, float]:
+    """Bu makinede kilit açmanın yaklaşık `target_seconds` süreceği parametreleri seçer.
+
+    Taban parametrelerle bir ölçüm yapılır ve maliyet parametresi süreyle orantılı
+    büyütülür; sonuç `KDF_FLOORS` altına inmez. (parametreler, ölçülen süre) döndürür.
+    """
+    if name not in KDFS:
+        raise ValueError(f"Desteklenmeyen KDF: {name}")
+    params = dict(KDF_FLOORS[name])
+    elapsed = time_kdf(params)
+    scale = target_seconds / elapsed if elapsed > 0 else 1.0
+    if scale <= 1:
+        return params, elapsed
+
+    if name == SCRYPT_NAME:
+        # n ikinin kuvveti olmalı; bellek kullanımı da n ile doğrusal büyür.
+        n = params["n"]
+        while n * 2 <= SCRYPT_MAX_N and n * 2 <= params["n"] * scale:
+            n *= 2
+        params["n"] = n
+    elif name == PBKDF2_NAME:
+        params["iterations"] = int(params["iterations"] * scale) // 1000 * 1000
+    else:
+        params["iterations"] = int(params["iterations"] * scale)
+    return params, time_kdf(params)
+
+
+class KeySession:
+    """Kilit açık oturum boyunca türetilmiş AES anahtarını ve tuzunu tutar.
+
+    Anahtar bir `bytearray` içinde saklanır; `zeroize` ya da süre dolumu
+    sonrasında sıfırlanır. Ana parola saklanmaz, yalnızca oturuma özel
+    rastgele bir anahtarla HMAC etiketi tutulur.
+    """
+
+    def __init__(
+        self,
+        key: bytes,
+        salt: bytes,
+        kdf: KdfParams = DEFAULT_KDF,
+        ttl: Optional[float] = SESSION_TTL_SECONDS,
+        master_password: Optional[str] = None,
+    ):
+        self._key = bytearray(key)
+        self.salt = salt
+        self.kdf = kdf
+        self.expires_at = None if ttl is None else time.monotonic() + ttl
+        self._pepper = secrets.token_bytes(32)
+        self._master_tag = (
+            self._tag(master_password) if master_password is not None else None
+        )
+
+    @classmethod
+    def derive(
+        cls,
+        master_password: str,
+        salt: Optional[bytes] = None,
+        kdf: Optional[KdfParams] = None,
+        ttl: Optional[float] = SESSION_TTL_SECONDS,
+    ) -> "KeySession":
+        salt = salt or secrets.token_bytes(SALT_SIZE)
+        kdf = kdf or DEFAULT_KDF
+        key = derive_key_with(master_password, salt, kdf)
+        return cls(key, salt, kdf, ttl=ttl, master_password=master_password)
+
+    def _tag(self, master_password: str) -> bytes:
+        return hmac.new(self._pepper, master_password.encode("utf-8"), hashlib.sha256).digest()
+
+    @property
+    def active(self) -> bool:
+        if not self._key:
+            return False
+        if self.expires_at is not None and time.monotonic() >= self.expires_at:
+            self.zeroize()
+            return False
+        return True
+
+    def matches(self, salt: bytes, kdf: KdfParams) -> bool:
+        return self.active and self.salt == salt and self.kdf == kdf
+
+    def unlocks(self, master_password: Optional[str]) -> bool:
+        """Oturumun verilen ana parolayla türetilip türetilmediğini kontrol eder."""
+        if master_password is None or self._master_tag is None:
+            return False
+        return hmac.compare_digest(self._tag(master_password), self._master_tag)
+
+    def cipher(self) -> AESGCM:
+        if not self.active:
+            raise InvalidMasterPassword("Oturum anahtarı süresi dolmuş veya silinmiş.")
+        return AESGCM(bytes(self._key))
+
+    def zeroize(self) -> None:
+        self._key[:] = bytes(len(self._key))
+        self._key = bytearray()
+        self._master_tag = None
+
+
+def envelope_kdf_params(envelope: Dict[str, Any]) -> Tuple[bytes, KdfParams]:
+    try:
+        kdf = envelope["kdf"]
+        salt = bytes(raw_bytes(kdf["salt"]))
+    except (KeyError, TypeError, ValueError) as exc:
+        raise VaultIntegrityError("Kasa dosyası bozuk görünüyor.") from exc
+    try:
+        return salt, normalize_kdf(kdf)
+    except (KeyError, TypeError, ValueError) as exc:
+        raise VaultIntegrityError(f"Kasa KDF parametreleri geçersiz: {exc}") from exc
+
+
+def encrypt_payload(
+    master_password: Optional[str],
+    payload: Dict[str, Any],
+    session: Optional[KeySession] = None,
+) -> Dict[str, Any]:
+    owned = session is None or not session.active
+    if owned:
+        session = KeySession.derive(master_password, ttl=None)
     nonce = secrets.token_bytes(NONCE_SIZE)
-    key = derive_key(master_password, salt)
-    aesgcm = AESGCM(key)
+    aesgcm = session.cipher()
+    if owned:
+        session.zeroize()
     serialized = json.dumps(payload, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    cipher: Dict[str, Any] = {"name": "AES-256-GCM", "nonce": _b64e(nonce)}
+    if len(serialized) >= PAYLOAD_COMPRESS_MIN_BYTES:
+        serialized = zlib.compress(serialized)
+        cipher["compression"] = DEFLATE_NAME
     ciphertext = aesgcm.encrypt(nonce, serialized, None)
+    cipher["payload"] = _b64e(ciphertext)
     checksum = hashlib.sha256(ciphertext).hexdigest()
     return {
         "version": 1,
-        "kdf": {
-            "name": "PBKDF2-HMAC-SHA512",
-            "iterations": KDF_ITERATIONS,
-            "salt": _b64e(salt),
-        },
-        "cipher": {
-            "name": "AES-256-GCM",
-            "nonce": _b64e(nonce),
-            "payload": _b64e(ciphertext),
-        },
+        "kdf": kdf_block(session.salt, session.kdf),
+        "cipher": cipher,
         "checksum": checksum,
     }
 
 
-def decrypt_payload(master_password: str, envelope: Dict[str, Any]) -> Dict[str, Any]:
+def new_data_key() -> bytearray:
+    return bytearray(AESGCM.generate_key(bit_length=DATA_KEY_SIZE * 8))
+
+
+def entry_aad(entry_id: str) -> bytes:
+    return b"pass-manager/entry:" + entry_id.encode("utf-8")
+
+
+def seal_record(
+    aesgcm: AESGCM, aad: bytes, payload: Any, codec: str = DEFAULT_CODEC
+) -> Dict[str, bytes]:
+    nonce = secrets.token_bytes(NONCE_SIZE)
+    serialized = get_codec(codec).encode(payload)
+    return {"nonce": nonce, "payload": aesgcm.encrypt(nonce, serialized, aad)}
+
+
+def open_record(
+    aesgcm: AESGCM, aad: bytes, record: Dict[str, BytesField], codec: str = DEFAULT_CODEC
+) -> Any:
+    try:
+        nonce = raw_bytes(record["nonce"])
+        ciphertext = raw_bytes(record["payload"])
+    except (KeyError, TypeError, ValueError) as exc:
+        raise VaultIntegrityError("Kasa kaydı bozuk görünüyor.") from exc
+    try:
+        plaintext = aesgcm.decrypt(nonce, ciphertext, aad)
+    except InvalidTag as exc:
+        raise VaultIntegrityError("Kasa kaydı doğrulanamadı.") from exc
+    try:
+        return get_codec(codec).decode(plaintext)
+    except ValueError as exc:
+        raise VaultIntegrityError("Kasa kaydı çözümlenemedi.") from exc
+
+
+def record_digest(record: Dict[str, BytesField]) -> str:
+    digest = hashlib.sha256(raw_bytes(record["nonce"]))
+    digest.update(raw_bytes(record["payload"]))
+    return digest.hexdigest()
+
+
+def manifest_digest(manifest: Dict[str, str]) -> str:
+    """Kayıt kimliği → özet eşlemesinin sıradan bağımsız tek özeti.
+
+    Meta kaydına tüm manifest yerine bu değer mühürlenir; böylece meta kaydı
+    kasa büyüdükçe büyümez ve artımlı kayıtta başlık sabit boyutta kalır.
+    """
+    digest = hashlib.sha256()
+    for entry_id in sorted(manifest):
+        digest.update(f"{entry_id}:{manifest[entry_id]}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def wrap_data_key(session: KeySession, data_key: bytearray) -> Dict[str, Any]:
+    nonce = secrets.token_bytes(NONCE_SIZE)
+    wrapped = session.cipher().encrypt(nonce, bytes(data_key), KEY_WRAP_AAD)
+    return {"name": "AES-256-GCM", "nonce": nonce, "payload": wrapped}
+
+
+def unwrap_data_key(session: KeySession, cipher: Dict[str, BytesField]) -> bytearray:
+    try:
+        nonce = raw_bytes(cipher["nonce"])
+        wrapped = raw_bytes(cipher["payload"])
+    except (KeyError, TypeError, ValueError) as exc:
+        raise VaultIntegrityError("Kasa dosyası bozuk görünüyor.") from exc
+    try:
+        return bytearray(session.cipher().decrypt(nonce, wrapped, KEY_WRAP_AAD))
+    except InvalidTag as exc:
+        raise InvalidMasterPassword("Ana parola hatalı veya veri bozulmuş.") from exc
+
+
+def _header_checksum(cipher: Dict[str, BytesField], meta: Dict[str, BytesField]) -> str:
+    digest = hashlib.sha256(raw_bytes(cipher["payload"]))
+    digest.update(raw_bytes(meta["payload"]))
+    return digest.hexdigest()
+
+
+def build_records_envelope(
+    session: KeySession,
+    wrapped_key: Dict[str, Any],
+    meta_record: Dict[str, Any],
+    records: Dict[str, Dict[str, Any]],
+    codec: str = DEFAULT_CODEC,
+) -> Dict[str, Any]:
+    """Kayıt başına şifrelenmiş (sürüm 2) zarfı oluşturur.
+
+    Her kayıt veri anahtarıyla ayrı mühürlenir ve `entry_id` AAD olarak
+    bağlanır; veri anahtarı ana paroladan türetilen anahtarla sarılır.
+    """
+    return {
+        "version": 2,
+        "kdf": kdf_block(session.salt, session.kdf),
+        "cipher": wrapped_key,
+        "meta": meta_record,
+        "entries": records,
+        "codec": codec,
+        "checksum": _header_checksum(wrapped_key, meta_record),
+    }
+
+
+def open_records_envelope(
+    session: KeySession, envelope: Dict[str, Any]
+) -> Tuple[Dict[str, Any], bytearray, Dict[str, str]]:
+    """Sürüm 2 zarfı açar; (payload, veri anahtarı, manifest) döndürür.
+
+    `payload["entries"]` bir üreteçtir ve zarf geçerliyken tüketilmelidir.
+    """
+    try:
+        cipher = envelope["cipher"]
+        meta_record = envelope["meta"]
+        records = envelope["entries"]
+        checksum = envelope.get("checksum")
+        calculated_checksum = _header_checksum(cipher, meta_record)
+        codec = envelope.get("codec", DEFAULT_CODEC)
+    except (KeyError, TypeError, ValueError) as exc:
+        raise VaultIntegrityError("Kasa dosyası bozuk görünüyor.") from exc
+    if checksum != calculated_checksum:
+        raise VaultIntegrityError("Kasa bütünlük doğrulamasından geçemedi.")
+
+    data_key = unwrap_data_key(session, cipher)
+    aesgcm = AESGCM(bytes(data_key))
+    header = open_record(aesgcm, META_AAD, meta_record, codec)
+    sealed_digest = header.get("manifest_digest")
+    if sealed_digest is not None:
+        # Kayıt özetleri burada hesaplanır; tek özet tüm kümeyi doğrular.
+        manifest = {entry_id: record_digest(record) for entry_id, record in records.items()}
+        if manifest_digest(manifest) != sealed_digest:
+            raise VaultIntegrityError("Kasa kayıt listesi manifest ile uyuşmuyor.")
+    else:
+        # Eski meta kaydı manifestin tamamını taşır.
+        manifest = header.get("manifest", {})
+        if set(manifest) != set(records):
+            raise VaultIntegrityError("Kasa kayıt listesi manifest ile uyuşmuyor.")
+
+    def entries() -> Iterator[Dict[str, Any]]:
+        for entry_id, record in records.items():
+            if sealed_digest is None and record_digest(record) != manifest[entry_id]:
+                raise VaultIntegrityError(f"Kasa kaydı değiştirilmiş: {entry_id}")
+            entry = open_record(aesgcm, entry_aad(entry_id), record, codec)
+            if entry.get("entry_id") != entry_id:
+                raise VaultIntegrityError(f"Kasa kaydı kimliği uyuşmuyor: {entry_id}")
+            yield entry
+
+    # Kayıtlar tüketildikçe çözülür; tüm düz metin sözlükleri aynı anda tutulmaz.
+    return {"entries": entries(), "meta": header.get("meta", {})}, data_key, manifest
+
+
+def decrypt_payload(
+    master_password: Optional[str],
+    envelope: Dict[str, Any],
+    session: Optional[KeySession] = None,
+) -> Dict[str, Any]:
+    salt, kdf = envelope_kdf_params(envelope)
+    if envelope.get("version") == 2:
+        owned = session is None or not session.matches(salt, kdf)
+        if owned:
+            session = KeySession.derive(master_password, salt, kdf, ttl=None)
+        try:
+            payload, data_key, _ = open_records_envelope(session, envelope)
+            payload["entries"] = list(payload["entries"])
+        finally:
+            if owned:
+                session.zeroize()
+        data_key[:] = bytes(len(data_key))
+        return payload
+
     try:
-        kdf = envelope["kdf"]
         cipher = envelope["cipher"]
-        salt = _b64d(kdf["salt"])
-        iterations = int(kdf["iterations"])
-        nonce = _b64d(cipher["nonce"])
-        ciphertext = _b64d(cipher["payload"])
+        nonce = raw_bytes(cipher["nonce"])
+        ciphertext = raw_bytes(cipher["payload"])
+        compression = cipher.get("compression")
         checksum = envelope.get("checksum")
     except (KeyError, ValueError) as exc:
         raise VaultIntegrityError("Kasa dosyası bozuk görünüyor.") from exc
 
-    calculated_checksum = hashlib.sha3_256(ciphertext).hexdigest()
+    calculated_checksum = hashlib.sha256(ciphertext).hexdigest()
     if checksum != calculated_checksum:
         raise VaultIntegrityError("Kasa bütünlük doğrulamasından geçemedi.")
 
-    key = derive_key(master_password, salt, iterations)
-    aesgcm = AESGCM(key)
+    if session is not None and session.matches(salt, kdf):
+        aesgcm = session.cipher()
+    else:
+        aesgcm = AESGCM(derive_key_with(master_password, salt, kdf))
     try:
         plaintext = aesgcm.decrypt(nonce, ciphertext, None)
     except InvalidTag as exc:
         raise InvalidMasterPassword("Ana parola hatalı veya veri bozulmuş.") from exc
 
     try:
-        return json.loads(plaintext.decode("utf-8"))
-    except json.JSONDecodeError as exc:
+        if compression == DEFLATE_NAME:
+            plaintext = zlib.decompress(plaintext)
+        elif compression is not None:
+            raise VaultIntegrityError(f"Bilinmeyen sıkıştırma: {compression}")
+        return json.loads(plaintext)
+    except (json.JSONDecodeError, UnicodeDecodeError, zlib.error) as exc:
         raise VaultIntegrityError("Kasa verisi çözümlenemedi.") from exc
-
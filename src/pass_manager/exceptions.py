@@ -18,6 +18,13 @@ class InvalidMasterPassword(VaultError):
     """Yanlış ana parola kullanıldığında yükseltilir."""
 
 
+class VaultConflict(VaultError):
+    """Uzak kasa, son okunandan sonra başka bir istemcide değiştiğinde yükseltilir."""
+
+
 class EntryNotFound(VaultError):
     """İstenen kayıt bulunamadığında yükseltilir."""
 
+
+class BatchError(VaultError):
+    """Toplu işlem listesindeki bir satır geçersiz olduğunda ya da uygulanamadığında yükseltilir."""
@@ -1,6 +1,12 @@
 """Qt tabanlı çoklu platform GUI başlatıcısı."""
 
-from .app import launch
-
 __all__ = ["launch"]
 
+
+def __getattr__(name: str):
+    # Pencereler (QtWidgets) yalnızca `launch` istendiğinde yüklenir.
+    if name == "launch":
+        from .app import launch
+
+        return launch
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
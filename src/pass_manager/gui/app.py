@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import sys
 from dataclasses import dataclass
+from functools import partial
 from typing import List, Optional, Sequence, Tuple
 
 from PySide6.QtCore import QObject, Qt, QTimer
@@ -20,10 +21,10 @@ from PySide6.QtWidgets import (
     QMainWindow,
     QMessageBox,
     QPlainTextEdit,
+    QProgressBar,
     QPushButton,
     QSpinBox,
-    QTableWidget,
-    QTableWidgetItem,
+    QTableView,
     QVBoxLayout,
     QWidget,
 )
@@ -32,7 +33,11 @@ from PySide6.QtWidgets import QAbstractItemView, QHeaderView
 from ..exceptions import EntryNotFound, VaultError
 from ..models import Vault, VaultEntry
 from ..passwords import GeneratorOptions, SYMBOL_SETS, generate_password
-from ..storage import DEFAULT_VAULT_PATH, SecureVault, VaultStorage
+from ..storage import DEFAULT_VAULT_PATH, SecureVault, open_storage
+from .table import VaultTableModel
+from .workers import SaveCoalescer, VaultWorker
+
+SEARCH_DELAY_MS = 150
 
 
 def _parse_tags(text: str) -> List[str]:
@@ -295,45 +300,76 @@ class MainWindow(QMainWindow):
         super().__init__()
         self.app = app
         self.clipboard_guard = ClipboardGuard(app)
+        self.worker = VaultWorker(self)
+        self.saver: Optional[SaveCoalescer] = None
         self.secure_vault: Optional[SecureVault] = None
         self.master_password: Optional[str] = None
         self.vault: Optional[Vault] = None
         self.current_entry: Optional[VaultEntry] = None
         self.password_visible = False
         self.initialized = False
+        self._sync_requested = False
 
         self.setWindowTitle("Kişiye Özel Şifre Kasası (GUI)")
         self.resize(1100, 720)
         self.statusBar().showMessage("Kasa yükleniyor...")
 
-        result = request_vault(self)
+        result = request_vault(self, self.worker)
         if result is None:
             return
-        self.secure_vault, self.master_password, self.vault = result
         self.initialized = True
         self._build_ui()
-        self.load_entries()
+        self._attach_vault(*result)
         self.statusBar().showMessage("Kasa hazır.")
 
+    def _attach_vault(self, secure_vault: SecureVault, master_password: str, vault: Vault) -> None:
+        if self.secure_vault is not None and self.secure_vault is not secure_vault:
+            # Yerine yenisi gelen kasanın önbellekteki anahtarları sıfırlanır.
+            self.secure_vault.lock()
+        self.secure_vault, self.master_password, self.vault = secure_vault, master_password, vault
+        if self.saver is not None:
+            self.saver.deleteLater()
+        self.saver = SaveCoalescer(self.worker, secure_vault, master_password, vault, parent=self)
+        self.saver.saved.connect(self._on_saved)
+        self.saver.failed.connect(self._on_save_failed)
+        self.load_entries()
+
     def _build_ui(self) -> None:
         central = QWidget()
         main_layout = QVBoxLayout(central)
 
-        self.table = QTableWidget(0, 4)
-        self.table.setHorizontalHeaderLabels(["Servis", "Kullanıcı", "Etiketler", "Güncellendi"])
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("Ara (ör. github, git*, tag:iş)")
+        self.search_edit.setClearButtonEnabled(True)
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DELAY_MS)
+        self.search_timer.timeout.connect(self.apply_filter)
+        self.search_edit.textChanged.connect(self.search_timer.start)
+        main_layout.addWidget(self.search_edit)
+
+        self.table_model = VaultTableModel(parent=self)
+        self.table = QTableView()
+        self.table.setModel(self.table_model)
+        # İçeriğe göre boyutlandırma tüm satırları ölçer; büyük kasalarda sabit genişlik kullanılır.
         header = self.table.horizontalHeader()
         header.setSectionResizeMode(0, QHeaderView.Stretch)
-        header.setSectionResizeMode(1, QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(1, QHeaderView.Interactive)
         header.setSectionResizeMode(2, QHeaderView.Stretch)
-        header.setSectionResizeMode(3, QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(3, QHeaderView.Interactive)
+        header.resizeSection(1, 220)
+        header.resizeSection(3, 200)
+        vertical = self.table.verticalHeader()
+        vertical.setSectionResizeMode(QHeaderView.Fixed)
+        vertical.hide()
         self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
         self.table.setSelectionMode(QAbstractItemView.SingleSelection)
-        self.table.itemSelectionChanged.connect(self.display_selected_entry)
+        self.table.selectionModel().selectionChanged.connect(self.display_selected_entry)
         main_layout.addWidget(self.table)
 
         button_row = QHBoxLayout()
         refresh_btn = QPushButton("Yenile")
-        refresh_btn.clicked.connect(self.load_entries)
+        refresh_btn.clicked.connect(self.sync_vault)
         add_btn = QPushButton("Kayıt Ekle")
         add_btn.clicked.connect(self.add_entry)
         delete_btn = QPushButton("Kayıt Sil")
@@ -387,22 +423,32 @@ class MainWindow(QMainWindow):
 
         self.setCentralWidget(central)
 
+        self.progress = QProgressBar()
+        self.progress.setRange(0, 0)
+        self.progress.setMaximumWidth(160)
+        self.progress.hide()
+        self.statusBar().addPermanentWidget(self.progress)
+        self.worker.busy_changed.connect(self.progress.setVisible)
+        self.mutating_buttons = (add_btn, delete_btn, lock_btn)
+
     def load_entries(self) -> None:
         if not self.vault:
             return
-        entries = self.vault.list_entries()
-        self.table.setRowCount(len(entries))
-        for row, entry in enumerate(entries):
-            service_item = QTableWidgetItem(entry.service)
-            service_item.setData(Qt.UserRole, entry.entry_id)
-            self.table.setItem(row, 0, service_item)
-            self.table.setItem(row, 1, QTableWidgetItem(entry.username))
-            self.table.setItem(row, 2, QTableWidgetItem(", ".join(entry.tags) if entry.tags else "-"))
-            self.table.setItem(row, 3, QTableWidgetItem(entry.updated_at))
-        self.table.sortItems(0)
+        self.table_model.set_vault(self.vault)
         self.table.clearSelection()
         self.display_entry(None)
-        self.statusBar().showMessage(f"{len(entries)} kayıt listelendi.", 5000)
+        self.statusBar().showMessage(f"{len(self.vault)} kayıt listelendi.", 5000)
+
+    def apply_filter(self) -> None:
+        self.table_model.set_query(self.search_edit.text())
+        self.display_entry(None)
+
+    def select_entry(self, entry_id: str) -> None:
+        row = self.table_model.row_of(entry_id)
+        if row < 0:
+            return
+        self.table.selectRow(row)
+        self.table.scrollTo(self.table_model.index(row, 0))
 
     def add_entry(self) -> None:
         dialog = EntryDialog(self)
@@ -413,8 +459,9 @@ class MainWindow(QMainWindow):
             return
         entry = VaultEntry(**data)
         self.vault.add_entry(entry)
-        self.secure_vault.save_vault(self.master_password, self.vault)
-        self.load_entries()
+        self.table_model.insert_entry(entry)
+        self.saver.schedule()
+        self.select_entry(entry.entry_id)
         QMessageBox.information(self, "Kayıt Eklendi", f"{entry.service} / {entry.username}")
 
     def delete_entry(self) -> None:
@@ -430,8 +477,9 @@ class MainWindow(QMainWindow):
         if confirmed != QMessageBox.StandardButton.Yes:
             return
         self.vault.delete_entry(entry.entry_id)
-        self.secure_vault.save_vault(self.master_password, self.vault)
-        self.load_entries()
+        self.table_model.remove_entry(entry.entry_id)
+        self.saver.schedule()
+        self.display_entry(None)
         QMessageBox.information(self, "Silindi", "Kayıt silindi.")
 
     def open_generator(self) -> None:
@@ -439,23 +487,86 @@ class MainWindow(QMainWindow):
         dialog.exec()
 
     def relock_vault(self) -> None:
-        result = request_vault(self)
+        if not self._confirm_saved():
+            return
+        result = request_vault(self, self.worker)
         if result is None:
             return
-        self.secure_vault, self.master_password, self.vault = result
-        self.load_entries()
+        self._attach_vault(*result)
         self.statusBar().showMessage("Kasa yeniden yüklendi.", 5000)
 
+    def sync_vault(self) -> None:
+        """Kasayı depodan (dosya ya da API) arka planda yeniden okur."""
+        if not self.secure_vault or not self.master_password or not self.saver:
+            return
+        self._sync_requested = True
+        if self.saver.pending:
+            # Önce bekleyen düzenlemeler yazılır; `_on_saved` eşitlemeyi başlatır.
+            self.saver.flush()
+            return
+        self._sync_requested = False
+        self._set_mutations_enabled(False)
+        self.statusBar().showMessage("Kasa eşitleniyor...")
+        self.worker.submit(
+            partial(_open_vault, self.secure_vault.load_vault, self.master_password),
+            self._on_synced,
+            self._on_sync_failed,
+        )
+
+    def _on_synced(self, vault: Vault) -> None:
+        self._set_mutations_enabled(True)
+        self._attach_vault(self.secure_vault, self.master_password, vault)
+
+    def _on_sync_failed(self, error: Exception) -> None:
+        self._set_mutations_enabled(True)
+        QMessageBox.critical(self, "Eşitleme Hatası", str(error))
+
+    def _on_saved(self) -> None:
+        self.statusBar().showMessage("Değişiklikler kaydedildi.", 3000)
+        if self._sync_requested and not self.saver.pending:
+            self.sync_vault()
+
+    def _on_save_failed(self, message: str) -> None:
+        self._sync_requested = False
+        QMessageBox.critical(
+            self,
+            "Kayıt Hatası",
+            f"Değişiklikler kaydedilemedi; bir sonraki düzenlemede tekrar denenecek.\n{message}",
+        )
+
+    def _set_mutations_enabled(self, enabled: bool) -> None:
+        for button in self.mutating_buttons:
+            button.setEnabled(enabled)
+
+    def _confirm_saved(self) -> bool:
+        """Bekleyen kayıtları yazar; yazılamazsa kullanıcıya devam edilip edilmeyeceğini sorar."""
+        if self.saver is None or self.saver.wait():
+            return True
+        answer = QMessageBox.question(
+            self,
+            "Kaydedilmemiş Değişiklikler",
+            "Bazı değişiklikler kaydedilemedi. Yine de devam edilsin mi?",
+        )
+        return answer == QMessageBox.StandardButton.Yes
+
+    def closeEvent(self, event) -> None:
+        if self._confirm_saved():
+            self.worker.wait()
+            if self.secure_vault is not None:
+                self.secure_vault.lock()
+            event.accept()
+        else:
+            event.ignore()
+
     def display_selected_entry(self) -> None:
         entry = self.selected_entry()
         self.display_entry(entry)
 
     def selected_entry(self) -> Optional[VaultEntry]:
-        selection = self.table.selectedItems()
+        selection = self.table.selectionModel().selectedRows()
         if not selection or not self.vault:
             return None
-        row = selection[0].row()
-        entry_id = self.table.item(row, 0).data(Qt.UserRole)
+        entry_id = selection[0].data(Qt.UserRole)
         if not entry_id:
             return None
         try:
@@ -504,7 +615,14 @@ class MainWindow(QMainWindow):
         self.statusBar().showMessage("Parola panoya kopyalandı (30 sn içinde temizlenecek).", 5000)
 
 
-def request_vault(parent) -> Optional[Tuple[SecureVault, str, Vault]]:
+def _open_vault(task, master_password: str) -> Vault:
+    vault = task(master_password)
+    # Arama indeksi de arka planda kurulur; ilk aramada arayüz beklemez.
+    vault.index.prepare()
+    return vault
+
+
+def request_vault(parent, worker: VaultWorker) -> Optional[Tuple[SecureVault, str, Vault]]:
     while True:
         dialog = UnlockDialog(parent)
         if dialog.exec() != QDialog.Accepted:
@@ -512,13 +630,15 @@ def request_vault(parent) -> Optional[Tuple[SecureVault, str, Vault]]:
         result = dialog.get_result()
         if not result:
             return None
-        storage = VaultStorage(result.vault_path)
+        storage = open_storage(result.vault_path)
         secure_vault = SecureVault(storage)
+        if result.create_new:
+            label, task = "Kasa oluşturuluyor...", secure_vault.init_vault
+        else:
+            label, task = "Kasa açılıyor...", secure_vault.load_vault
         try:
-            if result.create_new:
-                vault = secure_vault.init_vault(result.master_password)
-            else:
-                vault = secure_vault.load_vault(result.master_password)
+            # Anahtar türetme ve çözme arka planda çalışır; pencere yanıt vermeye devam eder.
+            vault = worker.run_modal(parent, label, partial(_open_vault, task, result.master_password))
             return secure_vault, result.master_password, vault
         except VaultError as exc:
             QMessageBox.critical(parent, "Kasa Hatası", str(exc))
@@ -0,0 +1,130 @@
+"""Kasa kayıtları için tablo modeli.
+
+`VaultTableModel` satırları doğrudan `Vault` üzerindeki kayıtlardan okur ve
+(servis, kullanıcı) sırasını kendisi korur; ekleme, silme ve düzenleme
+yalnızca ilgili satırı bildirir. Canlı arama da modelde yapılır: kasanın
+arama indeksi eşleşen kimlikleri zaten sıralı döndürdüğü için görünür
+satırlar her tuşta satır satır süzülmek yerine tek seferde değiştirilir.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional
+
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+from ..models import Vault, VaultEntry
+from ..search import SearchIndex, SortKey, sort_key
+
+COLUMNS = ("Servis", "Kullanıcı", "Etiketler", "Güncellendi")
+
+
+class VaultTableModel(QAbstractTableModel):
+    def __init__(self, vault: Optional[Vault] = None, parent=None):
+        super().__init__(parent)
+        self.vault: Optional[Vault] = None
+        self._query = ""
+        self._keys: List[SortKey] = []
+        self._key_of: Dict[str, SortKey] = {}
+        if vault is not None:
+            self.set_vault(vault)
+
+    @property
+    def query(self) -> str:
+        return self._query
+
+    def set_vault(self, vault: Vault) -> None:
+        self.vault = vault
+        self._reload()
+
+    def set_query(self, query: str) -> None:
+        """Görünür satırları `pass_manager.search` sorgu sözdizimiyle süzer."""
+        query = query.strip()
+        if query == self._query:
+            return
+        self._query = query
+        self._reload()
+
+    def _reload(self) -> None:
+        self.beginResetModel()
+        self._keys = self.vault.index.search_keys(self._query) if self.vault is not None else []
+        self._key_of = {key[2]: key for key in self._keys}
+        self.endResetModel()
+
+    def _accepts(self, entry: VaultEntry) -> bool:
+        return not self._query or bool(SearchIndex.scan([entry], self._query))
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._keys)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.DisplayRole) -> Any:
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return COLUMNS[section]
+        return None
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        entry_id = self._keys[index.row()][2]
+        if role == Qt.UserRole:
+            return entry_id
+        if role != Qt.DisplayRole:
+            return None
+        entry = self.vault.get_entry(entry_id)
+        column = index.column()
+        if column == 0:
+            return entry.service
+        if column == 1:
+            return entry.username
+        if column == 2:
+            return ", ".join(entry.tags) if entry.tags else "-"
+        return entry.updated_at
+
+    def entry_id_at(self, row: int) -> str:
+        return self._keys[row][2]
+
+    def row_of(self, entry_id: str) -> int:
+        key = self._key_of.get(entry_id)
+        return -1 if key is None else bisect_left(self._keys, key)
+
+    def insert_entry(self, entry: VaultEntry) -> int:
+        """Kasaya eklenmiş kaydı sıralı konumuna tek satır olarak ekler.
+
+        Kayıt etkin sorguyla eşleşmiyorsa eklenmez ve -1 döner.
+        """
+        if entry.entry_id in self._key_of:
+            return self.update_entry(entry)
+        if not self._accepts(entry):
+            return -1
+        key = sort_key(entry)
+        row = bisect_left(self._keys, key)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._keys.insert(row, key)
+        self._key_of[entry.entry_id] = key
+        self.endInsertRows()
+        return row
+
+    def remove_entry(self, entry_id: str) -> None:
+        row = self.row_of(entry_id)
+        if row < 0:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._keys[row]
+        del self._key_of[entry_id]
+        self.endRemoveRows()
+
+    def update_entry(self, entry: VaultEntry) -> int:
+        """Değişen kaydın satırını yeniler; sıra ya da eşleşme değiştiyse satırı taşır."""
+        old_key = self._key_of.get(entry.entry_id)
+        if old_key is None:
+            return self.insert_entry(entry)
+        if sort_key(entry) != old_key or not self._accepts(entry):
+            self.remove_entry(entry.entry_id)
+            return self.insert_entry(entry)
+        row = bisect_left(self._keys, old_key)
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(COLUMNS) - 1))
+        return row
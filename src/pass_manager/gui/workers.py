@@ -0,0 +1,213 @@
+"""GUI için arka plan kasa işlemleri.
+
+Kasa açma, kaydetme ve eşitleme `QThreadPool` üzerinde tek iş parçacıklı bir
+kuyrukta sırayla çalışır. Böylece `SecureVault`'a aynı anda yalnızca bir iş
+erişir ve arayüz iş parçacığı anahtar türetme, şifreleme ve dosya/HTTP
+gidiş-dönüşü süresince bloklanmaz.
+"""
+
+from __future__ import annotations
+
+from functools import partial
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from PySide6.QtCore import (
+    QCoreApplication,
+    QEventLoop,
+    QObject,
+    QRunnable,
+    QThreadPool,
+    Qt,
+    QTimer,
+    Signal,
+    Slot,
+)
+from PySide6.QtWidgets import QProgressDialog, QWidget
+
+from ..models import Vault, VaultChanges
+from ..storage import SecureVault
+
+SAVE_DELAY_MS = 400
+
+Callback = Optional[Callable[[Any], None]]
+
+
+class _TaskSignals(QObject):
+    succeeded = Signal(int, object)
+    failed = Signal(int, object)
+
+
+class VaultTask(QRunnable):
+    def __init__(self, task_id: int, fn: Callable[[], Any]):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.task_id = task_id
+        self.fn = fn
+        self.signals = _TaskSignals()
+
+    def run(self) -> None:
+        try:
+            result = self.fn()
+        except Exception as exc:
+            self.signals.failed.emit(self.task_id, exc)
+        else:
+            self.signals.succeeded.emit(self.task_id, result)
+
+
+class VaultWorker(QObject):
+    """İşleri sırayla arka planda çalıştırır; sonuç geri çağrıları arayüz iş parçacığında çalışır."""
+
+    busy_changed = Signal(bool)
+
+    def __init__(self, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+        self._tasks: Dict[int, Tuple[VaultTask, Callback, Callback]] = {}
+        self._next_id = 0
+
+    @property
+    def busy(self) -> bool:
+        return bool(self._tasks)
+
+    def submit(self, fn: Callable[[], Any], on_success: Callback = None, on_error: Callback = None) -> None:
+        task = VaultTask(self._next_id, fn)
+        self._next_id += 1
+        # Sinyaller bu nesnenin yuvalarına bağlanır; çağrılar kuyruklanıp arayüz iş parçacığına taşınır.
+        task.signals.succeeded.connect(self._on_succeeded)
+        task.signals.failed.connect(self._on_failed)
+        self._tasks[task.task_id] = (task, on_success, on_error)
+        if len(self._tasks) == 1:
+            self.busy_changed.emit(True)
+        self.pool.start(task)
+
+    def _finish(self, task_id: int) -> Tuple[VaultTask, Callback, Callback]:
+        entry = self._tasks.pop(task_id)
+        if not self._tasks:
+            self.busy_changed.emit(False)
+        return entry
+
+    @Slot(int, object)
+    def _on_succeeded(self, task_id: int, result: Any) -> None:
+        _, on_success, _ = self._finish(task_id)
+        if on_success is not None:
+            on_success(result)
+
+    @Slot(int, object)
+    def _on_failed(self, task_id: int, error: Exception) -> None:
+        _, _, on_error = self._finish(task_id)
+        if on_error is not None:
+            on_error(error)
+
+    def run_modal(self, parent: Optional[QWidget], label: str, fn: Callable[[], Any]) -> Any:
+        """`fn`'i arka planda çalıştırır ve biter bitmez sonucunu döndürür.
+
+        Beklerken meşgul göstergeli modal bir ilerleme penceresi açılır; olay
+        döngüsü dönmeye devam ettiği için pencere yeniden çizilebilir kalır.
+        Hata olursa aynı istisna burada yükseltilir.
+        """
+        loop = QEventLoop()
+        outcome: Dict[str, Any] = {}
+
+        def succeeded(result: Any) -> None:
+            outcome["result"] = result
+            loop.quit()
+
+        def failed(error: Exception) -> None:
+            outcome["error"] = error
+            loop.quit()
+
+        progress = QProgressDialog(label, None, 0, 0, parent)
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(200)
+        progress.setAutoClose(False)
+        self.submit(fn, succeeded, failed)
+        try:
+            loop.exec()
+        finally:
+            progress.close()
+            progress.deleteLater()
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome.get("result")
+
+    def wait(self) -> None:
+        """Kuyruktaki tüm işlerin bitmesini ve geri çağrılarının çalışmasını bekler."""
+        while self._tasks:
+            self.pool.waitForDone()
+            QCoreApplication.processEvents()
+
+
+class SaveCoalescer(QObject):
+    """Arka arkaya gelen düzenlemeleri tek bir arka plan kaydında birleştirir.
+
+    `schedule` her çağrıldığında kısa bir bekleme süresi yeniden başlar; süre
+    dolunca o ana kadarki tüm değişiklikler `take_changes` ile alınıp tek
+    seferde yazılır. Bir kayıt sürerken gelen değişiklikler, kayıt bitince
+    bir sonraki yazıma eklenir.
+    """
+
+    saved = Signal()
+    failed = Signal(str)
+
+    def __init__(
+        self,
+        worker: VaultWorker,
+        secure_vault: SecureVault,
+        master_password: str,
+        vault: Vault,
+        delay_ms: int = SAVE_DELAY_MS,
+        parent: Optional[QObject] = None,
+    ):
+        super().__init__(parent)
+        self.worker = worker
+        self.secure_vault = secure_vault
+        self.master_password = master_password
+        self.vault = vault
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay_ms)
+        self._timer.timeout.connect(self.flush)
+        self._in_flight = False
+
+    @property
+    def pending(self) -> bool:
+        return self._in_flight or self._timer.isActive() or self.vault.has_changes
+
+    def schedule(self) -> None:
+        self._timer.start()
+
+    def flush(self) -> None:
+        self._timer.stop()
+        if self._in_flight or not self.vault.has_changes:
+            # Süren kayıt bitince `_on_saved` kalan değişiklikleri yazar.
+            return
+        # Değişiklikler arayüz iş parçacığında alınır; iş parçacığı yalnızca bu kopyayı görür.
+        changes = self.vault.take_changes(full=self.secure_vault.full_save_required)
+        self._in_flight = True
+        self.worker.submit(
+            partial(self.secure_vault.write_changes, self.master_password, changes),
+            self._on_saved,
+            partial(self._on_failed, changes),
+        )
+
+    def _on_saved(self, _result: Any) -> None:
+        self._in_flight = False
+        self.saved.emit()
+        if self.vault.has_changes:
+            self.flush()
+
+    def _on_failed(self, changes: VaultChanges, error: Exception) -> None:
+        self._in_flight = False
+        self.vault.restore_changes(changes)
+        self.failed.emit(str(error))
+
+    def wait(self) -> bool:
+        """Bekleyen değişiklikleri hemen yazar ve bitmesini bekler.
+
+        Tüm değişiklikler yazıldıysa True döner.
+        """
+        self.flush()
+        while self._in_flight:
+            self.worker.wait()
+        return not self.vault.has_changes
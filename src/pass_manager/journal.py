@@ -0,0 +1,215 @@
+"""Ekleme tabanlı (journal) kasa depolaması.
+
+Kasa, şifreli bir temel anlık görüntü (`vault.sec`) ile yanındaki
+`vault.sec.journal` dosyasından oluşur. Her kayıt işlemi journal'a tek satırlık
+şifreli bir değişiklik kaydı ekler; dosyanın tamamı yeniden yazılmaz. Journal
+belirli bir boyutu aşınca arka planda anlık görüntüye katlanır.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .crypto import json_default
+from .exceptions import VaultIntegrityError, VaultNotInitialized
+from .storage import VaultStorage, apply_changes, fsync_directory, serialize_envelope
+
+JOURNAL_SUFFIX = ".journal"
+COMPACT_THRESHOLD_BYTES = 1024 * 1024
+
+
+def _line_digest(body: Dict) -> str:
+    serialized = json.dumps(body, separators=(",", ":"), sort_keys=True, default=json_default)
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+def _encode_line(body: Dict) -> bytes:
+    record = dict(body, digest=_line_digest(body))
+    serialized = json.dumps(record, separators=(",", ":"), sort_keys=True, default=json_default)
+    return (serialized + "\n").encode("utf-8")
+
+
+def _decode_line(line: bytes) -> Optional[Dict]:
+    """Tamamlanmış satırın kaydını döndürür; ayrıştırılamaz ya da özeti tutmazsa None."""
+    try:
+        record = json.loads(line)
+        digest = record.pop("digest")
+    except (ValueError, KeyError, AttributeError):
+        return None
+    if _line_digest(record) != digest:
+        return None
+    return record
+
+
+class JournalVaultStorage(VaultStorage):
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        compact_threshold: int = COMPACT_THRESHOLD_BYTES,
+        background: bool = True,
+        format: str = "binary",
+    ):
+        super().__init__(path, format)
+        self.journal_path = self.path.with_name(self.path.name + JOURNAL_SUFFIX)
+        self.compact_threshold = compact_threshold
+        self.background = background
+        self._lock = threading.RLock()
+        self._state: Optional[dict] = None
+        self._seq = 0
+        self._base_seq = 0
+        self._compactor: Optional[threading.Thread] = None
+
+    def _read_lines(self) -> Iterable[Tuple[int, Optional[Dict]]]:
+        """Journal satırlarını (satır sonu ofseti, kayıt) olarak üretir.
+
+        Yalnızca satır sonu olmayan son satır yarım yazım sayılır ve kaydı
+        None olarak döner. Tamamlanmış bir satır bozuksa, ardındaki fsync
+        edilmiş kayıtlar sessizce kaybolmasın diye `VaultIntegrityError`.
+        """
+        if not self.journal_path.exists():
+            return
+        offset = 0
+        with self.journal_path.open("rb") as handle:
+            for line_number, line in enumerate(handle, start=1):
+                offset += len(line)
+                if not line.endswith(b"\n"):
+                    yield offset, None
+                    return
+                record = _decode_line(line)
+                if record is None:
+                    raise VaultIntegrityError(f"Journal satırı {line_number} bozuk.")
+                yield offset, record
+
+    def _replay(self) -> dict:
+        state = super().read_envelope()
+        state["entries"] = dict(state.get("entries", {}))
+        seq = self._base_seq = int(state.get("journal_seq", 0))
+        good_offset = 0
+        torn = False
+        for offset, record in self._read_lines():
+            if record is None:
+                torn = True
+                break
+            good_offset = offset
+            if record["seq"] <= seq:
+                continue
+            if record["seq"] != seq + 1:
+                raise VaultIntegrityError("Journal kayıt sırası bozuk.")
+            self._apply(state, record)
+            seq = record["seq"]
+        if torn:
+            # Yarım kalmış son yazım: yalnızca o satırı at.
+            with self.journal_path.open("r+b") as handle:
+                handle.truncate(good_offset)
+                handle.flush()
+                os.fsync(handle.fileno())
+        self._seq = seq
+        return state
+
+    @staticmethod
+    def _apply(state: dict, record: Dict) -> None:
+        apply_changes(state, record["header"], record.get("put", {}), record.get("del", []))
+
+    def _snapshot(self) -> dict:
+        return dict(self._state, entries=dict(self._state["entries"]), journal_seq=self._seq)
+
+    def read_envelope(self) -> dict:
+        if not self.exists():
+            raise VaultNotInitialized("Kasa dosyası bulunamadı.")
+        with self._lock:
+            self._state = self._replay()
+            return self._snapshot()
+
+    @contextmanager
+    def open_envelope(self) -> Iterator[dict]:
+        # Birleştirilmiş durum bellekte tutulduğu için mmap kullanılmaz.
+        yield self.read_envelope()
+
+    def write_envelope(self, envelope: dict) -> None:
+        with self._lock:
+            self._seq += 1
+            self._state = dict(envelope, entries=dict(envelope.get("entries", {})))
+            super().write_envelope(self._snapshot())
+            self._base_seq = self._seq
+            self._truncate_journal(self._seq)
+
+    def append_changes(self, header: dict, upserts: Dict[str, dict], deletes: Iterable[str]) -> None:
+        """Değişen kayıtları journal'a tek satır olarak ekler ve fsync eder."""
+        with self._lock:
+            if self._state is None:
+                self.read_envelope()
+            record = {
+                "seq": self._seq + 1,
+                "header": header,
+                "put": upserts,
+                "del": sorted(deletes),
+            }
+            line = _encode_line(record)
+            with self.journal_path.open("ab") as handle:
+                handle.write(line)
+                handle.flush()
+                os.fsync(handle.fileno())
+            self._seq += 1
+            self._apply(self._state, record)
+            journal_size = self.journal_path.stat().st_size
+        if journal_size >= self.compact_threshold:
+            self.compact(wait=not self.background)
+
+    def compact(self, wait: bool = True) -> None:
+        """Journal'ı temel anlık görüntüye katlar."""
+        with self._lock:
+            if self._compactor is not None and self._compactor.is_alive():
+                running = self._compactor
+            else:
+                running = threading.Thread(target=self._compact, name="vault-journal-compact")
+                self._compactor = running
+                running.start()
+        if wait:
+            running.join()
+
+    def _compact(self) -> None:
+        with self._lock:
+            if self._state is None:
+                return
+            snapshot = self._snapshot()
+        # Anlık görüntü kilit dışında yazılır; bu sırada gelen eklemeler journal'da kalır.
+        temp_path = self.path.with_name(self.path.name + ".compact")
+        with temp_path.open("wb") as handle:
+            handle.write(serialize_envelope(snapshot, self.format))
+            handle.flush()
+            os.fsync(handle.fileno())
+        with self._lock:
+            if snapshot["journal_seq"] <= self._base_seq:
+                # Bu arada tam bir yazım daha yeni bir anlık görüntü bıraktı.
+                temp_path.unlink()
+                return
+            temp_path.replace(self.path)
+            fsync_directory(self.path.parent)
+            self._base_seq = snapshot["journal_seq"]
+            self._truncate_journal(self._base_seq)
+
+    def _truncate_journal(self, upto_seq: int) -> None:
+        """`upto_seq` dahil anlık görüntüde bulunan satırları journal'dan siler."""
+        remaining: List[bytes] = []
+        for _, record in self._read_lines():
+            if record is None:
+                break
+            if record["seq"] > upto_seq:
+                remaining.append(_encode_line(record))
+        temp_path = self.journal_path.with_name(self.journal_path.name + ".tmp")
+        with temp_path.open("wb") as handle:
+            handle.writelines(remaining)
+            handle.flush()
+            os.fsync(handle.fileno())
+        temp_path.replace(self.journal_path)
+        fsync_directory(self.journal_path.parent)
+
+    def close(self) -> None:
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join()
@@ -1,11 +1,12 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field, asdict
+from dataclasses import dataclass, field
 from datetime import datetime, timezone, timedelta
 import secrets
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set
 
 from .exceptions import EntryNotFound
+from .search import SearchIndex
 
 
 GEORGIA_TZ = timezone(timedelta(hours=4), name="UTC+4")
@@ -15,7 +16,7 @@ def _utcnow() -> str:
     return datetime.now(GEORGIA_TZ).replace(microsecond=0).isoformat()
 
 
-@dataclass
+@dataclass(slots=True)
 class VaultEntry:
     service: str
     username: str
@@ -27,11 +28,51 @@ class VaultEntry:
     updated_at: str = field(default_factory=_utcnow)
 
     def to_dict(self) -> Dict:
-        return asdict(self)
+        return {
+            "service": self.service,
+            "username": self.username,
+            "password": self.password,
+            "notes": self.notes,
+            "tags": list(self.tags),
+            "entry_id": self.entry_id,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
 
     @classmethod
     def from_dict(cls, data: Dict) -> "VaultEntry":
-        return cls(**data)
+        try:
+            # Kasadan okunan kayıtta tüm alanlar vardır: varsayılan fabrikalar
+            # çalışmaz ve liste olarak gelen etiketler kopyalanmaz.
+            tags = data["tags"]
+            fields = (
+                data["service"],
+                data["username"],
+                data["password"],
+                data["notes"],
+                tags if type(tags) is list else list(tags),
+                data["entry_id"],
+                data["created_at"],
+                data["updated_at"],
+            )
+        except KeyError:
+            return cls._from_partial_dict(data)
+        return cls(*fields)
+
+    @classmethod
+    def _from_partial_dict(cls, data: Dict) -> "VaultEntry":
+        """Eksik alanları doldurur; iki zaman damgası da yoksa aynı an kullanılır."""
+        now = _utcnow()
+        return cls(
+            data["service"],
+            data["username"],
+            data["password"],
+            data.get("notes", ""),
+            list(data.get("tags", ())),
+            data["entry_id"] if "entry_id" in data else secrets.token_hex(12),
+            data.get("created_at", now),
+            data.get("updated_at", now),
+        )
 
     def update_password(self, password: str) -> None:
         self.password = password
@@ -47,11 +88,31 @@ class VaultEntry:
         return keyword.lower() in haystack
 
 
+@dataclass
+class VaultChanges:
+    """Son kayıttan bu yana değişen kayıtların anlık görüntüsü."""
+
+    upserts: Dict[str, Dict]
+    deletes: Set[str]
+    meta: Dict
+    full: bool = False
+
+
 class Vault:
-    def __init__(self, entries: Optional[List[VaultEntry]] = None, meta: Optional[Dict] = None):
+    def __init__(
+        self,
+        entries: Optional[List[VaultEntry]] = None,
+        meta: Optional[Dict] = None,
+        index_notes: bool = False,
+    ):
         self._entries: Dict[str, VaultEntry] = {
             entry.entry_id: entry for entry in (entries or [])
         }
+        self._dirty: Set[str] = set(self._entries)
+        self._deleted: Set[str] = set()
+        self.index_notes = index_notes
+        self._index: Optional[SearchIndex] = None
+        self._searched = False
         default_meta = {
             "created_at": _utcnow(),
             "updated_at": _utcnow(),
@@ -61,13 +122,32 @@ class Vault:
         self.meta.setdefault("created_at", _utcnow())
         self.meta.setdefault("updated_at", _utcnow())
 
+    @property
+    def index(self) -> SearchIndex:
+        """İlk aramada kurulan ve değişikliklerle güncel tutulan arama indeksi."""
+        if self._index is None:
+            index = SearchIndex(include_notes=self.index_notes)
+            index.extend(self._entries.values())
+            self._index = index
+        return self._index
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
     def list_entries(self, keyword: Optional[str] = None) -> List[VaultEntry]:
-        entries = [entry for entry in self._entries.values() if entry.matches(keyword)]
-        return sorted(entries, key=lambda e: (e.service.lower(), e.username.lower()))
+        """Sorguyla eşleşen kayıtları (servis, kullanıcı) sırasıyla döndürür.
+
+        Sorgu sözdizimi için bkz. `pass_manager.search`. İlk sorgu doğrusal
+        taranır; indeks ancak kasa tekrar arandığında (GUI gibi) kurulur.
+        """
+        if self._index is None and not self._searched:
+            self._searched = True
+            return SearchIndex.scan(self._entries.values(), keyword, self.index_notes)
+        return [self._entries[entry_id] for entry_id in self.index.search(keyword)]
 
     def add_entry(self, entry: VaultEntry) -> VaultEntry:
         self._entries[entry.entry_id] = entry
-        self.meta["updated_at"] = _utcnow()
+        self.mark_dirty(entry.entry_id)
         return entry
 
     def get_entry(self, entry_id: str) -> VaultEntry:
@@ -79,9 +159,59 @@ class Vault:
     def delete_entry(self, entry_id: str) -> VaultEntry:
         entry = self.get_entry(entry_id)
         del self._entries[entry_id]
+        if self._index is not None:
+            self._index.remove(entry_id)
+        self._dirty.discard(entry_id)
+        self._deleted.add(entry_id)
         self.meta["updated_at"] = _utcnow()
         return entry
 
+    def update_password(self, entry_id: str, password: str) -> VaultEntry:
+        entry = self.get_entry(entry_id)
+        entry.update_password(password)
+        self.mark_dirty(entry_id)
+        return entry
+
+    def mark_dirty(self, entry_id: str) -> None:
+        """Kaydı doğrudan değiştiren çağıranlar bir sonraki kayıt için işaretler."""
+        if self._index is not None:
+            self._index.add(self._entries[entry_id])
+        self._dirty.add(entry_id)
+        self._deleted.discard(entry_id)
+        self.meta["updated_at"] = _utcnow()
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self._dirty or self._deleted)
+
+    def take_changes(self, full: bool = False) -> VaultChanges:
+        """Bekleyen değişiklikleri döndürür ve kasayı temiz olarak işaretler.
+
+        `full` verilirse tüm kayıtlar değişmiş kabul edilir.
+        """
+        entry_ids = self._entries.keys() if full else self._dirty
+        changes = VaultChanges(
+            upserts={entry_id: self._entries[entry_id].to_dict() for entry_id in entry_ids},
+            deletes=set() if full else set(self._deleted),
+            meta=dict(self.meta),
+            full=full,
+        )
+        self.mark_clean()
+        return changes
+
+    def restore_changes(self, changes: VaultChanges) -> None:
+        """Yazılamayan değişiklikleri yeniden bekleyen duruma alır."""
+        for entry_id in changes.upserts:
+            if entry_id in self._entries:
+                self._dirty.add(entry_id)
+        self._deleted.update(
+            entry_id for entry_id in changes.deletes if entry_id not in self._entries
+        )
+
+    def mark_clean(self) -> None:
+        self._dirty.clear()
+        self._deleted.clear()
+
     def find_by_service(self, service: str) -> List[VaultEntry]:
         return [
             entry
@@ -97,7 +227,8 @@ class Vault:
 
     @classmethod
     def from_dict(cls, data: Dict) -> "Vault":
-        entries = [VaultEntry.from_dict(item) for item in data.get("entries", [])]
+        from_dict = VaultEntry.from_dict
+        entries = [from_dict(item) for item in data.get("entries", ())]
         meta = data.get("meta", {})
         return cls(entries=entries, meta=meta)
 
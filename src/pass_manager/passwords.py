@@ -1,9 +1,10 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-import secrets
+from dataclasses import astuple, dataclass, replace
+import os
 import string
-from typing import List
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
 
 
 AMBIGUOUS = set("O0I1l|S5B8G6Z2")
@@ -34,9 +35,7 @@ def _sanitize_characters(characters: str, allow_ambiguous: bool) -> str:
     return "".join(ch for ch in characters if ch not in AMBIGUOUS)
 
 
-def generate_password(options: GeneratorOptions) -> str:
-    options.validate()
-    rng = secrets.SystemRandom()
+def _pools(options: GeneratorOptions) -> List[str]:
     lowercase = _sanitize_characters(string.ascii_lowercase, options.allow_ambiguous)
     uppercase = _sanitize_characters(string.ascii_uppercase, options.allow_ambiguous)
     digits = _sanitize_characters(string.digits, options.allow_ambiguous)
@@ -45,19 +44,72 @@ def generate_password(options: GeneratorOptions) -> str:
     pools: List[str] = [lowercase, uppercase, digits]
     if symbols:
         pools.append(symbols)
+    return pools
+
+
+class PasswordGenerator:
+    """Aynı seçeneklerle çok sayıda parola üretir.
+
+    Karakter havuzları bir kez hazırlanır. Rastgelelik `os.urandom` ile
+    `buffer_size` baytlık bloklar halinde alınır ve `bytes.translate` ile
+    karaktere çevrilir: havuz boyutunun katına sığmayan bayt değerleri
+    atılır (ret örneklemesi), böylece her karakter eşit olasılıklıdır.
+    `require_each_category` açıksa her gruptan karakter içermeyen adaylar
+    atılıp yeniden çekilir; sonuç geçerli parolalar arasında tekdüzedir.
+
+    Tampon süreç kimliğine bağlıdır; `fork` sonrası çocuk süreç ebeveynle
+    aynı baytları kullanmaz. İş parçacıkları arasında paylaşılabilir.
+    """
+
+    def __init__(self, options: Optional[GeneratorOptions] = None, buffer_size: int = 64 * 1024):
+        self.options = options or GeneratorOptions()
+        self.options.validate()
+        pools = _pools(self.options)
+        merged = "".join(dict.fromkeys("".join(pools)))
+        if len(merged) < 10:
+            raise ValueError("Karakter havuzu çok küçük. Parametreleri yeniden deneyin.")
+        limit = 256 - 256 % len(merged)
+        self._table = bytes(ord(merged[value % len(merged)]) if value < limit else 0 for value in range(256))
+        self._reject = bytes(range(limit, 256))
+        self._categories = [frozenset(pool.encode("ascii")) for pool in pools] if self.options.require_each_category else []
+        self.buffer_size = buffer_size
+        self._buffer = b""
+        self._offset = 0
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+
+    def _take(self, count: int) -> bytes:
+        with self._lock:
+            if self._pid != os.getpid():
+                self._buffer, self._offset, self._pid = b"", 0, os.getpid()
+            while len(self._buffer) - self._offset < count:
+                fresh = os.urandom(max(self.buffer_size, count * 2)).translate(self._table, self._reject)
+                self._buffer = self._buffer[self._offset:] + fresh
+                self._offset = 0
+            chunk = self._buffer[self._offset:self._offset + count]
+            self._offset += count
+            return chunk
+
+    def generate(self) -> str:
+        length = self.options.length
+        while True:
+            candidate = self._take(length)
+            if all(not category.isdisjoint(candidate) for category in self._categories):
+                return candidate.decode("ascii")
+
+    def generate_many(self, count: int) -> Iterator[str]:
+        """`count` parolayı tek tek üretir; çıktı akış halinde yazılabilir."""
+        for _ in range(count):
+            yield self.generate()
+
+
+_GENERATORS: Dict[Tuple, PasswordGenerator] = {}
 
-    merged = "".join(pools)
-    if len(set(merged)) < 10:
-        raise ValueError("Karakter havuzu çok küçük. Parametreleri yeniden deneyin.")
-
-    password_chars: List[str] = []
-    if options.require_each_category:
-        for pool in pools:
-            password_chars.append(rng.choice(pool))
-
-    while len(password_chars) < options.length:
-        password_chars.append(rng.choice(merged))
-
-    rng.shuffle(password_chars)
-    return "".join(password_chars[: options.length])
 
+def generate_password(options: GeneratorOptions) -> str:
+    """Tek parola üretir; seçenek başına bir `PasswordGenerator` önbelleğe alınır."""
+    key = astuple(options)
+    generator = _GENERATORS.get(key)
+    if generator is None:
+        generator = _GENERATORS[key] = PasswordGenerator(replace(options), buffer_size=4096)
+    return generator.generate()
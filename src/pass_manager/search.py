@@ -0,0 +1,223 @@
+"""Kasa kayıtları için bellek içi arama indeksi.
+
+Sorgu boşlukla ayrılmış terimlerden oluşur ve tüm terimler eşleşmelidir:
+
+- ``git``       servis/kullanıcı/etiket içinde alt dize araması
+- ``git*``      bir kelimenin başında önek araması
+- ``tag:work``  etiketle birebir eşleşme
+"""
+
+from __future__ import annotations
+
+import re
+from bisect import bisect_left, insort
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Set, Tuple
+
+if TYPE_CHECKING:
+    from .models import VaultEntry
+
+_TOKEN_RE = re.compile(r"\w+")
+TAG_PREFIX = "tag:"
+
+SortKey = Tuple[str, str, str]
+
+
+def _trigrams(token: str) -> Iterable[str]:
+    return {token[i : i + 3] for i in range(len(token) - 2)}
+
+
+def sort_key(entry: "VaultEntry") -> SortKey:
+    return (entry.service.lower(), entry.username.lower(), entry.entry_id)
+
+
+def _haystack_text(entry: "VaultEntry", include_notes: bool = False) -> str:
+    """Alt dize aramasının yapıldığı küçük harfli metin; indeks ve tarama ortaktır."""
+    text = f"{entry.service}|{entry.username}|{' '.join(entry.tags)}"
+    if include_notes and entry.notes:
+        text = f"{text}|{entry.notes}"
+    return text.lower()
+
+
+class SearchIndex:
+    """Kelime ve üçlü-harf (trigram) indeksi; sonuçları sıralı döndürür."""
+
+    def __init__(self, include_notes: bool = False):
+        self.include_notes = include_notes
+        self._keys: Dict[str, SortKey] = {}
+        self._order: List[SortKey] = []
+        self._haystacks: Dict[str, str] = {}
+        self._entry_tokens: Dict[str, Set[str]] = {}
+        self._entry_tags: Dict[str, Set[str]] = {}
+        self._postings: Dict[str, Set[str]] = {}
+        self._vocabulary: List[str] = []
+        self._trigrams: Optional[Dict[str, Set[str]]] = None
+        self._tags: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _haystack(self, entry: "VaultEntry") -> str:
+        return _haystack_text(entry, self.include_notes)
+
+    def add(self, entry: "VaultEntry") -> None:
+        self._insert(entry, insort)
+
+    def extend(self, entries: Iterable["VaultEntry"]) -> None:
+        """Toplu ekleme; sıralı listeler sonda bir kez sıralanır."""
+        for entry in entries:
+            self._insert(entry, list.append)
+        self._order.sort()
+        self._vocabulary.sort()
+
+    def _insert(self, entry: "VaultEntry", place) -> None:
+        entry_id = entry.entry_id
+        if entry_id in self._keys:
+            self.remove(entry_id)
+        key = sort_key(entry)
+        self._keys[entry_id] = key
+        place(self._order, key)
+
+        haystack = self._haystack(entry)
+        tokens = set(_TOKEN_RE.findall(haystack))
+        self._haystacks[entry_id] = haystack
+        self._entry_tokens[entry_id] = tokens
+        for token in tokens:
+            posting = self._postings.get(token)
+            if posting is None:
+                posting = self._postings[token] = set()
+                place(self._vocabulary, token)
+                if self._trigrams is not None:
+                    self._index_trigrams(token)
+            posting.add(entry_id)
+
+        tags = {tag.lower() for tag in entry.tags}
+        self._entry_tags[entry_id] = tags
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(entry_id)
+
+    def remove(self, entry_id: str) -> None:
+        key = self._keys.pop(entry_id, None)
+        if key is None:
+            return
+        del self._order[bisect_left(self._order, key)]
+        del self._haystacks[entry_id]
+        for token in self._entry_tokens.pop(entry_id):
+            posting = self._postings[token]
+            posting.discard(entry_id)
+            if not posting:
+                del self._postings[token]
+                del self._vocabulary[bisect_left(self._vocabulary, token)]
+                if self._trigrams is not None:
+                    for gram in _trigrams(token):
+                        grams = self._trigrams[gram]
+                        grams.discard(token)
+                        if not grams:
+                            del self._trigrams[gram]
+        for tag in self._entry_tags.pop(entry_id):
+            tagged = self._tags[tag]
+            tagged.discard(entry_id)
+            if not tagged:
+                del self._tags[tag]
+
+    def _index_trigrams(self, token: str) -> None:
+        for gram in _trigrams(token):
+            self._trigrams.setdefault(gram, set()).add(token)
+
+    def prepare(self) -> None:
+        """Trigram haritasını önceden kurar (ör. arka planda, ilk aramadan önce)."""
+        if self._trigrams is None:
+            self._trigrams = {}
+            for token in self._vocabulary:
+                self._index_trigrams(token)
+
+    def _tokens_containing(self, fragment: str) -> Iterable[str]:
+        if len(fragment) < 3:
+            return (token for token in self._vocabulary if fragment in token)
+        # Trigram haritası yalnızca alt dize araması gerektiğinde kurulur.
+        self.prepare()
+        candidates: Optional[Set[str]] = None
+        for gram in sorted(_trigrams(fragment), key=lambda g: len(self._trigrams.get(g, ()))):
+            tokens = self._trigrams.get(gram)
+            if not tokens:
+                return ()
+            candidates = set(tokens) if candidates is None else candidates & tokens
+            if not candidates:
+                return ()
+        return (token for token in candidates if fragment in token)
+
+    def _tokens_with_prefix(self, prefix: str) -> Iterable[str]:
+        start = bisect_left(self._vocabulary, prefix)
+        for token in self._vocabulary[start:]:
+            if not token.startswith(prefix):
+                break
+            yield token
+
+    def _union(self, tokens: Iterable[str]) -> Set[str]:
+        result: Set[str] = set()
+        for token in tokens:
+            result |= self._postings[token]
+        return result
+
+    def _match_term(self, term: str) -> Set[str]:
+        if term.startswith(TAG_PREFIX) and len(term) > len(TAG_PREFIX):
+            return set(self._tags.get(term[len(TAG_PREFIX) :], ()))
+        if term.endswith("*") and _TOKEN_RE.fullmatch(term[:-1]):
+            return self._union(self._tokens_with_prefix(term[:-1]))
+        if _TOKEN_RE.fullmatch(term):
+            return self._union(self._tokens_containing(term))
+
+        # Ayraç içeren terim (ör. "@gmail.com"): parçalarla daralt, sonra doğrula.
+        candidates: Optional[Set[str]] = None
+        for part in _TOKEN_RE.findall(term):
+            matched = self._union(self._tokens_containing(part))
+            candidates = matched if candidates is None else candidates & matched
+        if candidates is None:
+            candidates = set(self._haystacks)
+        return {entry_id for entry_id in candidates if term in self._haystacks[entry_id]}
+
+    @staticmethod
+    def scan(
+        entries: Iterable["VaultEntry"], query: Optional[str] = None, include_notes: bool = False
+    ) -> List["VaultEntry"]:
+        """İndeks kurmadan aynı sorgu anlamıyla doğrusal arama yapar."""
+        terms = query.lower().split() if query else []
+        matched = []
+        for entry in entries:
+            text = _haystack_text(entry, include_notes)
+            tags = None
+            for term in terms:
+                if term.startswith(TAG_PREFIX) and len(term) > len(TAG_PREFIX):
+                    if tags is None:
+                        tags = {tag.lower() for tag in entry.tags}
+                    if term[len(TAG_PREFIX) :] not in tags:
+                        break
+                elif term.endswith("*") and _TOKEN_RE.fullmatch(term[:-1]):
+                    if not any(token.startswith(term[:-1]) for token in _TOKEN_RE.findall(text)):
+                        break
+                elif term not in text:
+                    break
+            else:
+                matched.append(entry)
+        matched.sort(key=sort_key)
+        return matched
+
+    def search_keys(self, query: Optional[str] = None) -> List[SortKey]:
+        """Eşleşen kayıtların sıralama anahtarlarını sırayla döndürür; ID üçüncü alandır."""
+        terms = query.lower().split() if query else []
+        if not terms:
+            return list(self._order)
+
+        matched: Optional[Set[str]] = None
+        for term in sorted(terms, key=len, reverse=True):
+            ids = self._match_term(term)
+            matched = ids if matched is None else matched & ids
+            if not matched:
+                return []
+
+        if len(matched) * 4 >= len(self._order):
+            return [key for key in self._order if key[2] in matched]
+        return sorted(self._keys[entry_id] for entry_id in matched)
+
+    def search(self, query: Optional[str] = None) -> List[str]:
+        """Sorguyla eşleşen kayıt ID'lerini (servis, kullanıcı) sırasıyla döndürür."""
+        return [key[2] for key in self.search_keys(query)]
@@ -1,19 +1,104 @@
 from __future__ import annotations
 
 import json
+import mmap
+import os
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Iterable, Iterator, Optional, Tuple
 
-from .crypto import decrypt_payload, encrypt_payload
-from .exceptions import VaultAlreadyExists, VaultNotInitialized
-from .models import Vault
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from .crypto import (
+    DEFAULT_KDF,
+    META_AAD,
+    SESSION_TTL_SECONDS,
+    KdfParams,
+    KeySession,
+    build_records_envelope,
+    decrypt_payload,
+    entry_aad,
+    envelope_kdf_params,
+    json_default,
+    manifest_digest,
+    new_data_key,
+    normalize_kdf,
+    open_records_envelope,
+    record_digest,
+    seal_record,
+    unwrap_data_key,
+    wrap_data_key,
+)
+from .codec import DEFAULT_CODEC, PREFERRED_CODEC
+from .container import decode_container, encode_container, is_container
+from .exceptions import InvalidMasterPassword, VaultAlreadyExists, VaultIntegrityError, VaultNotInitialized
+from .models import Vault, VaultChanges
 
 DEFAULT_VAULT_PATH = Path.home() / ".pass_manager" / "vault.sec"
+STORAGE_FORMATS = ("binary", "json")
+
+
+def fsync_directory(path: Path) -> None:
+    """Yeniden adlandırmanın kalıcı olması için dizini fsync eder (POSIX)."""
+    try:
+        fd = os.open(str(path), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def serialize_envelope(envelope: dict, format: str = "binary") -> bytes:
+    """Zarfı dosya biçimine çevirir; ikili biçim yalnızca sürüm 2 için kullanılır."""
+    if format == "binary" and envelope.get("version") == 2:
+        return encode_container(envelope)
+    return json.dumps(envelope, indent=2, default=json_default).encode("utf-8")
+
+
+def parse_envelope(data: bytes) -> dict:
+    """Biçimi otomatik algılar: ikili kap ya da (eski) JSON zarf."""
+    if not data:
+        raise VaultIntegrityError("Kasa dosyası boş.")
+    if is_container(data):
+        return decode_container(data)
+    try:
+        return json.loads(data)
+    except ValueError as exc:
+        raise VaultIntegrityError(f"Kasa dosyası okunamadı: {exc}") from exc
+
+
+def apply_changes(
+    envelope: dict, header: Optional[dict], upserts: Dict[str, dict], deletes: Iterable[str]
+) -> None:
+    """Artımlı kaydı (başlık + değişen/silinen kayıtlar) zarfa yerinde uygular."""
+    entries = envelope.setdefault("entries", {})
+    for entry_id in deletes:
+        entries.pop(entry_id, None)
+    entries.update(upserts)
+    if header:
+        envelope.update(header)
+
+
+def _detach_record(record: Dict) -> Dict:
+    """memoryview alanlarını bağımsız bayt nesnelerine kopyalar."""
+    if not any(isinstance(value, memoryview) for value in record.values()):
+        return record
+    return {
+        key: bytes(value) if isinstance(value, memoryview) else value
+        for key, value in record.items()
+    }
 
 
 class VaultStorage:
-    def __init__(self, path: Optional[str] = None):
+    def __init__(self, path: Optional[str] = None, format: str = "binary"):
+        if format not in STORAGE_FORMATS:
+            raise ValueError(f"Geçersiz kasa dosyası biçimi: {format}")
         self.path = Path(path) if path else DEFAULT_VAULT_PATH
+        self.format = format
 
     def exists(self) -> bool:
         return self.path.exists()
@@ -21,35 +106,249 @@ class VaultStorage:
     def read_envelope(self) -> dict:
         if not self.exists():
             raise VaultNotInitialized("Kasa dosyası bulunamadı.")
-        with self.path.open("r", encoding="utf-8") as handle:
-            return json.load(handle)
+        return parse_envelope(self.path.read_bytes())
+
+    @contextmanager
+    def open_envelope(self) -> Iterator[dict]:
+        """Dosyayı mmap ile açar; ikili zarfın alanları dosyaya bakan dilimlerdir.
+
+        Dilimler yalnızca `with` bloğu içinde geçerlidir; saklanacak veriler
+        blok içinde kopyalanmalıdır.
+        """
+        if not self.exists():
+            raise VaultNotInitialized("Kasa dosyası bulunamadı.")
+        with self.path.open("rb") as handle:
+            if os.fstat(handle.fileno()).st_size == 0:
+                # Boş dosya eşlenemez; yarım kalmış yazım bütünlük hatasıdır.
+                raise VaultIntegrityError("Kasa dosyası boş.")
+            mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        envelope: dict = {}
+        try:
+            envelope = decode_container(mapped) if is_container(mapped) else parse_envelope(mapped[:])
+            yield envelope
+        finally:
+            envelope.clear()
+            try:
+                mapped.close()
+            except BufferError:
+                # Dışarıda kalan dilimler serbest kalınca eşleme GC ile kapanır.
+                pass
 
     def write_envelope(self, envelope: dict) -> None:
+        self._write_file(self.path.with_suffix(".tmp"), serialize_envelope(envelope, self.format))
+
+    def _write_file(self, temp_path: Path, data: bytes) -> None:
         self.path.parent.mkdir(parents=True, exist_ok=True)
-        temp_path = self.path.with_suffix(".tmp")
-        with temp_path.open("w", encoding="utf-8") as handle:
-            json.dump(envelope, handle, indent=2)
+        with temp_path.open("wb") as handle:
+            handle.write(data)
+            handle.flush()
+            os.fsync(handle.fileno())
         temp_path.replace(self.path)
+        fsync_directory(self.path.parent)
+
+
+def open_storage(path: Optional[str] = None, journal: Optional[bool] = None) -> VaultStorage:
+    """Kasa yolu için uygun depolamayı döndürür.
+
+    `journal` belirtilmezse yanında journal dosyası bulunan kasalar
+    otomatik olarak journal depolamasıyla açılır.
+    """
+    from .journal import JOURNAL_SUFFIX, JournalVaultStorage
+
+    resolved = Path(path) if path else DEFAULT_VAULT_PATH
+    if journal is None:
+        journal = resolved.with_name(resolved.name + JOURNAL_SUFFIX).exists()
+    if journal:
+        return JournalVaultStorage(str(resolved))
+    return VaultStorage(str(resolved))
 
 
 class SecureVault:
-    def __init__(self, storage: VaultStorage):
+    def __init__(
+        self,
+        storage: VaultStorage,
+        session_ttl: Optional[float] = SESSION_TTL_SECONDS,
+        codec: str = PREFERRED_CODEC,
+        kdf: Optional[KdfParams] = None,
+    ):
         self.storage = storage
+        self.session_ttl = session_ttl
+        self.codec = codec
+        # None: kasanın mevcut KDF parametreleri korunur (yeni kasada DEFAULT_KDF).
+        # Farklı bir değer verilirse bir sonraki kayıtta kasa yeniden anahtarlanır.
+        self.kdf = normalize_kdf(kdf) if kdf is not None else None
+        self._records_codec = codec
+        self._session: Optional[KeySession] = None
+        self._data_key: Optional[bytearray] = None
+        # Son okunan/yazılan zarfın şifreli durumu; artımlı kayıt için tutulur.
+        self._kdf: Optional[Tuple[bytes, KdfParams]] = None
+        self._wrapped_key: Optional[Dict[str, str]] = None
+        self._records: Optional[Dict[str, Dict[str, str]]] = None
+        self._manifest: Dict[str, str] = {}
+
+    def _session_for(
+        self,
+        master_password: str,
+        salt: Optional[bytes] = None,
+        kdf: Optional[KdfParams] = None,
+    ) -> KeySession:
+        if salt is None and self._kdf is not None:
+            salt, kdf = self._kdf
+        kdf = kdf or self.kdf or DEFAULT_KDF
+        session = self._session
+        if (
+            session is not None
+            and session.active
+            and session.unlocks(master_password)
+            and session.kdf == kdf
+            and (salt is None or session.salt == salt)
+        ):
+            return session
+        self.lock()
+        self._session = KeySession.derive(master_password, salt, kdf, ttl=self.session_ttl)
+        return self._session
+
+    def _data_key_for(self, session: KeySession) -> bytearray:
+        if self._data_key is None:
+            if self._wrapped_key is not None:
+                self._data_key = unwrap_data_key(session, self._wrapped_key)
+            else:
+                self._data_key = new_data_key()
+                self._wrapped_key = wrap_data_key(session, self._data_key)
+        return self._data_key
+
+    def _forget_records(self) -> None:
+        self._kdf = None
+        self._wrapped_key = None
+        self._records = None
+        self._manifest = {}
+
+    def lock(self) -> None:
+        """Önbellekteki türetilmiş anahtarları sıfırlar.
+
+        Şifreli kayıt önbelleği korunur; bir sonraki kayıt yine artımlı olur.
+        """
+        if self._session is not None:
+            self._session.zeroize()
+            self._session = None
+        if self._data_key is not None:
+            self._data_key[:] = bytes(len(self._data_key))
+            self._data_key = None
 
     def init_vault(self, master_password: str) -> Vault:
         if self.storage.exists():
             raise VaultAlreadyExists("Kasa zaten mevcut.")
         vault = Vault()
-        envelope = encrypt_payload(master_password, vault.to_dict())
-        self.storage.write_envelope(envelope)
+        self.lock()
+        self._forget_records()
+        self.save_vault(master_password, vault)
         return vault
 
     def load_vault(self, master_password: str) -> Vault:
-        envelope = self.storage.read_envelope()
-        data = decrypt_payload(master_password, envelope)
-        return Vault.from_dict(data)
+        open_envelope = getattr(self.storage, "open_envelope", None)
+        if open_envelope is None:
+            return self._load_envelope(master_password, self.storage.read_envelope())
+        with open_envelope() as envelope:
+            return self._load_envelope(master_password, envelope)
+
+    def _load_envelope(self, master_password: str, envelope: dict) -> Vault:
+        salt, kdf = envelope_kdf_params(envelope)
+        session = self._session_for(master_password, salt, kdf)
+        try:
+            if envelope.get("version") == 2:
+                data, data_key, manifest = open_records_envelope(session, envelope)
+            else:
+                data = decrypt_payload(master_password, envelope, session)
+        except InvalidMasterPassword:
+            self.lock()
+            raise
+
+        try:
+            vault = Vault.from_dict(data)
+        except BaseException:
+            if envelope.get("version") == 2:
+                data_key[:] = bytes(len(data_key))
+            raise
+        vault.mark_clean()
+
+        if envelope.get("version") == 2:
+            if self._data_key is not None:
+                self._data_key[:] = bytes(len(self._data_key))
+            self._data_key = data_key
+            self._kdf = (salt, kdf)
+            # Zarf mmap edilmiş dosyaya bakabilir; saklanan kayıtlar kopyalanır.
+            self._wrapped_key = _detach_record(envelope["cipher"])
+            self._records = {
+                entry_id: _detach_record(record) for entry_id, record in envelope["entries"].items()
+            }
+            self._records_codec = envelope.get("codec", DEFAULT_CODEC)
+            self._manifest = dict(manifest)
+        else:
+            # Eski tek parça (sürüm 1) kasa; ilk kayıtta sürüm 2'ye taşınır.
+            self._forget_records()
+            self._kdf = (salt, kdf)
+        return vault
+
+    @property
+    def full_save_required(self) -> bool:
+        # Kodlayıcı değiştiyse tüm kayıtlar yeni kodlayıcıyla yeniden mühürlenir.
+        return self._records is None or self._records_codec != self.codec
 
     def save_vault(self, master_password: str, vault: Vault) -> None:
-        envelope = encrypt_payload(master_password, vault.to_dict())
-        self.storage.write_envelope(envelope)
+        changes = vault.take_changes(full=self.full_save_required)
+        try:
+            self.write_changes(master_password, changes)
+        except Exception:
+            vault.restore_changes(changes)
+            raise
+
+    def write_changes(self, master_password: str, changes: VaultChanges) -> None:
+        """Yalnızca değişen kayıtları yeniden mühürleyip zarfı yazar."""
+        session = self._session_for(master_password)
+        data_key = self._data_key_for(session)
+        wrapped_key = self._wrapped_key
+        if self.kdf is not None and session.kdf != self.kdf:
+            # Yeniden anahtarlama: kayıtlar veri anahtarıyla şifreli olduğundan
+            # yeniden mühürlenmez, yalnızca veri anahtarı yeniden sarılır.
+            session = KeySession.derive(master_password, kdf=self.kdf, ttl=self.session_ttl)
+            wrapped_key = wrap_data_key(session, data_key)
+        aesgcm = AESGCM(bytes(data_key))
+
+        if changes.full or self._records is None:
+            records: Dict[str, Dict[str, str]] = {}
+            manifest: Dict[str, str] = {}
+        else:
+            records = dict(self._records)
+            manifest = dict(self._manifest)
+        for entry_id in changes.deletes:
+            records.pop(entry_id, None)
+            manifest.pop(entry_id, None)
+        for entry_id, data in changes.upserts.items():
+            record = seal_record(aesgcm, entry_aad(entry_id), data, self.codec)
+            records[entry_id] = record
+            manifest[entry_id] = record_digest(record)
 
+        meta_record = seal_record(
+            aesgcm, META_AAD, {"meta": changes.meta, "manifest_digest": manifest_digest(manifest)}, self.codec
+        )
+        envelope = build_records_envelope(session, wrapped_key, meta_record, records, self.codec)
+        append_changes = getattr(self.storage, "append_changes", None)
+        try:
+            if append_changes is not None and not changes.full and self._records is not None:
+                header = {key: value for key, value in envelope.items() if key != "entries"}
+                upserts = {entry_id: records[entry_id] for entry_id in changes.upserts}
+                append_changes(header, upserts, changes.deletes)
+            else:
+                self.storage.write_envelope(envelope)
+        except BaseException:
+            if session is not self._session:
+                session.zeroize()
+            raise
+        if session is not self._session:
+            self._session.zeroize()
+            self._session = session
+        self._wrapped_key = wrapped_key
+        self._kdf = (session.salt, session.kdf)
+        self._records = records
+        self._records_codec = self.codec
+        self._manifest = manifest
@@ -0,0 +1,360 @@
+"""Akışlı içe/dışa aktarma: CSV, JSON Lines, şifreli dışa aktarım ve diğer yöneticilerin CSV'leri.
+
+Okuyucular ve yazıcılar üreteçtir; dosya hiçbir zaman tamamen belleğe
+alınmaz, bellek kullanımı kasanın kendisiyle sınırlıdır. İçe aktarmada
+aynı servis+kullanıcı çifti `DuplicateIndex` ile tek sözlük aramasıyla
+bulunur.
+
+Şifreli biçim (`.pmx`): bir JSON başlık satırı (KDF ve tuz) ardından
+çerçeveler gelir. Her çerçeve `>I` uzunluk, 12 bayt nonce ve en çok
+`FRAME_ENTRIES` JSON satırının AES-GCM şifreli metnidir. Ek veri (AAD)
+başlık, çerçeve sırası ve son çerçeve bayrağını içerir; yer değiştirme,
+eksiltme ve yarıda kesilme açılışta fark edilir.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import secrets
+import struct
+from dataclasses import dataclass, field
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .exceptions import InvalidMasterPassword, VaultError, VaultIntegrityError
+from .models import Vault, VaultEntry
+
+ENTRY_COLUMNS = ("service", "username", "password", "notes", "tags")
+ENCRYPTED_MAGIC = "pass-manager-export"
+ENCRYPTED_VERSION = 1
+FRAME_ENTRIES = 256
+_FRAME_HEADER = struct.Struct(">I")
+_FRAME_AAD = struct.Struct(">Q?")
+MAX_FRAME_BYTES = 64 * 1024 * 1024
+
+# Biçim adı -> alan başına denenecek sütun adları. `url` yalnızca servis
+# boşsa ana makine adı için kullanılır.
+CSV_FORMATS: Dict[str, Dict[str, Tuple[str, ...]]] = {
+    "csv": {
+        "service": ("service",),
+        "username": ("username",),
+        "password": ("password",),
+        "notes": ("notes",),
+        "tags": ("tags",),
+    },
+    "bitwarden": {
+        "service": ("name",),
+        "url": ("login_uri",),
+        "username": ("login_username",),
+        "password": ("login_password",),
+        "notes": ("notes",),
+        "tags": ("folder",),
+    },
+    "lastpass": {
+        "service": ("name",),
+        "url": ("url",),
+        "username": ("username",),
+        "password": ("password",),
+        "notes": ("extra",),
+        "tags": ("grouping",),
+    },
+    "1password": {
+        "service": ("Title", "title"),
+        "url": ("Url", "URL", "Website", "url"),
+        "username": ("Username", "username"),
+        "password": ("Password", "password"),
+        "notes": ("Notes", "notes"),
+        "tags": ("Tags", "tags"),
+    },
+    "chrome": {
+        "service": ("name",),
+        "url": ("url",),
+        "username": ("username",),
+        "password": ("password",),
+        "notes": ("note",),
+    },
+    "firefox": {
+        "url": ("url",),
+        "username": ("username",),
+        "password": ("password",),
+    },
+}
+# Otomatik seçimde eşit puanlı biçimlerden önce gelen seçilir.
+_DETECT_ORDER = ("csv", "bitwarden", "1password", "chrome", "lastpass", "firefox")
+IMPORT_FORMATS = ("auto", *CSV_FORMATS, "jsonl", "encrypted")
+EXPORT_FORMATS = ("csv", "jsonl", "encrypted")
+DUPLICATE_POLICIES = ("skip", "update", "keep")
+
+
+def _split_tags(text: Any) -> List[str]:
+    if isinstance(text, (list, tuple)):
+        return [str(tag).strip() for tag in text if str(tag).strip()]
+    return [tag.strip() for tag in str(text or "").replace("/", ",").split(",") if tag.strip()]
+
+
+def detect_csv_format(header: Iterable[str]) -> str:
+    """Başlık satırındaki sütunlara uyan ilk CSV biçimini döndürür."""
+    columns = set(header)
+    best, best_score = None, 0
+    for name in _DETECT_ORDER:
+        mapping = CSV_FORMATS[name]
+        matched = {key for key, names in mapping.items() if any(column in columns for column in names)}
+        # Not/etiket sütunları isteğe bağlıdır; ortak sütunlu biçimlerde (Chrome,
+        # LastPass) en çok sütunu eşleşen kazanır.
+        required = set(mapping) - {"notes", "tags"}
+        if required <= matched and len(matched) > best_score:
+            best, best_score = name, len(matched)
+    if best is not None:
+        return best
+    raise VaultError(f"CSV biçimi tanınmadı; sütunlar: {', '.join(sorted(columns))}")
+
+
+def read_csv(handle: IO[str], fmt: str = "auto") -> Iterator[Dict[str, Any]]:
+    """CSV satırlarını kayıt sözlüklerine çevirerek tek tek üretir."""
+    reader = csv.DictReader(handle)
+    if reader.fieldnames is None:
+        return
+    mapping = CSV_FORMATS[detect_csv_format(reader.fieldnames) if fmt == "auto" else fmt]
+    for row in reader:
+        values = {}
+        for key, columns in mapping.items():
+            values[key] = next((row[column] for column in columns if row.get(column)), "")
+        if not values.get("service") and values.get("url"):
+            values["service"] = urlsplit(values["url"]).hostname or values["url"]
+        values.pop("url", None)
+        values["tags"] = _split_tags(values.get("tags"))
+        yield values
+
+
+def read_jsonl(handle: IO[str]) -> Iterator[Dict[str, Any]]:
+    for line_number, line in enumerate(handle, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            value = json.loads(line)
+        except ValueError as exc:
+            raise VaultError(f"Satır {line_number}: geçersiz JSON: {exc}") from exc
+        if not isinstance(value, dict):
+            raise VaultError(f"Satır {line_number}: nesne bekleniyor")
+        yield value
+
+
+def write_csv(entries: Iterable[VaultEntry], handle: IO[str]) -> Iterator[VaultEntry]:
+    """Kayıtları CSV olarak yazar; her yazılan kaydı ilerleme için geri verir."""
+    writer = csv.writer(handle)
+    writer.writerow(ENTRY_COLUMNS)
+    for entry in entries:
+        writer.writerow((entry.service, entry.username, entry.password, entry.notes, ",".join(entry.tags)))
+        yield entry
+
+
+def write_jsonl(entries: Iterable[VaultEntry], handle: IO[str]) -> Iterator[VaultEntry]:
+    for entry in entries:
+        handle.write(json.dumps(entry.to_dict(), ensure_ascii=False))
+        handle.write("\n")
+        yield entry
+
+
+def _frame_aad(header: bytes, index: int, final: bool) -> bytes:
+    return header + _FRAME_AAD.pack(index, final)
+
+
+def write_encrypted(
+    entries: Iterable[VaultEntry],
+    handle: IO[bytes],
+    password: str,
+    kdf: Optional[Dict[str, Any]] = None,
+) -> Iterator[VaultEntry]:
+    """Kayıtları parolayla şifrelenmiş, çerçeveli JSON Lines olarak yazar."""
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+    from .crypto import DEFAULT_KDF, NONCE_SIZE, SALT_SIZE, derive_key_with, kdf_block, normalize_kdf
+
+    kdf = normalize_kdf(kdf or DEFAULT_KDF)
+    salt = secrets.token_bytes(SALT_SIZE)
+    header = json.dumps(
+        {"format": ENCRYPTED_MAGIC, "version": ENCRYPTED_VERSION, "kdf": kdf_block(salt, kdf)}
+    ).encode("utf-8") + b"\n"
+    handle.write(header)
+    aesgcm = AESGCM(derive_key_with(password, salt, kdf))
+
+    def flush(lines: List[bytes], index: int, final: bool) -> None:
+        nonce = secrets.token_bytes(NONCE_SIZE)
+        ciphertext = aesgcm.encrypt(nonce, b"".join(lines), _frame_aad(header, index, final))
+        handle.write(_FRAME_HEADER.pack(len(nonce) + len(ciphertext)) + nonce + ciphertext)
+
+    lines: List[bytes] = []
+    index = 0
+    for entry in entries:
+        lines.append(json.dumps(entry.to_dict(), ensure_ascii=False).encode("utf-8") + b"\n")
+        yield entry
+        if len(lines) == FRAME_ENTRIES:
+            flush(lines, index, False)
+            lines, index = [], index + 1
+    # Son çerçeve boş olsa bile yazılır; yokluğu dosyanın kesildiğini gösterir.
+    flush(lines, index, True)
+
+
+def read_encrypted(handle: IO[bytes], password: str) -> Iterator[Dict[str, Any]]:
+    """`write_encrypted` çıktısını çerçeve çerçeve çözerek kayıtları üretir."""
+    from cryptography.exceptions import InvalidTag
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+    from .crypto import NONCE_SIZE, derive_key_with, normalize_kdf, raw_bytes
+
+    header = handle.readline()
+    try:
+        meta = json.loads(header)
+        if meta.get("format") != ENCRYPTED_MAGIC or meta.get("version") != ENCRYPTED_VERSION:
+            raise ValueError("biçim")
+        kdf = normalize_kdf(meta["kdf"])
+        salt = bytes(raw_bytes(meta["kdf"]["salt"]))
+    except (ValueError, KeyError, TypeError) as exc:
+        raise VaultIntegrityError("Şifreli dışa aktarım başlığı okunamadı.") from exc
+    aesgcm = AESGCM(derive_key_with(password, salt, kdf))
+
+    index = 0
+    while True:
+        prefix = handle.read(_FRAME_HEADER.size)
+        size = _FRAME_HEADER.unpack(prefix)[0] if len(prefix) == _FRAME_HEADER.size else 0
+        frame = handle.read(size) if 0 < size <= MAX_FRAME_BYTES else b""
+        if len(frame) != size or size <= NONCE_SIZE:
+            raise VaultIntegrityError("Şifreli dışa aktarım eksik ya da kesilmiş.")
+        nonce, ciphertext = frame[:NONCE_SIZE], frame[NONCE_SIZE:]
+        final = False
+        try:
+            plaintext = aesgcm.decrypt(nonce, ciphertext, _frame_aad(header, index, False))
+        except InvalidTag:
+            try:
+                plaintext = aesgcm.decrypt(nonce, ciphertext, _frame_aad(header, index, True))
+                final = True
+            except InvalidTag as exc:
+                if index == 0:
+                    raise InvalidMasterPassword("Dışa aktarım parolası hatalı ya da dosya bozuk.") from exc
+                raise VaultIntegrityError(f"Çerçeve {index} doğrulanamadı.") from exc
+        for line in plaintext.splitlines():
+            yield json.loads(line)
+        if final:
+            if handle.read(1):
+                raise VaultIntegrityError("Son çerçeveden sonra beklenmeyen veri var.")
+            return
+        index += 1
+
+
+def is_encrypted_export(head: bytes) -> bool:
+    return head.startswith(b"{") and ENCRYPTED_MAGIC.encode("ascii") in head
+
+
+class DuplicateIndex:
+    """Servis+kullanıcı (büyük/küçük harf duyarsız) -> kayıt ID'si."""
+
+    def __init__(self, entries: Iterable[VaultEntry] = ()):
+        self._ids: Dict[Tuple[str, str], str] = {}
+        for entry in entries:
+            self.add(entry)
+
+    @staticmethod
+    def key(service: str, username: str) -> Tuple[str, str]:
+        return service.strip().casefold(), username.strip().casefold()
+
+    def get(self, service: str, username: str) -> Optional[str]:
+        return self._ids.get(self.key(service, username))
+
+    def add(self, entry: VaultEntry) -> None:
+        self._ids.setdefault(self.key(entry.service, entry.username), entry.entry_id)
+
+
+@dataclass
+class ImportStats:
+    added: int = 0
+    updated: int = 0
+    skipped: int = 0
+    invalid: int = 0
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def total(self) -> int:
+        return self.added + self.updated + self.skipped + self.invalid
+
+
+MAX_REPORTED_ERRORS = 20
+
+
+def import_entries(
+    vault: Vault,
+    rows: Iterable[Dict[str, Any]],
+    on_duplicate: str = "skip",
+    progress: Optional[Callable[[ImportStats], None]] = None,
+    progress_every: int = 1000,
+) -> ImportStats:
+    """Satırları kasaya ekler; mevcut servis+kullanıcı çiftleri `on_duplicate` ile işlenir.
+
+    `skip` var olanı korur, `update` parola/not/etiketleri günceller, `keep`
+    kopyayı yeni kayıt olarak ekler. Servisi ya da parolası eksik satırlar
+    sayılır ve atlanır.
+    """
+    if on_duplicate not in DUPLICATE_POLICIES:
+        raise ValueError(f"Geçersiz kopya politikası: {on_duplicate}")
+    index = DuplicateIndex(vault.list_entries())
+    stats = ImportStats()
+    for row_number, row in enumerate(rows, start=1):
+        service = str(row.get("service") or "").strip()
+        username = str(row.get("username") or "").strip()
+        password = row.get("password") or ""
+        if not service or not password:
+            stats.invalid += 1
+            if len(stats.errors) < MAX_REPORTED_ERRORS:
+                stats.errors.append(f"Kayıt {row_number}: servis ya da parola eksik.")
+        else:
+            existing = index.get(service, username) if on_duplicate != "keep" else None
+            if existing is None:
+                entry = VaultEntry.from_dict(
+                    {
+                        **{key: row[key] for key in ("created_at", "updated_at") if row.get(key)},
+                        "service": service,
+                        "username": username,
+                        "password": password,
+                        "notes": row.get("notes") or "",
+                        "tags": _split_tags(row.get("tags")),
+                    }
+                )
+                vault.add_entry(entry)
+                index.add(entry)
+                stats.added += 1
+            elif on_duplicate == "update":
+                entry = vault.get_entry(existing)
+                entry.password = password
+                entry.notes = row.get("notes") or entry.notes
+                entry.tags = _split_tags(row.get("tags")) or entry.tags
+                entry.touch()
+                vault.mark_dirty(existing)
+                stats.updated += 1
+            else:
+                stats.skipped += 1
+        if progress is not None and row_number % progress_every == 0:
+            progress(stats)
+    return stats
+
+
+def open_text(handle: IO[bytes]) -> IO[str]:
+    """İkili akışı CSV/JSON okumak için metne sarar (UTF-8, BOM'lu dosyalar dahil)."""
+    return io.TextIOWrapper(handle, encoding="utf-8-sig", newline="")
+
+
+def read_entries(handle: IO[bytes], fmt: str = "auto", password: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Biçime göre uygun okuyucuyu seçer; `auto` içeriğin başına bakar."""
+    if fmt == "auto":
+        head = handle.peek(4096)[:4096] if hasattr(handle, "peek") else b""
+        if is_encrypted_export(head):
+            fmt = "encrypted"
+        elif head.lstrip(b"\xef\xbb\xbf \t\r\n").startswith(b"{"):
+            fmt = "jsonl"
+    if fmt == "encrypted":
+        if password is None:
+            raise VaultError("Şifreli dışa aktarım için parola gerekli.")
+        return read_encrypted(handle, password)
+    text = open_text(handle)
+    return read_jsonl(text) if fmt == "jsonl" else read_csv(text, fmt)
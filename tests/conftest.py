@@ -0,0 +1,7 @@
+import os
+import tempfile
+from pathlib import Path
+
+# API modülü içe aktarıldığında veritabanını açar; testler kullanıcının
+# sunucu veritabanına dokunmasın.
+os.environ.setdefault("PASS_MANAGER_DB", str(Path(tempfile.mkdtemp()) / "server.db"))
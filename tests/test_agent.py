@@ -0,0 +1,79 @@
+import threading
+import time
+
+import pytest
+
+import pass_manager.agent as agent_module
+import pass_manager.cli as cli
+import pass_manager.crypto as crypto
+from pass_manager.agent import AgentClient, VaultAgent
+from pass_manager.exceptions import BatchError, EntryNotFound
+from pass_manager.models import VaultEntry
+from pass_manager.storage import SecureVault, VaultStorage
+
+MASTER = "StrongMaster!123"
+
+
+@pytest.fixture(autouse=True)
+def fast_kdf(monkeypatch):
+    original = crypto.derive_key
+    monkeypatch.setattr(
+        crypto, "derive_key", lambda password, salt, iterations=1_000: original(password, salt, 1_000)
+    )
+
+
+def _start(tmp_path, **kwargs):
+    vault_path = tmp_path / "vault.sec"
+    secure_vault = SecureVault(VaultStorage(str(vault_path)))
+    vault = secure_vault.init_vault(MASTER)
+    vault.add_entry(VaultEntry(service="github", username="octo", password="secret!"))
+    secure_vault.save_vault(MASTER, vault)
+    agent = VaultAgent(secure_vault, MASTER, vault, tmp_path / "agent" / "agent.sock", **kwargs)
+    agent.bind()
+    thread = threading.Thread(target=agent.serve, daemon=True)
+    thread.start()
+    return vault_path, agent, thread
+
+
+def test_cli_uses_running_agent(tmp_path, monkeypatch, capsys):
+    vault_path, agent, thread = _start(tmp_path)
+    assert (agent.socket_path.stat().st_mode & 0o777) == 0o600
+    monkeypatch.setattr(cli, "prompt_master_password", lambda confirm=False: pytest.fail("parola soruldu"))
+    base = ["--vault", str(vault_path), "--agent-socket", str(agent.socket_path)]
+
+    cli.main(base + ["add", "--service", "gitlab", "--username", "tanuki", "--password", "secret!"])
+    cli.main(base + ["list", "--filter", "git*"])
+    output = capsys.readouterr().out
+    assert "gitlab" in output and "github" in output
+
+    # Başka bir süreç kasayı değiştirirse ajan yeniden okur.
+    other = SecureVault(VaultStorage(str(vault_path)))
+    vault = other.load_vault(MASTER)
+    added = vault.add_entry(VaultEntry(service="bitbucket", username="bb", password="secret!"))
+    other.save_vault(MASTER, vault)
+
+    client = AgentClient.connect(agent.socket_path, target=agent.target)
+    assert client.get_entry(added.entry_id).service == "bitbucket"
+    with pytest.raises(EntryNotFound):
+        client.delete_entry("missing")
+    with pytest.raises(BatchError):
+        client.apply_batch([{"op": "delete", "id": added.entry_id}, {"op": "delete", "id": "missing"}])
+    assert client.get_entry(added.entry_id).service == "bitbucket"
+    assert AgentClient.connect(agent.socket_path, target="file:/elsewhere") is None
+
+    client.stop()
+    thread.join(timeout=5)
+    assert not agent.unlocked and not agent.socket_path.exists()
+    assert SecureVault(VaultStorage(str(vault_path))).load_vault(MASTER).find_by_service("gitlab")
+
+
+def test_agent_locks_after_suspend(tmp_path, monkeypatch):
+    monkeypatch.setattr(agent_module, "POLL_INTERVAL_SECONDS", 0.05)
+    monkeypatch.setattr(agent_module._Server, "timeout", 0.05)
+    _, agent, thread = _start(tmp_path)
+    real_time = time.time
+    monkeypatch.setattr(agent_module.time, "time", lambda: real_time() + 3600)
+    thread.join(timeout=5)
+    assert not agent.unlocked
+    assert agent.secure_vault._session is None
+    assert AgentClient.connect(agent.socket_path) is None
@@ -0,0 +1,247 @@
+import asyncio
+import gzip
+import hashlib
+import secrets
+import time
+from functools import partial
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+pytest.importorskip("fastapi")
+
+from fastapi.testclient import TestClient
+
+import pass_manager.crypto as crypto
+from pass_manager.api import main
+from pass_manager.api.auth import TokenUser
+from pass_manager.api.storage import APIVaultStorage, SecureVaultAPI
+from pass_manager.exceptions import VaultAlreadyExists
+from pass_manager.models import VaultEntry
+
+
+def _register(client):
+    credentials = {"username": f"user-{secrets.token_hex(4)}", "password": "correct horse"}
+    return client.post("/api/v1/auth/register", json=credentials).json()["token"]
+
+
+class RecordingSession:
+    """`requests.Session` yerine uygulamaya yönlendirir; (yöntem, yol, durum, gönderilen bayt) kaydeder."""
+
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def _call(self, method, url, headers, timeout, data=None, params=None):
+        kwargs = {"headers": headers, "params": params}
+        if data is not None:
+            kwargs["content"] = data
+        response = getattr(self.client, method)(url, **kwargs)
+        self.calls.append((method, response.request.url.path, response.status_code, len(data or b"")))
+        return response
+
+    def __getattr__(self, method):
+        return partial(self._call, method)
+
+
+def test_slow_query_does_not_block_event_loop(monkeypatch):
+    def slow_get_user_vault(user_id):
+        time.sleep(0.3)
+        return None
+
+    monkeypatch.setattr(main.db, "get_user_vault", slow_get_user_vault)
+    token = main.create_token("alice", 10**6)
+    main.token_cache.put(token, TokenUser(10**6, "alice", 0, time.time() + 60))
+    headers = {"Authorization": f"Bearer {token}"}
+
+    async def scenario():
+        finished = []
+
+        async def call(path, **kwargs):
+            response = await http.get(path, **kwargs)
+            finished.append(path)
+            return response.status_code
+
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            vault = asyncio.create_task(call("/api/v1/vault", headers=headers))
+            await asyncio.sleep(0.05)
+            health = await call("/api/v1/health")
+            return await vault, health, finished
+
+    vault_status, health_status, finished = asyncio.run(scenario())
+    assert (vault_status, health_status) == (404, 200)
+    assert finished == ["/api/v1/health", "/api/v1/vault"]
+
+
+def test_verified_tokens_are_cached_until_revoked(monkeypatch):
+    client = TestClient(main.app)
+    old = {"Authorization": f"Bearer {_register(client)}"}
+    assert client.head("/api/v1/vault/envelope", headers=old).status_code == 204
+
+    def no_decode(token):
+        raise AssertionError("önbellekteki token yeniden doğrulanmamalı")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(main, "decode_token", no_decode)
+        patch.setattr(main.db, "get_token_version", no_decode)
+        assert client.head("/api/v1/vault/envelope", headers=old).status_code == 204
+
+    revoked = client.post("/api/v1/auth/logout-all", headers=old)
+    new = {"Authorization": f"Bearer {revoked.json()['token']}"}
+    assert client.head("/api/v1/vault/envelope", headers=old).status_code == 401
+    assert client.head("/api/v1/vault/envelope", headers=new).status_code == 204
+    # Başka bir süreç gibi: önbellek boşken sürüm veritabanından denetlenir.
+    main.token_cache.clear()
+    assert client.head("/api/v1/vault/envelope", headers=old).status_code == 401
+    assert client.head("/api/v1/vault/envelope", headers=new).status_code == 204
+
+
+def test_login_rehashes_legacy_password_hash(monkeypatch):
+    client = TestClient(main.app)
+    credentials = {"username": f"user-{secrets.token_hex(4)}", "password": "correct horse"}
+    assert client.post("/api/v1/auth/register", json=credentials).status_code == 200
+    user_id = main.db.get_user_id(credentials["username"])
+    main.db.update_password_hash(user_id, hashlib.sha256(b"correct horse").hexdigest())
+
+    wrong = client.post("/api/v1/auth/login", json={**credentials, "password": "wrong horse"})
+    assert wrong.status_code == 401
+    assert client.post("/api/v1/auth/login", json=credentials).status_code == 200
+    stored = main.db.get_user(credentials["username"])["password_hash"]
+    assert stored.startswith("scrypt$") and not main.needs_rehash(stored)
+    assert client.post("/api/v1/auth/login", json=credentials).status_code == 200
+
+    monkeypatch.setattr(main.hasher, "max_queue", 0)
+    busy = client.post("/api/v1/auth/login", json=credentials)
+    assert busy.status_code == 503 and busy.headers["Retry-After"] == "1"
+    assert client.get("/api/v1/health").json()["password_hashing"]["rejected"] >= 1
+
+
+def test_client_revalidates_cached_vault(tmp_path, monkeypatch):
+    client = TestClient(main.app)
+    token = _register(client)
+    session = RecordingSession(client)
+    calls = session.calls
+    envelope = {"version": 2, "entries": {"a": {"nonce": "n", "ciphertext": "c"}}}
+    APIVaultStorage("http://testserver", token, cache_dir=tmp_path, session=session).write_envelope(envelope)
+
+    # Yeni süreç gibi: önbellek diskten okunur, sunucudan değişiklik gelmez.
+    device = APIVaultStorage("http://testserver", token, cache_dir=tmp_path, session=session)
+    calls.clear()
+    assert device.read_envelope() == envelope
+    assert ([call[:3] for call in calls], device.revision) == ([("get", "/api/v1/vault/changes", 200)], 1)
+
+    # Tam kayıt eski revizyonları geçersiz kılar; istemci tam zarfı koşullu alır.
+    headers = {"Authorization": f"Bearer {token}", "If-Match": '"1"'}
+    client.post("/api/v1/vault", headers=headers, json={"encrypted_envelope": {"version": 2, "entries": {}}})
+    calls.clear()
+    assert device.read_envelope() == {"version": 2, "entries": {}}
+    assert [call[1:3] for call in calls] == [("/api/v1/vault/changes", 200), ("/api/v1/vault/envelope", 200)]
+    assert device.revision == 2
+
+
+def test_envelope_is_stored_opaquely_with_size_limit(monkeypatch):
+    client = TestClient(main.app)
+    headers = {"Authorization": f"Bearer {_register(client)}"}
+    assert client.get("/api/v1/vault/envelope", headers=headers).status_code == 204
+
+    raw = b'{"version":2,  "entries":{}}'
+    saved = client.put("/api/v1/vault/envelope", headers={**headers, "If-Match": '"0"'}, content=raw)
+    assert saved.headers["ETag"] == '"1"'
+    response = client.get("/api/v1/vault/envelope", headers=headers)
+    assert response.content == raw
+    assert client.get("/api/v1/vault", headers=headers).json()["encrypted_envelope"] == {"version": 2, "entries": {}}
+    for invalid in (b"not json", b"[1, 2]"):
+        assert client.put("/api/v1/vault/envelope", headers=headers, content=invalid).status_code == 400
+    assert client.get("/api/v1/vault/envelope", headers=headers).content == raw
+
+    monkeypatch.setattr(main, "MAX_VAULT_BYTES", 8)
+    too_big = client.put("/api/v1/vault/envelope", headers=headers, content=iter([raw[:6], raw[6:]]))
+    assert too_big.status_code == 413
+    assert client.get("/api/v1/vault/envelope", headers=headers).content == raw
+
+    # Doğrulamadan önce saklanmış bozuk zarf eski uç noktada JSON'u bozmaz.
+    user_id = main.token_cache.get(headers["Authorization"][7:]).user_id
+    main.db.save_user_vault(user_id, b"not json", "now")
+    assert client.get("/api/v1/vault", headers=headers).status_code == 409
+
+
+def test_vault_bodies_are_compressed_when_negotiated(monkeypatch):
+    client = TestClient(main.app)
+    headers = {"Authorization": f"Bearer {_register(client)}"}
+    raw = b'{"version":2,"entries":{%s}}' % b",".join(b'"e%d":{"payload":"QUJD"}' % i for i in range(200))
+    saved = client.put(
+        "/api/v1/vault/envelope",
+        headers={**headers, "Content-Encoding": "gzip"},
+        content=gzip.compress(raw),
+    )
+    assert saved.status_code == 200 and "gzip" in saved.headers["Accept-Encoding"]
+
+    compressed = client.get("/api/v1/vault/envelope", headers={**headers, "Accept-Encoding": "gzip"})
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    assert compressed.content == raw
+    plain = client.get("/api/v1/vault/envelope", headers={**headers, "Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in plain.headers
+    assert plain.headers["Content-Length"] == str(len(raw))
+    legacy = client.get("/api/v1/vault", headers={**headers, "Accept-Encoding": "gzip"})
+    assert legacy.headers["Content-Encoding"] == "gzip"
+
+    unknown = client.put("/api/v1/vault/envelope", headers={**headers, "Content-Encoding": "br"}, content=raw)
+    assert unknown.status_code == 415
+    monkeypatch.setattr(main, "MAX_VAULT_BYTES", len(raw) - 1)
+    bomb = client.put(
+        "/api/v1/vault/envelope", headers={**headers, "Content-Encoding": "gzip"}, content=gzip.compress(raw)
+    )
+    assert bomb.status_code == 413
+
+
+def test_delta_sync_transfers_only_changed_records(tmp_path, monkeypatch):
+    original = crypto.derive_key
+    monkeypatch.setattr(crypto, "derive_key", lambda password, salt, iterations=0: original(password, salt, 1_000))
+    client = TestClient(main.app)
+    token = _register(client)
+    session = RecordingSession(client)
+    calls = session.calls
+    master = "StrongMaster!123"
+
+    def device(name):
+        return SecureVaultAPI(APIVaultStorage("http://testserver", token, cache_dir=tmp_path / name, session=session))
+
+    laptop = device("laptop")
+    assert not laptop.storage.exists()
+    vault = laptop.init_vault(master)
+    with pytest.raises(VaultAlreadyExists):
+        device("other").init_vault(master)
+    assert laptop.storage.exists()
+    for index in range(40):
+        vault.add_entry(VaultEntry(service=f"svc{index}", username="user", password="secret" * 8))
+    laptop.save_vault(master, vault)
+    assert [call[:3] for call in calls] == [
+        ("head", "/api/v1/vault/envelope", 204),
+        ("put", "/api/v1/vault/envelope", 200),
+        ("put", "/api/v1/vault/envelope", 409),
+        ("head", "/api/v1/vault/envelope", 200),
+        ("post", "/api/v1/vault/changes", 200),
+    ]
+
+    # Önbelleği olmayan cihaz tam zarfı alır; sunucu artımlı kayıtları yanıtta uygular.
+    phone = device("phone")
+    copy = phone.load_vault(master)
+    assert len(copy) == 40
+    entry = copy.find_by_service("svc7")[0]
+    copy.update_password(entry.entry_id, "changed-on-phone")
+    deleted = copy.delete_entry(copy.find_by_service("svc9")[0].entry_id)
+    calls.clear()
+    phone.save_vault(master, copy)
+    assert [call[:3] for call in calls] == [("post", "/api/v1/vault/changes", 200)]
+    assert calls[0][3] < 1536
+
+    calls.clear()
+    refreshed = laptop.load_vault(master)
+    assert [call[:3] for call in calls] == [("get", "/api/v1/vault/changes", 200)]
+    assert refreshed.get_entry(entry.entry_id).password == "changed-on-phone"
+    assert len(refreshed) == 39 and not refreshed.find_by_service(deleted.service)
+
+    assert main.db.compact_vaults("9999") >= 1
+    fresh = SecureVaultAPI(APIVaultStorage("http://testserver", token, cache_dir=None, session=session))
+    assert fresh.load_vault(master).get_entry(entry.entry_id).password == "changed-on-phone"
@@ -0,0 +1,62 @@
+import base64
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from pass_manager.api.client import create_session
+from pass_manager.api.storage import APIVaultStorage
+
+
+class BadGateway(BaseHTTPRequestHandler):
+    def _reply(self):
+        self.server.calls.append(self.command)
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(502)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    do_GET = do_PUT = do_POST = _reply
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), BadGateway)
+    httpd.calls = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_writes_are_not_retried_on_gateway_errors(server):
+    session = create_session(retries=2, backoff=0)
+    url = f"http://127.0.0.1:{server.server_port}/api/v1/vault/envelope"
+
+    # Sunucu yazmayı kaydetmiş olabilir; aynı If-Match ile tekrar sahte 409 üretir.
+    assert session.put(url, data=b"{}", headers={"If-Match": '"3"'}, timeout=5).status_code == 502
+    assert server.calls == ["PUT"]
+
+    server.calls.clear()
+    assert session.get(url, timeout=5).status_code == 502
+    assert server.calls == ["GET"] * 3
+
+
+def _token(claims):
+    payload = base64.urlsafe_b64encode(json.dumps(claims).encode()).rstrip(b"=").decode()
+    return f"e30.{payload}.signature"
+
+
+def test_cache_file_is_shared_across_logins_of_one_user(tmp_path):
+    def cache_path(token, url="http://server"):
+        return APIVaultStorage(url, token, cache_dir=tmp_path, session=object()).cache_path
+
+    first = cache_path(_token({"sub": "7", "ver": 0, "iat": 1}))
+    assert cache_path(_token({"sub": "7", "ver": 1, "iat": 2})) == first
+    assert cache_path(_token({"sub": "8", "ver": 0, "iat": 1})) != first
+    assert cache_path(_token({"sub": "7"}), url="http://other") != first
@@ -0,0 +1,84 @@
+import json
+import threading
+
+import pytest
+
+from pass_manager.api import database
+from pass_manager.api.database import Database, RevisionConflict
+
+
+def test_connections_are_reused_per_thread(tmp_path):
+    db = Database(tmp_path / "server.db")
+    with db.connection() as first, db.connection() as second:
+        assert first is second
+        assert first.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    seen = []
+    worker = threading.Thread(target=lambda: seen.append(db.pool.get()))
+    worker.start()
+    worker.join()
+    assert seen[0] is not db.pool.get()
+    assert len(db.pool) == 2
+    db.close()
+
+
+def test_user_vault_join_and_save(tmp_path):
+    db = Database(tmp_path / "server.db")
+    assert db.get_user_vault(1) is None
+    assert not db.save_user_vault(1, "{}", "now")
+
+    user_id = db.create_user("alice", "hash", "now")
+    assert user_id == db.get_user_id("alice")
+    assert db.create_user("alice", "hash", "now") is None
+    row = db.get_user_vault(user_id)
+    assert row["user_id"] == user_id
+    assert row["encrypted_envelope"] is None
+
+    assert db.save_user_vault(user_id, '{"v": 1}', "t1") == 1
+    assert db.save_user_vault(user_id, '{"v": 2}', "t2") == 2
+    row = db.get_user_vault(user_id)
+    assert (row["encrypted_envelope"], row["updated_at"]) == ('{"v": 2}', "t2")
+    db.close()
+
+
+def test_save_rejects_stale_revision(tmp_path):
+    db = Database(tmp_path / "server.db")
+    alice = db.create_user("alice", "hash", "now")
+    with pytest.raises(RevisionConflict) as info:
+        db.save_user_vault(alice, "{}", "t0", expected_revision=3)
+    assert info.value.current == 0
+
+    assert db.save_user_vault(alice, '{"v": 1}', "t1", expected_revision=0) == 1
+    assert db.save_user_vault(alice, '{"v": 2}', "t2", expected_revision=1) == 2
+    with pytest.raises(RevisionConflict) as info:
+        db.save_user_vault(alice, '{"v": "stale"}', "t3", expected_revision=1)
+    assert info.value.current == 2
+    row = db.get_user_vault(alice)
+    assert (row["encrypted_envelope"], row["revision"]) == ('{"v": 2}', 2)
+    db.close()
+
+
+def test_changes_are_merged_on_read_and_folded_past_threshold(tmp_path, monkeypatch):
+    db = Database(tmp_path / "server.db")
+    alice = db.create_user("alice", "hash", "now")
+    db.save_user_vault(alice, b'{"v":1,"entries":{"a":{"n":1},"b":{"n":2}}}', "t1")
+    assert db.save_vault_changes(alice, b'{"v":2}', {"c": b'{"n":3}'}, ["a"], "t2") == 2
+    row = db.get_user_vault(alice)
+    assert (row["revision"], row["snapshot_revision"]) == (2, 1)
+    assert json.loads(row["encrypted_envelope"]) == {"v": 2, "entries": {"b": {"n": 2}, "c": {"n": 3}}}
+    # Okuma anlık görüntüyü yazmaz; katlama eşik aşılınca yazmada yapılır.
+    with db.connection() as conn:
+        assert conn.execute("SELECT snapshot_revision FROM vaults").fetchone()[0] == 1
+    monkeypatch.setattr(database, "COMPACT_PENDING_RECORDS", 3)
+    assert db.save_vault_changes(alice, None, {"d": b'{"n":4}'}, [], "t3") == 3
+    row = db.get_user_vault(alice)
+    assert row["snapshot_revision"] == 3 and b'"d":{"n":4}' in row["encrypted_envelope"]
+
+    # Okunamayan anlık görüntü yazmayı engellemez; okuma ve sıkıştırma onu atlar.
+    bob = db.create_user("bob", "hash", "now")
+    db.save_user_vault(bob, b"not json", "t1")
+    assert db.save_vault_changes(bob, None, {"c": b"{}"}, [], "t2") == 2
+    with pytest.raises(ValueError):
+        db.get_user_vault(bob)
+    db.compact_vault(bob, "9999")
+    db.close()
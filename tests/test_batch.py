@@ -0,0 +1,86 @@
+import json
+
+import pytest
+
+import pass_manager.cli as cli
+import pass_manager.crypto as crypto
+from pass_manager.batch import apply_operations, parse_operations
+from pass_manager.exceptions import BatchError
+from pass_manager.models import VaultEntry
+from pass_manager.storage import SecureVault, VaultStorage
+
+MASTER = "StrongMaster!123"
+
+
+@pytest.fixture
+def derive_calls(monkeypatch):
+    calls = []
+    original = crypto.derive_key
+
+    def counting(password, salt, iterations=1_000):
+        calls.append(salt)
+        return original(password, salt, 1_000)
+
+    monkeypatch.setattr(crypto, "derive_key", counting)
+    return calls
+
+
+def _vault_file(tmp_path):
+    path = tmp_path / "vault.sec"
+    secure_vault = SecureVault(VaultStorage(str(path)))
+    vault = secure_vault.init_vault(MASTER)
+    entry = vault.add_entry(VaultEntry(service="github", username="octo", password="secret!"))
+    secure_vault.save_vault(MASTER, vault)
+    return path, entry
+
+
+def test_batch_applies_all_operations_with_one_unlock(tmp_path, monkeypatch, capsys, derive_calls):
+    path, existing = _vault_file(tmp_path)
+    lines = [json.dumps({"op": "add", "service": f"svc{index}", "username": "ci"}) for index in range(50)]
+    lines += [
+        "# yorum",
+        json.dumps({"op": "update", "id": existing.entry_id, "password": "rotated!", "tags": "ci, prod"}),
+        json.dumps({"op": "delete", "id": existing.entry_id}),
+    ]
+    ops_file = tmp_path / "ops.jsonl"
+    ops_file.write_text("\n".join(lines), encoding="utf-8")
+    monkeypatch.setattr(cli, "prompt_master_password", lambda confirm=False: MASTER)
+    derive_calls.clear()
+    writes = []
+    original_write = VaultStorage.write_envelope
+    monkeypatch.setattr(VaultStorage, "write_envelope", lambda self, env: writes.append(1) or original_write(self, env))
+
+    cli.main(["--vault", str(path), "--no-agent", "batch", str(ops_file), "--json"])
+    results = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [result["op"] for result in results] == ["add"] * 50 + ["update", "delete"]
+    assert results[0]["generated"] and results[-1]["line"] == 53
+    assert len(derive_calls) == 1 and len(writes) == 1
+
+    vault = SecureVault(VaultStorage(str(path))).load_vault(MASTER)
+    assert len(vault) == 50
+
+
+def test_batch_error_rolls_back_everything(tmp_path, monkeypatch, capsys):
+    path, existing = _vault_file(tmp_path)
+    before = path.read_bytes()
+    operations = parse_operations(
+        [
+            json.dumps({"op": "add", "service": "gitlab", "username": "ci", "password": "secret!"}),
+            json.dumps({"op": "delete", "id": "missing"}),
+        ]
+    )
+    with pytest.raises(BatchError, match="Satır 2"):
+        parse_operations(['{"op": "add", "service": "x", "username": "y"}', '{"op": "rename"}'])
+    with pytest.raises(BatchError, match="Satır 1: metin olmalı: service"):
+        parse_operations(['{"op": "add", "service": 5, "username": "y"}'])
+
+    monkeypatch.setattr(cli, "prompt_master_password", lambda confirm=False: MASTER)
+    ops_file = tmp_path / "ops.jsonl"
+    ops_file.write_text("\n".join(json.dumps(op) for op in operations), encoding="utf-8")
+    cli.main(["--vault", str(path), "--no-agent", "batch", str(ops_file)])
+    assert "Hiçbir değişiklik kaydedilmedi" in capsys.readouterr().out
+    assert path.read_bytes() == before
+
+    vault = SecureVault(VaultStorage(str(path))).load_vault(MASTER)
+    with pytest.raises(BatchError, match="Satır 2"):
+        apply_operations(vault, operations)
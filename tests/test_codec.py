@@ -0,0 +1,27 @@
+import pytest
+
+from pass_manager.codec import CODECS, BinaryCodec, JsonCodec
+from pass_manager.exceptions import VaultIntegrityError
+
+
+@pytest.mark.parametrize("codec", [JsonCodec, BinaryCodec, CODECS["json+deflate"], CODECS["binary+deflate"]])
+def test_codec_roundtrip(codec):
+    value = {"service": "gıthub", "notes": "x" * 300, "tags": ["a", "b"], "count": -3, "ok": True, "none": None}
+    assert codec.decode(codec.encode(value)) == value
+
+
+def test_binary_codec_rejects_truncated_data():
+    data = BinaryCodec.encode({"service": "github"})
+    with pytest.raises(VaultIntegrityError):
+        BinaryCodec.decode(data[:-2])
+
+
+def test_deflate_codec_compresses_only_long_records():
+    codec = CODECS["json+deflate"]
+    short = {"service": "github"}
+    assert codec.encode(short) == b"\x00" + JsonCodec.encode(short)
+    long = {"service": "github", "notes": "tekrar eden not " * 40}
+    encoded = codec.encode(long)
+    assert encoded[:1] == b"\x01" and len(encoded) < len(JsonCodec.encode(long)) // 4
+    with pytest.raises(VaultIntegrityError):
+        codec.decode(encoded[:1] + b"bozuk")
@@ -1,7 +1,15 @@
 import pytest
 
-from pass_manager.crypto import decrypt_payload, encrypt_payload
-from pass_manager.exceptions import InvalidMasterPassword
+from pass_manager.crypto import (
+    KDF_FLOORS,
+    SCRYPT_NAME,
+    KeySession,
+    calibrate_kdf,
+    decrypt_payload,
+    encrypt_payload,
+    envelope_kdf_params,
+)
+from pass_manager.exceptions import InvalidMasterPassword, VaultIntegrityError
 
 
 def test_encrypt_decrypt_roundtrip():
@@ -11,9 +19,58 @@ def test_encrypt_decrypt_roundtrip():
     assert restored == data
 
 
+def test_large_payload_is_compressed_before_encryption():
+    data = {"entries": [{"service": f"svc{i}", "notes": "aynı not"} for i in range(100)], "meta": {}}
+    envelope = encrypt_payload("StrongMaster!123", data)
+    assert envelope["cipher"]["compression"] == "deflate"
+    assert decrypt_payload("StrongMaster!123", envelope) == data
+
+
 def test_decrypt_with_wrong_password_fails():
     data = {"entries": [], "meta": {"created_at": "now", "updated_at": "now"}}
     envelope = encrypt_payload("CorrectHorseBattery", data)
     with pytest.raises(InvalidMasterPassword):
         decrypt_payload("WrongPassword", envelope)
 
+
+def test_session_reuses_salt_and_key():
+    data = {"entries": [], "meta": {}}
+    session = KeySession.derive("StrongMaster!123")
+    first = encrypt_payload(None, data, session)
+    second = encrypt_payload(None, data, session)
+    assert first["kdf"]["salt"] == second["kdf"]["salt"]
+    assert first["cipher"]["nonce"] != second["cipher"]["nonce"]
+    assert decrypt_payload(None, second, session) == data
+    assert decrypt_payload("StrongMaster!123", second) == data
+
+
+def test_zeroized_session_is_inactive():
+    session = KeySession.derive(
+        "StrongMaster!123", kdf={"name": "PBKDF2-HMAC-SHA512", "iterations": 1_000}
+    )
+    assert session.active
+    session.zeroize()
+    assert not session.active
+
+
+def test_scrypt_params_are_stored_in_envelope():
+    data = {"entries": [], "meta": {}}
+    kdf = {"name": SCRYPT_NAME, "n": 2**10, "r": 8, "p": 1}
+    session = KeySession.derive("StrongMaster!123", kdf=kdf)
+    envelope = encrypt_payload(None, data, session)
+    assert envelope["kdf"]["n"] == 2**10
+    assert envelope_kdf_params(envelope)[1] == kdf
+    assert decrypt_payload("StrongMaster!123", envelope) == data
+
+
+def test_unknown_kdf_is_rejected():
+    envelope = encrypt_payload("StrongMaster!123", {"entries": [], "meta": {}})
+    envelope["kdf"]["name"] = "md5"
+    with pytest.raises(VaultIntegrityError):
+        decrypt_payload("StrongMaster!123", envelope)
+
+
+def test_calibration_never_goes_below_floor():
+    params, elapsed = calibrate_kdf(SCRYPT_NAME, target_seconds=0.0001)
+    assert params == KDF_FLOORS[SCRYPT_NAME]
+    assert elapsed > 0
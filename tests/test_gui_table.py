@@ -0,0 +1,46 @@
+import os
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+QtWidgets = pytest.importorskip("PySide6.QtWidgets")
+
+from pass_manager.gui.table import VaultTableModel
+from pass_manager.models import Vault, VaultEntry
+
+
+@pytest.fixture(scope="module")
+def qapp():
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+def _services(model):
+    return [model.index(row, 0).data() for row in range(model.rowCount())]
+
+
+def test_model_updates_single_rows_in_order(qapp):
+    vault = Vault()
+    for service in ("gitlab", "aws", "github"):
+        vault.add_entry(VaultEntry(service=service, username="user", password="secret!"))
+    model = VaultTableModel(vault)
+    assert _services(model) == ["aws", "github", "gitlab"]
+
+    inserted = []
+    model.rowsInserted.connect(lambda _parent, first, last: inserted.append((first, last)))
+    entry = vault.add_entry(VaultEntry(service="bitbucket", username="user", password="secret!"))
+    model.insert_entry(entry)
+    assert inserted == [(1, 1)]
+    assert _services(model) == ["aws", "bitbucket", "github", "gitlab"]
+
+    model.set_query("git*")
+    assert _services(model) == ["github", "gitlab"]
+    hidden = vault.add_entry(VaultEntry(service="dropbox", username="user", password="secret!"))
+    assert model.insert_entry(hidden) == -1
+
+    hidden.service = "gitea"
+    vault.mark_dirty(hidden.entry_id)
+    model.update_entry(hidden)
+    assert _services(model) == ["gitea", "github", "gitlab"]
+
+    model.remove_entry(vault.delete_entry(hidden.entry_id).entry_id)
+    assert _services(model) == ["github", "gitlab"]
@@ -0,0 +1,78 @@
+import os
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+QtWidgets = pytest.importorskip("PySide6.QtWidgets")
+
+import pass_manager.crypto as crypto
+from pass_manager.gui.workers import SaveCoalescer, VaultWorker
+from pass_manager.models import VaultEntry
+from pass_manager.storage import SecureVault, VaultStorage
+
+
+@pytest.fixture(scope="module")
+def qapp():
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+@pytest.fixture(autouse=True)
+def fast_kdf(monkeypatch):
+    original = crypto.derive_key
+    monkeypatch.setattr(
+        crypto, "derive_key", lambda password, salt, iterations=1_000: original(password, salt, 1_000)
+    )
+
+
+class CountingStorage(VaultStorage):
+    writes = 0
+
+    def write_envelope(self, envelope):
+        self.writes += 1
+        super().write_envelope(envelope)
+
+
+def test_quick_edits_are_coalesced_into_one_write(tmp_path, qapp):
+    storage = CountingStorage(str(tmp_path / "vault.sec"))
+    secure_vault = SecureVault(storage)
+    vault = secure_vault.init_vault("StrongMaster!123")
+    storage.writes = 0
+
+    worker = VaultWorker()
+    saver = SaveCoalescer(worker, secure_vault, "StrongMaster!123", vault, delay_ms=10_000)
+    for index in range(5):
+        vault.add_entry(VaultEntry(service=f"svc{index}", username="user", password="secret!"))
+        saver.schedule()
+    assert storage.writes == 0
+    assert saver.wait()
+    assert storage.writes == 1
+
+    restored = SecureVault(storage).load_vault("StrongMaster!123")
+    assert len(restored) == 5
+
+
+def test_run_modal_returns_result_and_reraises(qapp):
+    worker = VaultWorker()
+    assert worker.run_modal(None, "test", lambda: 42) == 42
+    with pytest.raises(ValueError):
+        worker.run_modal(None, "test", lambda: int("x"))
+
+
+def test_relock_zeroizes_keys_of_replaced_vault(tmp_path, qapp, monkeypatch):
+    from pass_manager.gui import app as gui_app
+
+    opened = []
+    for name in ("first", "second"):
+        secure_vault = SecureVault(VaultStorage(str(tmp_path / f"{name}.sec")))
+        opened.append((secure_vault, "StrongMaster!123", secure_vault.init_vault("StrongMaster!123")))
+    results = iter(opened)
+    monkeypatch.setattr(gui_app, "request_vault", lambda parent, worker: next(results))
+
+    window = gui_app.MainWindow(qapp)
+    first = opened[0][0]
+    assert first._session is not None
+    window.relock_vault()
+    assert window.secure_vault is opened[1][0]
+    assert first._session is None
+    window.close()
+    assert opened[1][0]._session is None
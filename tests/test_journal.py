@@ -0,0 +1,73 @@
+import pytest
+
+import pass_manager.crypto as crypto
+from pass_manager.exceptions import VaultIntegrityError
+from pass_manager.journal import JournalVaultStorage
+from pass_manager.models import VaultEntry
+from pass_manager.storage import SecureVault, open_storage
+
+
+@pytest.fixture(autouse=True)
+def fast_kdf(monkeypatch):
+    original = crypto.derive_key
+    monkeypatch.setattr(
+        crypto, "derive_key", lambda password, salt, iterations=1_000: original(password, salt, 1_000)
+    )
+
+
+def _populated(path, count=3):
+    storage = JournalVaultStorage(str(path), background=False)
+    secure_vault = SecureVault(storage)
+    vault = secure_vault.init_vault("StrongMaster!123")
+    for index in range(count):
+        vault.add_entry(VaultEntry(service=f"svc{index}", username="user", password="secret!"))
+        secure_vault.save_vault("StrongMaster!123", vault)
+    return storage, secure_vault, vault
+
+
+def test_saves_append_to_journal(tmp_path):
+    path = tmp_path / "vault.sec"
+    storage, _, _ = _populated(path)
+    snapshot = path.read_bytes()
+    assert len(storage.journal_path.read_bytes().splitlines()) == 3
+
+    reopened = open_storage(str(path))
+    assert isinstance(reopened, JournalVaultStorage)
+    vault = SecureVault(reopened).load_vault("StrongMaster!123")
+    assert [entry.service for entry in vault.list_entries()] == ["svc0", "svc1", "svc2"]
+    assert path.read_bytes() == snapshot
+
+
+def test_torn_tail_is_discarded(tmp_path):
+    path = tmp_path / "vault.sec"
+    storage, _, _ = _populated(path)
+    data = storage.journal_path.read_bytes()
+    storage.journal_path.write_bytes(data[:-10])
+
+    vault = SecureVault(JournalVaultStorage(str(path))).load_vault("StrongMaster!123")
+    assert [entry.service for entry in vault.list_entries()] == ["svc0", "svc1"]
+    assert len(storage.journal_path.read_bytes().splitlines()) == 2
+
+
+def test_corrupt_middle_record_is_an_error(tmp_path):
+    path = tmp_path / "vault.sec"
+    storage, _, _ = _populated(path)
+    lines = storage.journal_path.read_bytes().splitlines(keepends=True)
+    lines[1] = lines[1].replace(b'"digest":"', b'"digest":"0', 1)
+    storage.journal_path.write_bytes(b"".join(lines))
+
+    with pytest.raises(VaultIntegrityError):
+        SecureVault(JournalVaultStorage(str(path))).load_vault("StrongMaster!123")
+    assert storage.journal_path.read_bytes() == b"".join(lines)
+
+
+def test_compaction_folds_journal_into_snapshot(tmp_path):
+    path = tmp_path / "vault.sec"
+    storage, secure_vault, vault = _populated(path)
+    storage.compact_threshold = 1
+    vault.delete_entry(vault.list_entries()[0].entry_id)
+    secure_vault.save_vault("StrongMaster!123", vault)
+
+    assert storage.journal_path.read_bytes() == b""
+    restored = SecureVault(JournalVaultStorage(str(path))).load_vault("StrongMaster!123")
+    assert [entry.service for entry in restored.list_entries()] == ["svc1", "svc2"]
@@ -0,0 +1,25 @@
+from pass_manager.models import Vault, VaultEntry
+
+
+def test_entry_dict_roundtrip():
+    entry = VaultEntry(service="github", username="tanjiro", password="secret!", tags=["work"])
+    data = entry.to_dict()
+    restored = VaultEntry.from_dict(data)
+    assert restored == entry
+    data["tags"].append("changed")
+    assert entry.tags == ["work"]
+    assert not hasattr(entry, "__dict__")
+
+
+def test_entry_from_dict_fills_missing_fields():
+    entry = VaultEntry.from_dict({"service": "github", "username": "tanjiro", "password": "secret!"})
+    assert entry.notes == "" and entry.tags == []
+    assert len(entry.entry_id) == 24
+    assert entry.created_at == entry.updated_at
+
+
+def test_vault_dict_roundtrip():
+    vault = Vault()
+    entry = vault.add_entry(VaultEntry(service="github", username="tanjiro", password="secret!"))
+    restored = Vault.from_dict(vault.to_dict())
+    assert restored.get_entry(entry.entry_id) == entry
@@ -1,4 +1,7 @@
-from pass_manager.passwords import AMBIGUOUS, GeneratorOptions, generate_password
+import os
+from collections import Counter
+
+from pass_manager.passwords import AMBIGUOUS, GeneratorOptions, PasswordGenerator, _pools, generate_password
 
 
 def test_generate_password_default_length():
@@ -15,3 +18,27 @@ def test_generate_password_avoids_ambiguous_chars():
     password = generate_password(options)
     assert not any(ch in AMBIGUOUS for ch in password)
 
+
+def test_generate_many_is_uniform_and_covers_categories():
+    options = GeneratorOptions(length=16, symbols="soft")
+    generator = PasswordGenerator(options, buffer_size=256)
+    passwords = list(generator.generate_many(5_000))
+    assert len(set(passwords)) == len(passwords)
+    pools = _pools(options)
+    assert all(all(any(ch in pool for ch in password) for pool in pools) for password in passwords)
+
+    # Kategori koşulu küçük havuzları öne çıkarır; tekdüzelik koşulsuz ölçülür.
+    unconditioned = PasswordGenerator(GeneratorOptions(length=16, require_each_category=False))
+    counts = Counter("".join(unconditioned.generate_many(5_000)))
+    assert set(counts) == set("".join(pools))
+    expected = sum(counts.values()) / len(counts)
+    # Ret örneklemesi olmasaydı havuzun başındaki karakterler belirgin biçimde sık çıkardı.
+    assert max(counts.values()) < expected * 1.2 and min(counts.values()) > expected * 0.8
+
+
+def test_generator_discards_buffer_after_fork(monkeypatch):
+    generator = PasswordGenerator(GeneratorOptions(length=12), buffer_size=4096)
+    generator.generate()
+    buffered = generator._buffer[generator._offset:]
+    monkeypatch.setattr(os, "getpid", lambda: -1)
+    assert generator._take(12) != buffered[:12]
@@ -0,0 +1,84 @@
+import random
+
+from pass_manager.models import Vault, VaultEntry
+from pass_manager.search import SearchIndex
+
+
+def _vault():
+    vault = Vault()
+    vault.add_entry(VaultEntry(service="GitHub", username="tanjiro", password="x", tags=["work", "code"]))
+    vault.add_entry(VaultEntry(service="gitlab", username="nezuko@mail.com", password="x", tags=["code"]))
+    vault.add_entry(VaultEntry(service="Bank", username="tanjiro", password="x", tags=["finance"]))
+    return vault
+
+
+def _services(entries):
+    return [entry.service for entry in entries]
+
+
+def test_substring_matches_linear_scan():
+    rng = random.Random(7)
+    words = ["git", "hub", "lab", "mail", "bank", "cloud", "a.b", "x_y"]
+    vault = Vault()
+    for _ in range(300):
+        vault.add_entry(
+            VaultEntry(
+                service="".join(rng.sample(words, 2)),
+                username=rng.choice(words) + "@" + rng.choice(words),
+                password="x",
+                tags=rng.sample(words, 2),
+            )
+        )
+    for keyword in ["git", "b", "ab", "ubl", "@ma", "a.b", "x_y", "|", "zzz", "hub|"]:
+        expected = sorted(
+            (e for e in vault._entries.values() if e.matches(keyword)),
+            key=lambda e: (e.service.lower(), e.username.lower(), e.entry_id),
+        )
+        assert vault.list_entries(keyword) == expected, keyword
+        assert SearchIndex.scan(vault._entries.values(), keyword) == expected, keyword
+
+
+def test_prefix_tag_and_multi_term_queries():
+    vault = _vault()
+    vault.index  # indeksli yol
+    assert _services(vault.list_entries("git*")) == ["GitHub", "gitlab"]
+    assert _services(vault.list_entries("hub*")) == []
+    assert _services(vault.list_entries("tag:code")) == ["GitHub", "gitlab"]
+    assert _services(vault.list_entries("tag:cod")) == []
+    assert _services(vault.list_entries("tanjiro tag:work")) == ["GitHub"]
+
+
+def test_index_follows_mutations():
+    vault = _vault()
+    assert _services(vault.list_entries("git")) == ["GitHub", "gitlab"]
+    gitlab = vault.list_entries("gitlab")[0]
+    vault.delete_entry(gitlab.entry_id)
+    vault.add_entry(VaultEntry(service="Gitea", username="zenitsu", password="x"))
+    assert _services(vault.list_entries("git")) == ["Gitea", "GitHub"]
+
+    github = vault.list_entries("github")[0]
+    github.service = "Codeberg"
+    vault.mark_dirty(github.entry_id)
+    assert _services(vault.list_entries("git")) == ["Gitea"]
+    assert _services(vault.list_entries()) == ["Bank", "Codeberg", "Gitea"]
+
+
+def test_scan_and_index_agree_on_query_syntax():
+    vault = _vault()
+    for query in ["git*", "hub*", "tag:code", "tag:cod", "tanjiro tag:work", "GIT lab"]:
+        assert SearchIndex.scan(vault._entries.values(), query) == [
+            vault.get_entry(entry_id) for entry_id in vault.index.search(query)
+        ], query
+
+
+def test_scan_and_index_agree_with_notes_indexed():
+    vault = Vault(index_notes=True)
+    vault.add_entry(VaultEntry(service="GitHub", username="tanjiro", password="x", notes="recovery codes"))
+    vault.add_entry(VaultEntry(service="Bank", username="nezuko", password="x", notes="branch office"))
+    # İlk sorgu indeks kurulmadan taramayla yanıtlanır; sonrakiler indeksten.
+    first = _services(vault.list_entries("recovery"))
+    assert first == _services(vault.list_entries("recovery")) == ["GitHub"]
+    for query in ["codes", "bran*", "office tag:x", "git"]:
+        assert SearchIndex.scan(vault._entries.values(), query, include_notes=True) == [
+            vault.get_entry(entry_id) for entry_id in vault.index.search(query)
+        ], query
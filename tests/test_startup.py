@@ -0,0 +1,73 @@
+"""CLI açılış bütçeleri (`python -X importtime`).
+
+Süreler makineye göre değiştiğinden bütçeler cömerttir; asıl koruma her
+komutun yüklememesi gereken modüllerdir.
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import pass_manager
+
+SRC = str(Path(pass_manager.__file__).resolve().parent.parent)
+HEAVY = {"requests", "cryptography", "PySide6", "fastapi"}
+
+
+def _importtime(*args):
+    """Komutun yüklediği modüller ve Python'un kendi açılışı dışındaki import süresi (ms)."""
+    env = {**os.environ, "PYTHONPATH": SRC}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        capture_output=True,
+        text=True,
+        env=env,
+        stdin=subprocess.DEVNULL,
+        timeout=60,
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules[name[1:].rstrip()] = int(cumulative)
+    return modules
+
+
+@pytest.fixture(scope="module")
+def interpreter_baseline():
+    return set(_importtime("-c", "pass"))
+
+
+@pytest.mark.parametrize(
+    "argv, budget_ms, forbidden",
+    [
+        (["--help"], 100, HEAVY | {"rich"}),
+        (["generate"], 150, HEAVY),
+        (["agent", "status"], 250, HEAVY),
+    ],
+)
+def test_command_startup_budget(argv, budget_ms, forbidden, interpreter_baseline):
+    modules = _importtime("-m", "pass_manager", *argv)
+    loaded = {name.strip().split(".")[0] for name in modules}
+    assert not loaded & forbidden
+    top_level = [ms for name, ms in modules.items() if not name.startswith(" ") and name not in interpreter_baseline]
+    assert sum(top_level) / 1000 < budget_ms
+
+
+def test_local_commands_skip_api_client(tmp_path):
+    code = (
+        "from pass_manager import cli\n"
+        "cli.prompt_master_password = lambda confirm=False: 'StrongMaster!123'\n"
+        f"cli.main(['--vault', {str(tmp_path / 'vault.sec')!r}, '--no-agent', 'list'])\n"
+    )
+    loaded = {name.strip().split(".")[0] for name in _importtime("-c", code)}
+    assert "cryptography" in loaded and "requests" not in loaded
+
+
+def test_gui_package_defers_widgets():
+    loaded = {name.strip() for name in _importtime("-c", "import pass_manager.gui")}
+    assert "PySide6.QtWidgets" not in loaded
@@ -0,0 +1,175 @@
+import pytest
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+import pass_manager.crypto as crypto
+from pass_manager.exceptions import InvalidMasterPassword, VaultIntegrityError
+from pass_manager.models import VaultEntry
+from pass_manager.storage import SecureVault, VaultStorage
+
+
+@pytest.fixture
+def derive_calls(monkeypatch):
+    calls = []
+    original = crypto.derive_key
+
+    def counting(master_password, salt, iterations=crypto.KDF_ITERATIONS):
+        calls.append(salt)
+        return original(master_password, salt, 1_000)
+
+    monkeypatch.setattr(crypto, "derive_key", counting)
+    return calls
+
+
+def test_save_reuses_session_key(tmp_path, derive_calls):
+    secure_vault = SecureVault(VaultStorage(str(tmp_path / "vault.sec")))
+    vault = secure_vault.init_vault("StrongMaster!123")
+    for index in range(3):
+        vault.add_entry(VaultEntry(service=f"svc{index}", username="user", password="secret!"))
+        secure_vault.save_vault("StrongMaster!123", vault)
+    assert len(derive_calls) == 1
+
+    restored = secure_vault.load_vault("StrongMaster!123")
+    assert len(restored.list_entries()) == 3
+    assert len(derive_calls) == 1
+
+
+def test_cached_session_rejects_other_password(tmp_path, derive_calls):
+    secure_vault = SecureVault(VaultStorage(str(tmp_path / "vault.sec")))
+    secure_vault.init_vault("StrongMaster!123")
+    with pytest.raises(InvalidMasterPassword):
+        secure_vault.load_vault("WrongPassword!")
+
+
+def test_save_reseals_only_changed_entries(tmp_path, derive_calls):
+    storage = VaultStorage(str(tmp_path / "vault.sec"))
+    secure_vault = SecureVault(storage)
+    vault = secure_vault.init_vault("StrongMaster!123")
+    first = vault.add_entry(VaultEntry(service="github", username="a", password="secret!"))
+    second = vault.add_entry(VaultEntry(service="gitlab", username="b", password="secret!"))
+    secure_vault.save_vault("StrongMaster!123", vault)
+    before = storage.read_envelope()["entries"]
+
+    vault.update_password(second.entry_id, "changed!")
+    secure_vault.save_vault("StrongMaster!123", vault)
+    after = storage.read_envelope()["entries"]
+
+    assert after[first.entry_id] == before[first.entry_id]
+    assert after[second.entry_id] != before[second.entry_id]
+    restored = SecureVault(storage).load_vault("StrongMaster!123")
+    assert restored.get_entry(second.entry_id).password == "changed!"
+
+
+def test_legacy_envelope_is_migrated(tmp_path, derive_calls):
+    storage = VaultStorage(str(tmp_path / "vault.sec"))
+    entry = VaultEntry(service="github", username="a", password="secret!")
+    payload = {"entries": [entry.to_dict()], "meta": {}}
+    storage.write_envelope(crypto.encrypt_payload("StrongMaster!123", payload))
+
+    secure_vault = SecureVault(storage)
+    vault = secure_vault.load_vault("StrongMaster!123")
+    secure_vault.save_vault("StrongMaster!123", vault)
+    assert storage.read_envelope()["version"] == 2
+    assert SecureVault(storage).load_vault("StrongMaster!123").get_entry(entry.entry_id).password == "secret!"
+
+
+def test_dropped_record_is_detected(tmp_path, derive_calls):
+    storage = VaultStorage(str(tmp_path / "vault.sec"))
+    secure_vault = SecureVault(storage)
+    vault = secure_vault.init_vault("StrongMaster!123")
+    entry = vault.add_entry(VaultEntry(service="github", username="a", password="secret!"))
+    secure_vault.save_vault("StrongMaster!123", vault)
+
+    envelope = storage.read_envelope()
+    del envelope["entries"][entry.entry_id]
+    storage.write_envelope(envelope)
+    with pytest.raises(VaultIntegrityError):
+        SecureVault(storage).load_vault("StrongMaster!123")
+
+
+def test_full_manifest_meta_is_still_accepted(tmp_path, derive_calls):
+    storage = VaultStorage(str(tmp_path / "vault.sec"))
+    secure_vault = SecureVault(storage)
+    vault = secure_vault.init_vault("StrongMaster!123")
+    entry = vault.add_entry(VaultEntry(service="github", username="a", password="secret!"))
+    secure_vault.save_vault("StrongMaster!123", vault)
+
+    # Önceki sürümler meta kaydına tek özet yerine manifestin tamamını mühürlüyordu.
+    envelope = storage.read_envelope()
+    aesgcm = AESGCM(bytes(secure_vault._data_key))
+    legacy_meta = {"meta": {}, "manifest": dict(secure_vault._manifest)}
+    envelope["meta"] = crypto.seal_record(aesgcm, crypto.META_AAD, legacy_meta, envelope["codec"])
+    envelope["checksum"] = crypto._header_checksum(envelope["cipher"], envelope["meta"])
+    storage.write_envelope(envelope)
+    assert SecureVault(storage).load_vault("StrongMaster!123").get_entry(entry.entry_id).password == "secret!"
+
+
+def test_binary_container_roundtrip_and_json_fallback(tmp_path, derive_calls):
+    binary = VaultStorage(str(tmp_path / "vault.sec"))
+    secure_vault = SecureVault(binary, codec="binary")
+    vault = secure_vault.init_vault("StrongMaster!123")
+    entry = vault.add_entry(VaultEntry(service="github", username="a", password="secret!"))
+    secure_vault.save_vault("StrongMaster!123", vault)
+    assert binary.path.read_bytes().startswith(b"PMVB")
+
+    json_storage = VaultStorage(str(tmp_path / "vault.json"), format="json")
+    json_storage.write_envelope(binary.read_envelope())
+    assert json_storage.path.read_bytes().startswith(b"{")
+    for storage in (binary, json_storage):
+        restored = SecureVault(storage).load_vault("StrongMaster!123")
+        assert restored.get_entry(entry.entry_id).password == "secret!"
+
+
+def test_open_envelope_maps_binary_file(tmp_path, derive_calls):
+    storage = VaultStorage(str(tmp_path / "vault.sec"))
+    secure_vault = SecureVault(storage)
+    vault = secure_vault.init_vault("StrongMaster!123")
+    entry = vault.add_entry(VaultEntry(service="github", username="a", password="secret!"))
+    secure_vault.save_vault("StrongMaster!123", vault)
+
+    with storage.open_envelope() as envelope:
+        assert isinstance(envelope["entries"][entry.entry_id]["payload"], memoryview)
+    assert envelope == {}
+
+    reopened = SecureVault(storage)
+    reopened.load_vault("StrongMaster!123").update_password(entry.entry_id, "changed!")
+    assert all(isinstance(value, bytes) for value in reopened._records[entry.entry_id].values())
+
+
+def test_empty_vault_file_is_an_integrity_error(tmp_path, derive_calls):
+    storage = VaultStorage(str(tmp_path / "vault.sec"))
+    storage.path.write_bytes(b"")
+    with pytest.raises(VaultIntegrityError):
+        with storage.open_envelope():
+            pass
+    with pytest.raises(VaultIntegrityError):
+        storage.read_envelope()
+    with pytest.raises(VaultIntegrityError):
+        SecureVault(storage).load_vault("StrongMaster!123")
+
+
+def test_rekey_rewraps_data_key_without_resealing_records(tmp_path, derive_calls):
+    storage = VaultStorage(str(tmp_path / "vault.sec"))
+    secure_vault = SecureVault(storage)
+    vault = secure_vault.init_vault("StrongMaster!123")
+    vault.add_entry(VaultEntry(service="github", username="user", password="secret!"))
+    secure_vault.save_vault("StrongMaster!123", vault)
+    before = storage.read_envelope()
+
+    kdf = {"name": crypto.SCRYPT_NAME, "n": 2**10, "r": 8, "p": 1}
+    rekeying = SecureVault(storage, kdf=kdf)
+    vault = rekeying.load_vault("StrongMaster!123")
+    rekeying.save_vault("StrongMaster!123", vault)
+    after = storage.read_envelope()
+
+    assert after["kdf"]["name"] == crypto.SCRYPT_NAME
+    assert after["kdf"]["salt"] != before["kdf"]["salt"]
+    assert bytes(after["cipher"]["payload"]) != bytes(before["cipher"]["payload"])
+    for entry_id, record in before["entries"].items():
+        assert bytes(after["entries"][entry_id]["payload"]) == bytes(record["payload"])
+
+    # Parametre verilmeyen istemci kasanın KDF'sini korur.
+    restored = SecureVault(storage)
+    vault = restored.load_vault("StrongMaster!123")
+    assert vault.list_entries()[0].service == "github"
+    restored.save_vault("StrongMaster!123", vault)
+    assert storage.read_envelope()["kdf"]["name"] == crypto.SCRYPT_NAME
@@ -0,0 +1,93 @@
+import io
+import json
+
+import pytest
+
+import pass_manager.cli as cli
+import pass_manager.crypto as crypto
+from pass_manager.exceptions import InvalidMasterPassword, VaultError, VaultIntegrityError
+from pass_manager.models import Vault, VaultEntry
+from pass_manager.storage import SecureVault, VaultStorage
+from pass_manager.transfer import FRAME_ENTRIES, import_entries, read_encrypted, read_entries, write_encrypted
+
+MASTER = "StrongMaster!123"
+FAST_KDF = {"name": crypto.PBKDF2_NAME, "iterations": 1_000}
+
+
+@pytest.fixture(autouse=True)
+def fast_kdf(monkeypatch):
+    original = crypto.derive_key
+    monkeypatch.setattr(
+        crypto, "derive_key", lambda password, salt, iterations=1_000: original(password, salt, 1_000)
+    )
+
+
+def test_encrypted_export_round_trip_detects_tampering():
+    entries = [VaultEntry(service=f"svc{index}", username="u", password="secret!") for index in range(FRAME_ENTRIES + 3)]
+    out = io.BytesIO()
+    written = list(write_encrypted(iter(entries), out, "ExportPass!1", kdf=FAST_KDF))
+    assert len(written) == len(entries)
+    blob = out.getvalue()
+    assert b"svc1" not in blob
+
+    restored = list(read_entries(io.BufferedReader(io.BytesIO(blob)), "auto", password="ExportPass!1"))
+    assert [row["service"] for row in restored] == [entry.service for entry in entries]
+
+    with pytest.raises(InvalidMasterPassword):
+        next(read_encrypted(io.BytesIO(blob), "WrongPass!1"))
+    # Son çerçeve kesilirse ilk çerçevedeki kayıtlar okunsa da akış hata verir.
+    with pytest.raises(VaultIntegrityError):
+        list(read_encrypted(io.BytesIO(blob[:-40]), "ExportPass!1"))
+
+
+def test_import_other_managers_with_deduplication():
+    bitwarden = (
+        "folder,favorite,type,name,notes,fields,reprompt,login_uri,login_username,login_password,login_totp\n"
+        "Work,,login,GitHub,personal,,0,https://github.com/login,octo,pw-1,\n"
+        ",,login,,,,0,https://mail.example.com/,me,pw-2,\n"
+        ",,login,github,,,0,,OCTO,pw-3,\n"
+        ",,note,Secure note,text,,0,,,,\n"
+    )
+    vault = Vault()
+    vault.add_entry(VaultEntry(service="mail.example.com", username="me", password="old"))
+    rows = read_entries(io.BufferedReader(io.BytesIO(bitwarden.encode("utf-8-sig"))))
+    stats = import_entries(vault, rows, on_duplicate="update")
+    assert (stats.added, stats.updated, stats.invalid) == (1, 2, 1)
+    github = vault.find_by_service("github")
+    assert len(github) == 1 and github[0].password == "pw-3" and github[0].tags == ["Work"]
+    assert vault.find_by_service("mail.example.com")[0].password == "pw-2"
+
+
+def test_cli_export_import_round_trip(tmp_path, monkeypatch, capsys):
+    source = tmp_path / "source.sec"
+    secure_vault = SecureVault(VaultStorage(str(source)))
+    vault = secure_vault.init_vault(MASTER)
+    for index in range(5):
+        vault.add_entry(VaultEntry(service=f"svc{index}", username="u", password=f"pw{index}!", tags=["a", "b"]))
+    secure_vault.save_vault(MASTER, vault)
+    target = tmp_path / "target.sec"
+    SecureVault(VaultStorage(str(target))).init_vault(MASTER)
+    monkeypatch.setattr(cli, "prompt_master_password", lambda confirm=False, label="": MASTER)
+    monkeypatch.setattr(cli, "prompt_export_password", lambda confirm=False: "ExportPass!1")
+
+    for name in ("export.csv", "export.jsonl", "export.pmx"):
+        cli.main(["--vault", str(source), "--no-agent", "export", "-o", str(tmp_path / name)])
+        assert (tmp_path / name).stat().st_mode & 0o077 == 0
+        cli.main(["--vault", str(target), "--no-agent", "import", str(tmp_path / name)])
+    assert "Atlandı (kopya): 5" in capsys.readouterr().out
+
+    imported = SecureVault(VaultStorage(str(target))).load_vault(MASTER)
+    assert sorted((entry.service, entry.password, tuple(entry.tags)) for entry in imported.list_entries()) == [
+        (f"svc{index}", f"pw{index}!", ("a", "b")) for index in range(5)
+    ]
+    header = json.loads((tmp_path / "export.pmx").read_bytes().split(b"\n", 1)[0])
+    assert header["format"] == "pass-manager-export"
+
+
+def test_import_rejects_bad_input_before_prompting(tmp_path, monkeypatch, capsys):
+    with pytest.raises(VaultError, match="Satır 2: nesne bekleniyor"):
+        list(read_entries(io.BufferedReader(io.BytesIO(b'{"service": "a"}\n[1, 2]\n')), "jsonl"))
+
+    monkeypatch.setattr(cli, "prompt_master_password", lambda confirm=False, label="": pytest.fail("parola soruldu"))
+    cli.main(["--vault", str(tmp_path / "vault.sec"), "--no-agent", "import", str(tmp_path / "missing.csv")])
+    assert "Dosya açılamadı" in capsys.readouterr().out
@@ -4,34 +4,16 @@ class PassManagerAPI {
         this.baseURL = baseURL.replace(/\/$/, '');
         this.token = localStorage.getItem('pm_token');
         this.username = localStorage.getItem('pm_username');
+        // Son okunan/yazılan vault revizyonu; kayıtta If-Match olarak gönderilir.
+        this.revision = null;
     }
 
     async request(endpoint, options = {}) {
-        const url = `${this.baseURL}${endpoint}`;
-        const headers = {
-            'Content-Type': 'application/json',
-            ...options.headers
-        };
-
-        if (this.token) {
-            headers['Authorization'] = `Bearer ${this.token}`;
-        }
-
-        try {
-            const response = await fetch(url, {
-                ...options,
-                headers
-            });
-
-            if (!response.ok) {
-                const error = await response.json().catch(() => ({ detail: 'Bir hata oluştu' }));
-                throw new Error(error.detail || `HTTP ${response.status}`);
-            }
-
-            return await response.json();
-        } catch (error) {
-            throw error;
-        }
+        const response = await this.rawRequest(endpoint, {
+            ...options,
+            headers: { 'Content-Type': 'application/json', ...options.headers }
+        });
+        return await response.json();
     }
 
     async register(username, password) {
@@ -58,20 +40,56 @@ class PassManagerAPI {
         return data;
     }
 
+    async rawRequest(endpoint, options = {}) {
+        const headers = { ...options.headers };
+        if (this.token) {
+            headers['Authorization'] = `Bearer ${this.token}`;
+        }
+        const response = await fetch(`${this.baseURL}${endpoint}`, { ...options, headers });
+        if (!response.ok) {
+            const error = await response.json().catch(() => ({ detail: 'Bir hata oluştu' }));
+            const failure = new Error(error.detail || `HTTP ${response.status}`);
+            failure.status = response.status;
+            throw failure;
+        }
+        return response;
+    }
+
+    revisionOf(response) {
+        const etag = response.headers.get('ETag');
+        return etag ? parseInt(etag.replace(/^W\//, '').replace(/"/g, ''), 10) : null;
+    }
+
     async getVault() {
-        return await this.request('/api/v1/vault');
+        // Zarf sunucuda ayrıştırılmadan saklanır; ham gövde olarak gelir.
+        const response = await this.rawRequest('/api/v1/vault/envelope');
+        this.revision = this.revisionOf(response);
+        return {
+            encrypted_envelope: response.status === 204 ? {} : await response.json(),
+            updated_at: response.headers.get('X-Vault-Updated-At'),
+            revision: this.revision
+        };
     }
 
     async saveVault(encryptedEnvelope) {
-        return await this.request('/api/v1/vault', {
-            method: 'POST',
-            body: JSON.stringify({ encrypted_envelope: encryptedEnvelope })
+        const headers = { 'Content-Type': 'application/json' };
+        if (this.revision !== null) {
+            headers['If-Match'] = `"${this.revision}"`;
+        }
+        const response = await this.rawRequest('/api/v1/vault/envelope', {
+            method: 'PUT',
+            headers,
+            body: JSON.stringify(encryptedEnvelope)
         });
+        const data = await response.json();
+        this.revision = data.revision ?? null;
+        return data;
     }
 
     logout() {
         this.token = null;
         this.username = null;
+        this.revision = null;
         localStorage.removeItem('pm_token');
         localStorage.removeItem('pm_username');
         localStorage.removeItem('pm_vault');
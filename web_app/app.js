@@ -208,7 +208,17 @@ async function saveVault() {
         entries: vault.entries,
         meta: vault.meta
     });
-    await api.saveVault(envelope);
+    try {
+        await api.saveVault(envelope);
+    } catch (error) {
+        if (error.status === 409) {
+            // Başka bir cihaz arada kaydetti; üzerine yazmak yerine güncel hali yükle.
+            alert('Kasa başka bir cihazda değişti; güncel hali yükleniyor. Son değişikliğinizi yeniden yapın.');
+            await loadVault();
+            renderEntries();
+        }
+        throw error;
+    }
 }
 
 async function syncVault() {
@@ -4,6 +4,8 @@
 const SALT_SIZE = 16;
 const NONCE_SIZE = 12;
 const KDF_ITERATIONS = 310000;
+// Bundan büyük düz metin şifrelenmeden önce sıkıştırılır (crypto.py ile aynı)
+const PAYLOAD_COMPRESS_MIN_BYTES = 1024;
 
 // Base64 encoding/decoding (standard base64, Python ile uyumlu)
 function b64encode(data) {
@@ -55,6 +57,14 @@ async function deriveKey(password, salt, iterations = KDF_ITERATIONS) {
     );
 }
 
+// zlib ("deflate") biçimi; Python'daki zlib.compress/decompress ile uyumlu
+async function deflateBytes(data, mode) {
+    const stream = new Blob([data]).stream().pipeThrough(
+        mode === 'compress' ? new CompressionStream('deflate') : new DecompressionStream('deflate')
+    );
+    return new Uint8Array(await new Response(stream).arrayBuffer());
+}
+
 // SHA-256 hash (Python ile uyumlu)
 async function sha3_256(data) {
     const hashBuffer = await crypto.subtle.digest('SHA-256', data);
@@ -72,7 +82,12 @@ async function encryptPayload(masterPassword, payload) {
     const key = await deriveKey(masterPassword, salt);
     
     // Serialize payload
-    const serialized = new TextEncoder().encode(JSON.stringify(payload));
+    let serialized = new TextEncoder().encode(JSON.stringify(payload));
+    const cipher = { name: 'AES-256-GCM', nonce: b64encode(nonce) };
+    if (serialized.length >= PAYLOAD_COMPRESS_MIN_BYTES && typeof CompressionStream !== 'undefined') {
+        serialized = await deflateBytes(serialized, 'compress');
+        cipher.compression = 'deflate';
+    }
     
     // Encrypt
     const ciphertext = await crypto.subtle.encrypt(
@@ -86,6 +101,7 @@ async function encryptPayload(masterPassword, payload) {
     
     // Calculate checksum
     const checksum = await sha3_256(new Uint8Array(ciphertext));
+    cipher.payload = b64encode(ciphertext);
     
     return {
         version: 1,
@@ -94,20 +110,104 @@ async function encryptPayload(masterPassword, payload) {
             iterations: KDF_ITERATIONS,
             salt: b64encode(salt)
         },
-        cipher: {
-            name: 'AES-256-GCM',
-            nonce: b64encode(nonce),
-            payload: b64encode(ciphertext)
-        },
+        cipher: cipher,
         checksum: checksum
     };
 }
 
+// Sürüm 2 (kayıt başına şifreli) zarfta tek bir kaydı aç
+// "json+deflate": ilk bayt 0 ise ham, 1 ise zlib ile sıkıştırılmış JSON
+async function openRecord(key, aad, record, codec = 'json') {
+    const plaintext = await crypto.subtle.decrypt(
+        {
+            name: 'AES-GCM',
+            iv: b64decode(record.nonce),
+            additionalData: new TextEncoder().encode(aad)
+        },
+        key,
+        b64decode(record.payload)
+    );
+    let data = new Uint8Array(plaintext);
+    if (codec === 'json+deflate') {
+        data = data[0] === 1 ? await deflateBytes(data.subarray(1), 'decompress') : data.subarray(1);
+    }
+    return JSON.parse(new TextDecoder().decode(data));
+}
+
+function concatBytes(first, second) {
+    const joined = new Uint8Array(first.length + second.length);
+    joined.set(first, 0);
+    joined.set(second, first.length);
+    return joined;
+}
+
+// WebCrypto yalnızca PBKDF2 sunar; scrypt/Argon2id kasaları masaüstü istemcisiyle açılır
+function requireSupportedKdf(kdf) {
+    if ((kdf.name || 'PBKDF2-HMAC-SHA512') !== 'PBKDF2-HMAC-SHA512') {
+        throw new Error(`Bu tarayıcı istemcisi ${kdf.name} KDF'sini desteklemiyor.`);
+    }
+}
+
+async function decryptRecordsEnvelope(masterPassword, envelope) {
+    requireSupportedKdf(envelope.kdf);
+    const codec = envelope.codec || 'json';
+    if (codec !== 'json' && codec !== 'json+deflate') {
+        throw new Error(`Desteklenmeyen kayıt kodlayıcısı: ${envelope.codec}`);
+    }
+    const encoder = new TextEncoder();
+    const checksum = await sha3_256(concatBytes(b64decode(envelope.cipher.payload), b64decode(envelope.meta.payload)));
+    if (checksum !== envelope.checksum) {
+        throw new Error('Kasa bütünlük doğrulamasından geçemedi.');
+    }
+
+    const kek = await deriveKey(masterPassword, b64decode(envelope.kdf.salt), parseInt(envelope.kdf.iterations));
+    const rawDataKey = await crypto.subtle.decrypt(
+        {
+            name: 'AES-GCM',
+            iv: b64decode(envelope.cipher.nonce),
+            additionalData: encoder.encode('pass-manager/data-key')
+        },
+        kek,
+        b64decode(envelope.cipher.payload)
+    );
+    const dataKey = await crypto.subtle.importKey('raw', rawDataKey, { name: 'AES-GCM' }, false, ['decrypt']);
+
+    const header = await openRecord(dataKey, 'pass-manager/meta', envelope.meta, codec);
+    const records = Object.entries(envelope.entries || {});
+    const digests = {};
+    for (const [entryId, record] of records) {
+        digests[entryId] = await sha3_256(concatBytes(b64decode(record.nonce), b64decode(record.payload)));
+    }
+    if (header.manifest_digest !== undefined) {
+        // Sıralı "id:digest" satırları üzerinden tek özet, kayıt kümesinin tamamını mühürler
+        const lines = Object.keys(digests).sort().map(entryId => `${entryId}:${digests[entryId]}\n`).join('');
+        if (await sha3_256(encoder.encode(lines)) !== header.manifest_digest) {
+            throw new Error('Kasa bütünlük doğrulamasından geçemedi.');
+        }
+    } else {
+        const manifest = header.manifest || {};
+        if (Object.keys(manifest).length !== records.length ||
+            records.some(([entryId]) => manifest[entryId] !== digests[entryId])) {
+            throw new Error('Kasa bütünlük doğrulamasından geçemedi.');
+        }
+    }
+    const entries = [];
+    for (const [entryId, record] of records) {
+        entries.push(await openRecord(dataKey, `pass-manager/entry:${entryId}`, record, codec));
+    }
+    return { entries: entries, meta: header.meta || {} };
+}
+
 // Decrypt payload
 async function decryptPayload(masterPassword, envelope) {
     try {
+        if (envelope.version === 2) {
+            return await decryptRecordsEnvelope(masterPassword, envelope);
+        }
+
         const kdf = envelope.kdf;
         const cipher = envelope.cipher;
+        requireSupportedKdf(kdf);
         
         const salt = b64decode(kdf.salt);
         const iterations = parseInt(kdf.iterations);
@@ -135,10 +235,13 @@ async function decryptPayload(masterPassword, envelope) {
         );
         
         // Parse JSON
-        const decoded = new TextDecoder().decode(plaintext);
+        const body = cipher.compression === 'deflate'
+            ? await deflateBytes(new Uint8Array(plaintext), 'decompress')
+            : new Uint8Array(plaintext);
+        const decoded = new TextDecoder().decode(body);
         return JSON.parse(decoded);
     } catch (error) {
-        if (error.message.includes('bütünlük')) {
+        if (error.message.includes('bütünlük') || error.message.includes('KDF')) {
             throw error;
         }
         throw new Error('Ana parola hatalı veya veri bozulmuş.');